@@ -0,0 +1,78 @@
+"""
+Compares serialising a page of messages with the default JSON provider and with
+FastJSONProvider (orjson, if installed).
+
+Run with the same environment as the app (see README.md), e.g.:
+
+    PYTHONPATH=. python benchmarks/json_provider.py --rows 2000 --repeat 20
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+from dhos_sms_api.app import create_app
+from dhos_sms_api.helpers.json_provider import FastJSONProvider, orjson
+
+
+def _messages(rows: int) -> List[Dict[str, Any]]:
+    # Shaped like the message list's response.
+    created = datetime.utcnow() - timedelta(days=30)
+    return [
+        {
+            "sender": "GDm-Health",
+            "receiver": "+447123456789",
+            "content": "Your blood glucose readings are due 🩸",
+            "trustomer_code": "benchmark",
+            "product_name": "gdm",
+            "status": "delivered",
+            "twilio_sid": f"SM{i:032d}",
+            "date_sent": "Thu, 01 Jan 2026 12:00:00 +0000",
+            "redacted": created + timedelta(seconds=i, minutes=5),
+            "uuid": f"{i:08d}-0000-0000-0000-000000000000",
+            "created": created + timedelta(seconds=i),
+            "created_by": "benchmark",
+            "modified": created + timedelta(seconds=i, minutes=5),
+            "modified_by": "benchmark",
+        }
+        for i in range(rows)
+    ]
+
+
+def _best_time(
+    app: Flask, provider: JSONProvider, payload: List[Dict], repeat: int
+) -> float:
+    timings: List[float] = []
+    with app.app_context():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            provider.response(payload)
+            timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app(testing=True, use_pgsql=False, use_sqlite=True)
+    payload: List[Dict[str, Any]] = _messages(args.rows)
+    default = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    with app.app_context():
+        assert fast.response(payload).get_data() == default.response(payload).get_data()
+    default_time: float = _best_time(app, default, payload, args.repeat)
+    fast_time: float = _best_time(app, fast, payload, args.repeat)
+    print(f"{args.rows} messages, orjson {'installed' if orjson else 'not installed'}")
+    print(f"DefaultJSONProvider: {default_time * 1000:8.1f} ms")
+    print(f"FastJSONProvider:    {fast_time * 1000:8.1f} ms")
+    print(f"Speed-up:            {default_time / fast_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
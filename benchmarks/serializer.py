@@ -0,0 +1,96 @@
+"""
+Compares serialising messages from ORM objects (`Message.to_dict`) with serialising them
+from selected columns (`MessageFieldPlan.to_dict`), as done by the message list.
+
+Run with the same environment as the app (see README.md), e.g.:
+
+    PYTHONPATH=. python benchmarks/serializer.py --rows 10000 --repeat 5
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from flask_batteries_included.sqldb import db
+
+from dhos_sms_api.app import create_app
+from dhos_sms_api.models.message import Message, MessageFieldPlan, get_field_plan
+
+
+def _create_messages(rows: int) -> None:
+    created = datetime.utcnow() - timedelta(days=30)
+    db.session.bulk_insert_mappings(
+        Message,
+        [
+            {
+                "uuid": f"{i:08d}-0000-0000-0000-000000000000",
+                "created": created + timedelta(seconds=i),
+                "created_by_": "benchmark",
+                "modified": created + timedelta(seconds=i),
+                "modified_by_": "benchmark",
+                "sender": "GDm-Health",
+                "receiver": "+447123456789",
+                "content": "Your blood glucose readings are due",
+                "trustomer_code": "benchmark",
+                "product_name": "gdm",
+                "twilio_sid": f"SM{i:032d}",
+                "status": "delivered",
+                "date_sent": "Thu, 01 Jan 2026 12:00:00 +0000",
+                "redacted": created + timedelta(seconds=i, minutes=5),
+            }
+            for i in range(rows)
+        ],
+    )
+    db.session.commit()
+
+
+def _orm_to_dict() -> List[Dict]:
+    return [
+        message.to_dict()
+        for message in Message.query.order_by(
+            Message.created.desc(), Message.uuid.desc()
+        )
+    ]
+
+
+def _row_to_dict() -> List[Dict]:
+    plan: MessageFieldPlan = get_field_plan()
+    return [
+        plan.to_dict(row)
+        for row in Message.query.with_entities(*plan.columns).order_by(
+            Message.created.desc(), Message.uuid.desc()
+        )
+    ]
+
+
+def _best_time(func: Callable[[], List[Dict]], repeat: int) -> float:
+    timings: List[float] = []
+    for _ in range(repeat):
+        # Start each run with an empty identity map, as each request does.
+        db.session.expunge_all()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app(testing=True, use_pgsql=False, use_sqlite=True)
+    with app.app_context():
+        _create_messages(args.rows)
+        assert _orm_to_dict() == _row_to_dict()
+        orm: float = _best_time(_orm_to_dict, args.repeat)
+        rows: float = _best_time(_row_to_dict, args.repeat)
+    per_10k: float = 10000 / args.rows
+    print(f"Message.to_dict:     {orm * per_10k * 1000:8.1f} ms per 10k rows")
+    print(f"MessageFieldPlan:    {rows * per_10k * 1000:8.1f} ms per 10k rows")
+    print(f"Speed-up:            {orm / rows:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
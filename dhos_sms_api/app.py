@@ -12,6 +12,8 @@ from dhos_sms_api.blueprint_api import api_blueprint
 from dhos_sms_api.blueprint_development import development
 from dhos_sms_api.config import init_config
 from dhos_sms_api.helpers.cli import add_cli_command
+from dhos_sms_api.helpers.json_provider import init_json_provider
+from dhos_sms_api.helpers.twilio_client import init_twilio_client
 
 
 def create_app(
@@ -37,6 +39,8 @@ def create_app(
     init_db(app=app, testing=testing)
 
     init_config(app)
+    init_json_provider(app)
+    init_twilio_client(app)
 
     # API blueprint registration
     app.register_blueprint(api_blueprint)
@@ -1,12 +1,26 @@
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlencode
 
-from flask import Blueprint, Response, jsonify, make_response, request
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    json,
+    jsonify,
+    make_response,
+    request,
+    stream_with_context,
+)
 
 from dhos_sms_api.blueprint_api import controller
 from dhos_sms_api.helpers import twilio_client
+from dhos_sms_api.helpers.json_provider import COMPACT_SEPARATORS
 
 api_blueprint = Blueprint("api", __name__)
 
+JSON_MIMETYPE = "application/json"
+NDJSON_MIMETYPE = "application/x-ndjson"
+
 
 @api_blueprint.route("/dhos/v1/sms", methods=["POST"])
 def create_message(message_details: Dict) -> Response:
@@ -14,7 +28,10 @@ def create_message(message_details: Dict) -> Response:
     ---
     post:
       summary: Send SMS message
-      description: Create and send an SMS message with the details provided in the request body
+      description: >-
+        Create and send an SMS message with the details provided in the request body. If queued
+        sending is enabled, or Twilio is unavailable and diverting to the queue is enabled, the
+        message is stored with a pending status and sent in the background.
       tags: [sms]
       requestBody:
         description: SMS message details
@@ -45,6 +62,11 @@ def create_message(message_details: Dict) -> Response:
           content:
             application/json:
               schema: SmsMessageResponse
+        '202':
+          description: SMS message queued for sending
+          content:
+            application/json:
+              schema: SmsMessageResponse
         default:
           description: >-
               Error, e.g. 400 Bad Request, 503 Service Unavailable
@@ -54,16 +76,100 @@ def create_message(message_details: Dict) -> Response:
     """
     message_details["trustomer_code"] = request.headers["X-Trustomer"].lower()
     message_details["product_name"] = request.headers["X-Product"].lower()
-    return jsonify(controller.create_message(message_details))
+    if current_app.config["SMS_QUEUED_SEND"]:
+        return make_response(jsonify(controller.queue_message(message_details)), 202)
+    message: Dict = controller.create_message(message_details)
+    # The message is queued instead of sent if the Twilio circuit breaker is open.
+    status_code: int = (
+        202 if message.get("status") == controller.PENDING_SMS_STATUS else 200
+    )
+    return make_response(jsonify(message), status_code)
+
+
+@api_blueprint.route("/dhos/v1/sms/batch", methods=["POST"])
+def create_messages(messages_details: List[Dict]) -> Response:
+    """
+    ---
+    post:
+      summary: Send a batch of SMS messages
+      description: >-
+        Create and send several SMS messages at once. Each message is handled independently, so
+        the response contains a result per message (in request order) with either the message or
+        the reason it was not accepted.
+      tags: [sms]
+      requestBody:
+        description: List of SMS message details
+        required: true
+        content:
+          application/json:
+            schema:
+              type: array
+              maxItems: 1000
+              items:
+                $ref: '#/components/schemas/SmsMessageRequest'
+              x-body-name: messages_details
+      parameters:
+        - description: Trustomer code
+          in: header
+          name: X-Trustomer
+          required: true
+          schema:
+            example: ouh
+            type: string
+        - description: Product name
+          in: header
+          name: X-Product
+          required: true
+          schema:
+            example: gdm
+            type: string
+      responses:
+        '200':
+          description: Results of sending the SMS messages
+          content:
+            application/json:
+              schema:
+                type: array
+                items: SmsMessageBatchResult
+        '202':
+          description: Results of queueing the SMS messages for sending
+          content:
+            application/json:
+              schema:
+                type: array
+                items: SmsMessageBatchResult
+        default:
+          description: >-
+              Error, e.g. 400 Bad Request, 503 Service Unavailable
+          content:
+            application/json:
+              schema: Error
+    """
+    trustomer_code: str = request.headers["X-Trustomer"].lower()
+    product_name: str = request.headers["X-Product"].lower()
+    for message_details in messages_details:
+        message_details["trustomer_code"] = trustomer_code
+        message_details["product_name"] = product_name
+    if current_app.config["SMS_QUEUED_SEND"]:
+        return make_response(jsonify(controller.queue_messages(messages_details)), 202)
+    return jsonify(controller.create_messages(messages_details))
 
 
 @api_blueprint.route("/dhos/v1/sms/<message_id>", methods=["GET"])
-def get_message_by_uuid(message_id: str) -> Response:
+def get_message_by_uuid(
+    message_id: str, fields: Optional[List[str]] = None
+) -> Response:
     """
     ---
     get:
       summary: Get SMS message by UUID
-      description: Get the SMS message with the UUID provided in the request
+      description: >-
+          Get the SMS message with the UUID provided in the request. The response has an
+          `ETag` header which changes whenever the message does; if it matches the request's
+          `If-None-Match` header, the response is 304 Not Modified with no body. Without
+          `fields`, the message may be served from a per-process cache, so changes made by
+          other processes may take up to SMS_MESSAGE_CACHE_TTL seconds to be seen, or
+          SMS_MESSAGE_CACHE_TERMINAL_TTL seconds once the message is final.
       tags: [sms]
       parameters:
         - name: message_id
@@ -73,12 +179,35 @@ def get_message_by_uuid(message_id: str) -> Response:
           schema:
             type: string
             example: acd39afe-4583-401c-ae99-62227d0a86ed
+        - name: fields
+          in: query
+          description: >-
+              Comma-separated fields of each SMS message to return (defaults to all of them).
+              Fields which aren't requested are not read from the database.
+          required: false
+          style: form
+          explode: false
+          schema:
+            type: array
+            items:
+              type: string
+              enum: [sender, receiver, content, trustomer_code, product_name, status,
+                error_code, error_message, twilio_sid, date_sent, deleted, redacted, uuid,
+                created, created_by, modified, modified_by]
+            example: [uuid, status, created]
       responses:
         '200':
           description: The SMS message
+          headers:
+            ETag:
+              description: Strong ETag of the SMS message
+              schema:
+                type: string
           content:
             application/json:
               schema: SmsMessageResponse
+        '304':
+          description: The SMS message matches the `If-None-Match` header
         default:
           description: >-
               Error, e.g. 400 Bad Request, 503 Service Unavailable
@@ -86,19 +215,37 @@ def get_message_by_uuid(message_id: str) -> Response:
             application/json:
               schema: Error
     """
-    return jsonify(controller.get_message_by_uuid(message_id))
+    # Only look up the ETag by itself when the client might already have the message.
+    if request.if_none_match:
+        etag: str = controller.get_message_etag(message_id)
+        if request.if_none_match.contains_weak(etag):
+            return _not_modified(etag)
+    message, message_etag = controller.get_message_with_etag(message_id, fields=fields)
+    response: Response = jsonify(message)
+    response.set_etag(message_etag)
+    return response
 
 
 @api_blueprint.route("/dhos/v1/sms", methods=["GET"])
 def get_all_messages(
     receiver: Optional[str] = None,
     limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[List[str]] = None,
 ) -> Response:
     """
     ---
     get:
       summary: Get all SMS messages
-      description: Get all SMS messages including details of when they were sent and their status.
+      description: >-
+          Get SMS messages including details of when they were sent and their status, most
+          recent first. Results are paged: if there are more messages, the response has a
+          `Link` header with the URL of the next page (`rel="next"`). Alternatively, all
+          messages can be streamed as they are read, either as a JSON array (`stream=true`)
+          or as newline-delimited JSON (`Accept: application/x-ndjson`). Pages have an `ETag`
+          header which changes whenever the page does; if it matches the request's
+          `If-None-Match` header, the response is 304 Not Modified with no body.
       tags: [sms]
       parameters:
         - description: Trustomer code
@@ -124,19 +271,63 @@ def get_all_messages(
             example: '+447123456789'
         - name: limit
           in: query
-          description: Number of SMS messages to limit response to (defaults to no limit)
+          description: Number of SMS messages per page (defaults to 500, at most 2000)
           required: false
           schema:
             type: integer
+            minimum: 1
             example: 5
+        - name: cursor
+          in: query
+          description: Opaque cursor for the page to get, from the previous page's `Link` header
+          required: false
+          schema:
+            type: string
+            example: MjAyNi0wMS0wMVQxMjowMDowMCxhY2QzOWFmZS00NTgzLTQwMWMtYWU5OS02MjIyN2QwYTg2ZWQ=
+        - name: stream
+          in: query
+          description: Stream all SMS messages rather than a page (limit is then optional)
+          required: false
+          schema:
+            type: boolean
+            default: false
+        - name: fields
+          in: query
+          description: >-
+              Comma-separated fields of each SMS message to return (defaults to all of them).
+              Fields which aren't requested are not read from the database.
+          required: false
+          style: form
+          explode: false
+          schema:
+            type: array
+            items:
+              type: string
+              enum: [sender, receiver, content, trustomer_code, product_name, status,
+                error_code, error_message, twilio_sid, date_sent, deleted, redacted, uuid,
+                created, created_by, modified, modified_by]
+            example: [uuid, status, created]
       responses:
         '200':
           description: List of SMS messages
+          headers:
+            Link:
+              description: URL of the next page of SMS messages, if there is one
+              schema:
+                type: string
+            ETag:
+              description: Strong ETag of the page of SMS messages (not when streaming)
+              schema:
+                type: string
           content:
             application/json:
               schema:
                 type: array
                 items: SmsMessageResponse
+            application/x-ndjson:
+              schema: SmsMessageResponse
+        '304':
+          description: The page of SMS messages matches the `If-None-Match` header
         default:
           description: >-
               Error, e.g. 400 Bad Request, 503 Service Unavailable
@@ -146,14 +337,76 @@ def get_all_messages(
     """
     trustomer_code: str = request.headers["X-Trustomer"].lower()
     product_name: str = request.headers["X-Product"].lower()
-    return jsonify(
-        controller.get_all_messages(
+    ndjson: bool = (
+        request.accept_mimetypes.best_match([JSON_MIMETYPE, NDJSON_MIMETYPE])
+        == NDJSON_MIMETYPE
+    )
+    if stream or ndjson:
+        messages: Iterator[Dict] = controller.stream_all_messages(
+            trustomer_code=trustomer_code,
+            product_name=product_name,
+            receiver=receiver,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+        return Response(
+            stream_with_context(
+                _ndjson_lines(messages) if ndjson else _json_array_chunks(messages)
+            ),
+            mimetype=NDJSON_MIMETYPE if ndjson else JSON_MIMETYPE,
+            direct_passthrough=True,
+        )
+
+    # Only look up the ETag by itself when the client might already have the page.
+    if request.if_none_match:
+        etag: str = controller.get_messages_etag(
             trustomer_code=trustomer_code,
             product_name=product_name,
             receiver=receiver,
             limit=limit,
+            cursor=cursor,
         )
+        if request.if_none_match.contains_weak(etag):
+            return _not_modified(etag)
+
+    page, next_cursor, page_etag = controller.get_all_messages_with_etag(
+        trustomer_code=trustomer_code,
+        product_name=product_name,
+        receiver=receiver,
+        limit=limit,
+        cursor=cursor,
+        fields=fields,
     )
+    response: Response = jsonify(page)
+    response.set_etag(page_etag)
+    if next_cursor is not None:
+        query: str = urlencode({**request.args.to_dict(), "cursor": next_cursor})
+        response.headers["Link"] = f'<{request.path}?{query}>; rel="next"'
+    return response
+
+
+def _not_modified(etag: str) -> Response:
+    response: Response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def _ndjson_lines(messages: Iterator[Dict]) -> Iterator[str]:
+    for message in messages:
+        yield _dumps(message) + "\n"
+
+
+def _json_array_chunks(messages: Iterator[Dict]) -> Iterator[str]:
+    yield "["
+    for i, message in enumerate(messages):
+        yield ("," if i else "") + _dumps(message)
+    yield "]\n"
+
+
+def _dumps(message: Dict) -> str:
+    # Encoded the same way as jsonify, so streamed messages match paged ones.
+    return json.dumps(message, separators=COMPACT_SEPARATORS)
 
 
 @api_blueprint.route("/dhos/v1/sms_status_counts", methods=["GET"])
@@ -223,6 +476,33 @@ def get_message_status_counts(
     )
 
 
+@api_blueprint.route("/dhos/v1/sms_provider_status", methods=["GET"])
+def get_provider_status() -> Response:
+    """
+    ---
+    get:
+      summary: Get SMS provider status
+      description: >-
+        Get the state of the circuit breakers protecting calls to Twilio, per operation. An open
+        circuit breaker means calls to Twilio are currently being refused. Also includes the
+        size and hit/miss counts of the caches in the process handling the request.
+      tags: [sms]
+      responses:
+        '200':
+          description: SMS provider status
+          content:
+            application/json:
+              schema: SmsProviderStatus
+        default:
+          description: >-
+              Error, e.g. 400 Bad Request, 503 Service Unavailable
+          content:
+            application/json:
+              schema: Error
+    """
+    return jsonify(controller.get_provider_status())
+
+
 @api_blueprint.route("/dhos/v1/sms/<message_id>", methods=["DELETE"])
 def delete_message(message_id: str) -> Response:
     """
@@ -315,15 +595,21 @@ def sms_callback() -> Response:
 def sms_bulk_update() -> Response:
     """
     ---
-    get:
+    post:
       summary: Bulk update SMS message status from Twilio
       description: >-
-        Update the status of all known incomplete SMS messages using the Twilio API.
-        Note: only updates messages sent in the last 7 days.
+        Start a background job to update the status of all known incomplete SMS messages
+        using the Twilio API, and redact complete messages. If a job is already in progress
+        that job is returned instead of starting another. Each message is only polled when
+        it is due, backing off over time, and not at all once it is older than the give-up
+        age (7 days by default).
       tags: [sms]
       responses:
-        '204':
-          description: Status updated
+        '202':
+          description: The bulk update job
+          content:
+            application/json:
+              schema: BulkUpdateJobResponse
         default:
           description: >-
               Error, e.g. 400 Bad Request, 503 Service Unavailable
@@ -331,5 +617,39 @@ def sms_bulk_update() -> Response:
             application/json:
               schema: Error
     """
-    controller.sms_bulk_update()
-    return make_response("", 204)
+    job: Dict = controller.start_bulk_update()
+    response: Response = make_response(jsonify(job), 202)
+    response.headers["Location"] = f"/dhos/v1/sms/bulk_update/{job['uuid']}"
+    return response
+
+
+@api_blueprint.route("/dhos/v1/sms/bulk_update/<job_id>", methods=["GET"])
+def get_bulk_update_job(job_id: str) -> Response:
+    """
+    ---
+    get:
+      summary: Get bulk update job
+      description: Get the progress of the bulk update job with the UUID provided.
+      tags: [sms]
+      parameters:
+        - name: job_id
+          in: path
+          description: Job UUID
+          required: true
+          schema:
+            type: string
+            example: 2c4f1d2e-8a47-4b47-9d5e-3f8c6d0b7a19
+      responses:
+        '200':
+          description: The bulk update job
+          content:
+            application/json:
+              schema: BulkUpdateJobResponse
+        default:
+          description: >-
+              Error, e.g. 400 Bad Request, 503 Service Unavailable
+          content:
+            application/json:
+              schema: Error
+    """
+    return jsonify(controller.get_bulk_update_job(job_id))
@@ -1,49 +1,161 @@
+import base64
+import binascii
+import hashlib
 from collections import defaultdict
+from concurrent.futures import Future
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypedDict,
+)
 
 import phonenumbers
 from flask import current_app
+from flask_batteries_included.helpers.error_handler import ServiceUnavailableException
 from flask_batteries_included.helpers.timestamp import (
     parse_iso8601_to_datetime_typesafe,
 )
 from flask_batteries_included.sqldb import db, generate_uuid
 from she_logging import logger
-from sqlalchemy import String, and_, cast, func
+from sqlalchemy import (
+    String,
+    and_,
+    bindparam,
+    case,
+    cast,
+    event,
+    func,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.sql.expression import ColumnElement, Update
+from twilio.base.exceptions import TwilioRestException
 
 from dhos_sms_api.helpers import twilio_client
-from dhos_sms_api.helpers.twilio_client import ProviderResponse
-from dhos_sms_api.models.message import Message
+from dhos_sms_api.helpers.cache import LRUCache, cache_status, get_cache
+from dhos_sms_api.helpers.concurrency import run_in_background, run_in_threads
+from dhos_sms_api.helpers.locks import advisory_xact_lock, try_advisory_lock
+from dhos_sms_api.helpers.twilio_client import CircuitOpenException, ProviderResponse
+from dhos_sms_api.models.bulk_update_job import (
+    JOB_ACTIVE_STATUSES,
+    JOB_STATUS_COMPLETED,
+    JOB_STATUS_FAILED,
+    JOB_STATUS_QUEUED,
+    JOB_STATUS_RUNNING,
+    JOB_STATUS_SKIPPED,
+    BulkUpdateJob,
+)
+from dhos_sms_api.models.message import Message, MessageFieldPlan, get_field_plan
+from dhos_sms_api.query.softdelete import QueryWithSoftDelete
 
 # Twilio statuses - accepted, queued, sending, sent, delivered, undelivered, or failed
 TWILIO_TERMINAL_SMS_STATUSES = ["delivered", "undelivered", "failed"]
 
+# Status of a message which has been accepted by us but not yet sent to Twilio.
+PENDING_SMS_STATUS = "pending"
+
+# Order in which message statuses progress. Twilio callbacks arrive out of order and are
+# retried, so a status is only applied if it is later than the current one. Statuses not
+# listed here are applied whenever they differ from the current status.
+SMS_STATUS_RANKS: Dict[str, int] = {
+    PENDING_SMS_STATUS: 0,
+    "accepted": 1,
+    "queued": 2,
+    "sending": 3,
+    "sent": 4,
+    **{status: 5 for status in TWILIO_TERMINAL_SMS_STATUSES},
+}
+
+# Position of a message in (created, uuid) order, used to walk the table in chunks.
+MessageKey = Tuple[datetime, str]
+
+# Advisory lock held while a bulk update runs, so that only one replica runs it at a time.
+BULK_UPDATE_LOCK_NAME = "dhos-sms-api.bulk-update"
+
+# Advisory lock held while checking for an active bulk update job and creating one. This
+# must differ from BULK_UPDATE_LOCK_NAME, which is held for the whole run of a job, or
+# starting a job would wait for the running one to finish.
+BULK_UPDATE_JOB_LOCK_NAME = "dhos-sms-api.bulk-update-job"
+
+# Cache of recently applied (Twilio SID, status) callbacks, used to drop retries early.
+CALLBACK_CACHE_NAME = "sms_callbacks"
+
+# Cache of messages read by UUID, see `get_message_by_uuid`.
+MESSAGE_CACHE_NAME = "sms_messages"
+
+# Key in the session's info of the UUIDs of messages to drop from the message cache once the
+# session's transaction is committed.
+STALE_MESSAGES_KEY = "sms_stale_messages"
+
+# Message columns updated by a Twilio status callback, and the fields they come from.
+CALLBACK_FIELDS = {
+    "status": "MessageStatus",
+    "date_sent": "DateSend",
+    "error_code": "ErrorCode",
+    "error_message": "ErrorMessage",
+}
+
+
+class BulkUpdateProgress(TypedDict):
+    polled: int
+    updated: int
+    redacted: int
+    failed: int
+
+
+ProgressCallback = Callable[[BulkUpdateProgress, Optional[MessageKey]], None]
+
 
 def create_message(message_details: Dict) -> Dict:
     logger.debug("Creating SMS message", extra={"sms_message_data": message_details})
     message_model: Message = Message(uuid=generate_uuid(), **message_details)
 
-    base_number: phonenumbers.PhoneNumber = phonenumbers.parse(
-        message_model.receiver, current_app.config["COUNTRY_CODE"]
-    )
-    e164_phone_number: str = phonenumbers.format_number(
-        base_number, phonenumbers.PhoneNumberFormat.E164
-    )
-    provider_response: ProviderResponse = twilio_client.send_message(
-        phone_number=e164_phone_number,
-        content=message_model.content,
-        sender=message_model.sender,
-    )
+    try:
+        provider_response: ProviderResponse = twilio_client.send_message(
+            phone_number=_to_e164(message_model.receiver),
+            content=message_model.content,
+            sender=message_model.sender,
+        )
+    except CircuitOpenException:
+        if not current_app.config["TWILIO_CIRCUIT_BREAKER_DIVERT_TO_QUEUE"]:
+            raise
+        logger.warning("Twilio circuit breaker is open, queueing SMS message instead")
+        message_model.status = PENDING_SMS_STATUS
+    else:
+        _apply_provider_response(message_model, provider_response)
 
-    message_model.status = provider_response["status"]
-    message_model.twilio_sid = provider_response["twilio_sid"]
+    db.session.add(message_model)
+    db.session.commit()
 
-    if provider_response["date_sent"] is not None:
-        message_model.date_sent = provider_response["date_sent"]
+    return message_model.to_dict()
 
-    if provider_response["error_code"] is not None:
-        message_model.error_code = provider_response["error_code"]
-        message_model.error_message = provider_response["error_message"]
+
+def queue_message(message_details: Dict) -> Dict:
+    """
+    Stores an SMS message with a pending status without contacting Twilio. The message is
+    sent later by the send worker (see `send_pending_messages`).
+    """
+    logger.debug("Queueing SMS message", extra={"sms_message_data": message_details})
+    message_model: Message = Message(uuid=generate_uuid(), **message_details)
+
+    # Validate the receiver now so that bad numbers are rejected in the request.
+    _to_e164(message_model.receiver)
+    message_model.status = PENDING_SMS_STATUS
 
     db.session.add(message_model)
     db.session.commit()
@@ -51,9 +163,218 @@ def create_message(message_details: Dict) -> Dict:
     return message_model.to_dict()
 
 
-def get_message_by_uuid(message_id: str) -> Dict:
-    message_model: Message = Message.query.filter_by(uuid=message_id).first_or_404()
-    return message_model.to_dict()
+def create_messages(messages_details: List[Dict]) -> List[Dict]:
+    """
+    Sends a batch of SMS messages to Twilio concurrently and stores the ones Twilio accepted in a
+    single transaction. If the Twilio circuit breaker is open and diverting to the queue is
+    enabled, messages are stored as pending instead. Returns a result per message, in request
+    order, containing either the created message or the reason it could not be sent.
+    """
+    logger.debug("Creating batch of %d SMS messages", len(messages_details))
+    results: List[Dict] = [{} for _ in messages_details]
+    to_send: List[Tuple[int, Message, str]] = []
+    e164_numbers: Dict[str, str] = {}
+    for index, message_details in enumerate(messages_details):
+        message_model: Message = Message(uuid=generate_uuid(), **message_details)
+        try:
+            if message_model.receiver not in e164_numbers:
+                e164_numbers[message_model.receiver] = _to_e164(message_model.receiver)
+        except ValueError as e:
+            results[index] = {"error": str(e)}
+            continue
+        to_send.append((index, message_model, e164_numbers[message_model.receiver]))
+
+    def _send(item: Tuple[int, Message, str]) -> ProviderResponse:
+        _, sms, phone_number = item
+        return twilio_client.send_message(
+            phone_number=phone_number, content=sms.content, sender=sms.sender
+        )
+
+    futures = run_in_threads(
+        _send, to_send, max_workers=current_app.config["SMS_BATCH_MAX_WORKERS"]
+    )
+    divert_to_queue: bool = current_app.config["TWILIO_CIRCUIT_BREAKER_DIVERT_TO_QUEUE"]
+    sent: List[Tuple[int, Message]] = []
+    for (index, message_model, _), future in zip(to_send, futures):
+        try:
+            provider_response: ProviderResponse = future.result()
+        except ServiceUnavailableException as e:
+            if not (isinstance(e, CircuitOpenException) and divert_to_queue):
+                results[index] = {"error": _send_failure_reason(e)}
+                continue
+            message_model.status = PENDING_SMS_STATUS
+        except Exception:
+            # Other messages in the batch may already have been sent, so they must still
+            # be stored.
+            logger.exception("Failed to send SMS message %d in batch", index)
+            results[index] = {"error": "Failed to send SMS request"}
+            continue
+        else:
+            _apply_provider_response(message_model, provider_response)
+        sent.append((index, message_model))
+
+    db.session.add_all([message_model for _, message_model in sent])
+    # Flush so that defaults such as `created` are populated before serialising.
+    db.session.flush()
+    for index, message_model in sent:
+        results[index] = {"message": message_model.to_dict()}
+    db.session.commit()
+    logger.info("Sent %d of %d SMS messages in batch", len(sent), len(messages_details))
+    return results
+
+
+def queue_messages(messages_details: List[Dict]) -> List[Dict]:
+    """
+    Stores a batch of SMS messages with a pending status for the send worker. Returns a result
+    per message, in request order, containing either the queued message or the reason it was
+    rejected.
+    """
+    logger.debug("Queueing batch of %d SMS messages", len(messages_details))
+    results: List[Dict] = [{} for _ in messages_details]
+    queued: List[Tuple[int, Message]] = []
+    valid_receivers: Set[str] = set()
+    for index, message_details in enumerate(messages_details):
+        message_model: Message = Message(uuid=generate_uuid(), **message_details)
+        try:
+            if message_model.receiver not in valid_receivers:
+                _to_e164(message_model.receiver)
+                valid_receivers.add(message_model.receiver)
+        except ValueError as e:
+            results[index] = {"error": str(e)}
+            continue
+        message_model.status = PENDING_SMS_STATUS
+        queued.append((index, message_model))
+
+    db.session.add_all([message_model for _, message_model in queued])
+    db.session.flush()
+    for index, message_model in queued:
+        results[index] = {"message": message_model.to_dict()}
+    db.session.commit()
+    return results
+
+
+def send_pending_messages(batch_size: int) -> int:
+    """
+    Sends up to `batch_size` pending SMS messages to Twilio, oldest first. Each message is
+    locked, sent and committed on its own, so that several workers can drain the queue at
+    the same time, a row lock is only held for one request to Twilio, and a message
+    accepted by Twilio is recorded before the next one is sent. Returns the number of
+    messages that were processed.
+    """
+    processed: int = 0
+    while processed < batch_size:
+        sms: Optional[Message] = (
+            Message.query.filter(Message.status == PENDING_SMS_STATUS)
+            .order_by(Message.created)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if sms is None:
+            break
+        if not _send_pending_message(sms):
+            # Twilio is unavailable, so leave the rest of the queue for a later attempt.
+            logger.warning("Stopped sending pending SMS messages, Twilio unavailable")
+            db.session.rollback()
+            break
+        _forget_cached_messages([sms.uuid])
+        db.session.commit()
+        processed += 1
+    return processed
+
+
+def _send_pending_message(sms: Message) -> bool:
+    """
+    Sends a pending message to Twilio, returning False if Twilio is unavailable. Messages
+    which can't be sent for any other reason are marked as failed, so that they aren't
+    retried forever.
+    """
+    provider_response: Optional[ProviderResponse] = None
+    try:
+        provider_response = twilio_client.send_message(
+            phone_number=_to_e164(sms.receiver),
+            content=sms.content,
+            sender=sms.sender,
+        )
+        _apply_provider_response(sms, provider_response)
+    except ServiceUnavailableException as e:
+        cause = e.args[0] if e.args else None
+        if not _is_permanent_send_failure(cause):
+            return False
+        logger.error(
+            "Twilio rejected pending message %s (status %d, code %d)",
+            sms.uuid,
+            cause.status,
+            cause.code,
+        )
+        sms.status = "failed"
+        sms.error_code = str(cause.code)
+        sms.error_message = cause.msg
+    except Exception as e:
+        logger.exception("Failed to send pending message %s", sms.uuid)
+        sms.status = "failed"
+        sms.error_message = str(e)
+        if provider_response is not None:
+            # Twilio accepted the message, so keep its SID to match up callbacks.
+            sms.twilio_sid = provider_response["twilio_sid"]
+    else:
+        logger.debug("Sent pending message %s (SID %s)", sms.uuid, sms.twilio_sid)
+    return True
+
+
+def get_provider_status() -> Dict:
+    return {
+        "circuit_breakers": twilio_client.circuit_breaker_status(),
+        "caches": cache_status(),
+    }
+
+
+def get_message_by_uuid(message_id: str, fields: Optional[List[str]] = None) -> Dict:
+    """
+    Gets a message, limited to `fields` if given, as for `get_message_with_etag`.
+    """
+    return get_message_with_etag(message_id, fields=fields)[0]
+
+
+def get_message_with_etag(
+    message_id: str, fields: Optional[List[str]] = None
+) -> Tuple[Dict, str]:
+    """
+    Gets a message, limited to `fields` if given, along with its ETag (as from
+    `get_message_etag`), worked out from the message read. Messages are cached by UUID for
+    SMS_MESSAGE_CACHE_TTL seconds, or SMS_MESSAGE_CACHE_TERMINAL_TTL seconds once their status
+    is terminal and no redaction is pending. Only this process drops messages from its cache
+    when it updates them, so changes made elsewhere (e.g. by the workers or other replicas)
+    may not be seen until the entry expires. Otherwise only the columns for the requested
+    fields are read.
+    """
+    plan: MessageFieldPlan = _get_field_plan(fields)
+    message_cache: LRUCache = _get_message_cache()
+    cached: Optional[Dict] = message_cache.get(message_id)
+    if cached is not None:
+        etag: str = _make_etag(message_id, _format_modified(cached["modified"]))
+        if fields is None:
+            return dict(cached), etag
+        return {key: value for key, value in cached.items() if key in fields}, etag
+
+    row: Row = (
+        Message.query.with_entities(
+            *plan.columns_with(Message.redaction_due, Message.modified)
+        )
+        .filter_by(uuid=message_id)
+        .first_or_404()
+    )
+    message: Dict = plan.to_dict(row)
+    if fields is None:
+        # The redaction worker will still change a message whose redaction is due.
+        settled: bool = (
+            message.get("status") in TWILIO_TERMINAL_SMS_STATUSES
+            and row.redaction_due is None
+        )
+        ttl: float = current_app.config[
+            "SMS_MESSAGE_CACHE_TERMINAL_TTL" if settled else "SMS_MESSAGE_CACHE_TTL"
+        ]
+        message_cache.put(message_id, dict(message), ttl=ttl)
+    return message, _make_etag(message_id, _format_modified(row.modified))
 
 
 def get_all_messages(
@@ -61,17 +382,220 @@ def get_all_messages(
     product_name: Optional[str] = None,
     receiver: Optional[str] = None,
     limit: Optional[int] = None,
-) -> List[Dict]:
-    message_query = Message.query.order_by(Message.created.desc())
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Gets a page of messages and the cursor for the next page, as for
+    `get_all_messages_with_etag`.
+    """
+    page, next_cursor, _ = get_all_messages_with_etag(
+        trustomer_code=trustomer_code,
+        product_name=product_name,
+        receiver=receiver,
+        limit=limit,
+        cursor=cursor,
+        fields=fields,
+    )
+    return page, next_cursor
+
+
+def get_all_messages_with_etag(
+    trustomer_code: Optional[str] = None,
+    product_name: Optional[str] = None,
+    receiver: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Tuple[List[Dict], Optional[str], str]:
+    """
+    Gets a page of messages, most recent first, along with an opaque cursor for the next page
+    (or None if this is the last page) and the page's ETag (as from `get_messages_etag`),
+    worked out from the messages read. Pages are found by their key (created, uuid) rather
+    than an offset, so every page costs the same however deep it is. The page size defaults
+    to SMS_LIST_DEFAULT_PAGE_SIZE and is capped at SMS_LIST_MAX_PAGE_SIZE. If given, messages
+    are limited to `fields`, and only the columns for those fields are read.
+    """
+    plan: MessageFieldPlan = _get_field_plan(fields)
+    page_size: int = _get_page_size(limit)
+    message_query = _message_list_query(
+        plan=plan,
+        trustomer_code=trustomer_code,
+        product_name=product_name,
+        receiver=receiver,
+        cursor=cursor,
+        extra_columns=[Message.modified],
+    )
+    # Fetch one extra message to find out whether there is another page.
+    rows: List[Row] = message_query.limit(page_size + 1).all()
+    page: List[Row] = rows[:page_size]
+    more: bool = len(rows) > page_size
+    next_cursor: Optional[str] = (
+        _encode_cursor((page[-1].created, page[-1].uuid)) if more else None
+    )
+    return [plan.to_dict(row) for row in page], next_cursor, _page_etag(page, more)
+
+
+def get_message_etag(message_id: str) -> str:
+    """
+    Gets a strong ETag for a message, which changes whenever the message is modified. The
+    modified time is always read from the database rather than the message cache, which
+    misses changes made by other processes. A cached copy with a different modified time is
+    dropped, so that the message sent along with the ETag is current.
+    """
+    modified: datetime = (
+        Message.query.with_entities(Message.modified)
+        .filter_by(uuid=message_id)
+        .first_or_404()
+        .modified
+    )
+    message_cache: LRUCache = _get_message_cache()
+    cached: Optional[Dict] = message_cache.get(message_id)
+    if cached is not None and _format_modified(cached["modified"]) != _format_modified(
+        modified
+    ):
+        message_cache.discard(message_id)
+    return _make_etag(message_id, _format_modified(modified))
+
+
+def get_messages_etag(
+    trustomer_code: Optional[str] = None,
+    product_name: Optional[str] = None,
+    receiver: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> str:
+    """
+    Gets a strong ETag for the page of messages `get_all_messages` would return, from the
+    number of messages on the page, the latest time any of them was modified and the key of
+    the last one (which moves if a message on the page is deleted), and whether there is a
+    next page. Only those columns are read, not the messages themselves.
+    """
+    page_size: int = _get_page_size(limit)
+    rows: List[Row] = (
+        _message_list_query(
+            plan=get_field_plan(frozenset(["modified"])),
+            trustomer_code=trustomer_code,
+            product_name=product_name,
+            receiver=receiver,
+            cursor=cursor,
+        )
+        .limit(page_size + 1)
+        .all()
+    )
+    return _page_etag(rows[:page_size], len(rows) > page_size)
+
+
+def stream_all_messages(
+    trustomer_code: Optional[str] = None,
+    product_name: Optional[str] = None,
+    receiver: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Iterator[Dict]:
+    """
+    Yields messages, most recent first, without paging. Rows are read from a server-side
+    cursor SMS_LIST_STREAM_BATCH_SIZE at a time, so memory use doesn't grow with the number
+    of messages. If given, `limit` caps the number of messages and messages are limited to
+    `fields`.
+    """
+    plan: MessageFieldPlan = _get_field_plan(fields)
+    message_query = _message_list_query(
+        plan=plan,
+        trustomer_code=trustomer_code,
+        product_name=product_name,
+        receiver=receiver,
+        cursor=cursor,
+    )
+    if limit:
+        message_query = message_query.limit(limit)
+    batch_size: int = current_app.config["SMS_LIST_STREAM_BATCH_SIZE"]
+    for row in message_query.yield_per(batch_size):
+        yield plan.to_dict(row)
+
+
+def _get_field_plan(fields: Optional[List[str]]) -> MessageFieldPlan:
+    return get_field_plan(None if fields is None else frozenset(fields))
+
+
+def _get_page_size(limit: Optional[int]) -> int:
+    return min(
+        limit or current_app.config["SMS_LIST_DEFAULT_PAGE_SIZE"],
+        current_app.config["SMS_LIST_MAX_PAGE_SIZE"],
+    )
+
+
+def _format_modified(modified: datetime) -> str:
+    # Cached messages have UTC modified times, whereas they are naive in the database.
+    return modified.replace(tzinfo=None).isoformat()
+
+
+def _page_etag(page: List[Row], more: bool) -> str:
+    if not page:
+        return _make_etag("0")
+    return _make_etag(
+        str(len(page)),
+        _format_modified(max(row.modified for row in page)),
+        _format_message_key((page[-1].created, page[-1].uuid)),
+        str(more),
+    )
+
+
+def _make_etag(*parts: str) -> str:
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def _get_message_cache() -> LRUCache:
+    return get_cache(MESSAGE_CACHE_NAME, current_app.config["SMS_MESSAGE_CACHE_SIZE"])
+
+
+def _forget_cached_messages(uuids: Iterable[str]) -> None:
+    """
+    Drops messages from the message cache once the session's transaction is committed, rather
+    than before when a concurrent read could cache the old row again. Changes which are rolled
+    back leave the cache alone.
+    """
+    db.session.info.setdefault(STALE_MESSAGES_KEY, set()).update(uuids)
+
+
+@event.listens_for(db.session, "after_commit")
+def _drop_stale_messages(session: Session) -> None:
+    stale: Optional[Set[str]] = session.info.pop(STALE_MESSAGES_KEY, None)
+    if stale:
+        message_cache: LRUCache = _get_message_cache()
+        for uuid in stale:
+            message_cache.discard(uuid)
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _keep_cached_messages(session: Session, previous_transaction: Any) -> None:
+    session.info.pop(STALE_MESSAGES_KEY, None)
+
+
+def _message_list_query(
+    plan: MessageFieldPlan,
+    trustomer_code: Optional[str],
+    product_name: Optional[str],
+    receiver: Optional[str],
+    cursor: Optional[str],
+    extra_columns: Sequence[InstrumentedAttribute] = (),
+) -> QueryWithSoftDelete:
+    # The key columns are always selected, for the next page's cursor.
+    message_query = Message.query.with_entities(
+        *plan.columns_with(Message.created, Message.uuid, *extra_columns)
+    ).order_by(Message.created.desc(), Message.uuid.desc())
     if trustomer_code:
         message_query = message_query.filter(Message.trustomer_code == trustomer_code)
     if product_name:
         message_query = message_query.filter(Message.product_name == product_name)
     if receiver:
         message_query = message_query.filter(Message.receiver == receiver)
-    if limit:
-        message_query = message_query.limit(limit)
-    return [message_model.to_dict() for message_model in message_query]
+    if cursor:
+        message_query = message_query.filter(
+            tuple_(Message.created, Message.uuid) < tuple_(*_decode_cursor(cursor))
+        )
+    return message_query
 
 
 def get_message_status_counts(
@@ -124,93 +648,830 @@ def get_message_status_counts(
 def delete_message(
     message_id: str, trustomer_code: str, product_name: str
 ) -> Dict[str, Any]:
-    message: Message = Message.query.filter_by(uuid=message_id).first_or_404()
-    if message.trustomer_code != trustomer_code or message.product_name != product_name:
+    owner: Row = (
+        Message.query.with_entities(Message.trustomer_code, Message.product_name)
+        .filter_by(uuid=message_id)
+        .first_or_404()
+    )
+    if owner.trustomer_code != trustomer_code or owner.product_name != product_name:
         raise PermissionError(
             "Cannot modify an SMS message sent by another trustomer/product"
         )
-    return message.delete()
+    db.session.execute(
+        update(Message.__table__)
+        .where(Message.uuid == message_id)
+        .values(deleted=datetime.utcnow())
+    )
+    _forget_cached_messages([message_id])
+    db.session.commit()
+    plan: MessageFieldPlan = get_field_plan()
+    row: Row = db.session.query(*plan.columns).filter(Message.uuid == message_id).one()
+    return plan.to_dict(row)
 
 
 def sms_callback(request_data: Dict) -> None:
     """
-    Updates a single message with information from Twilio.
+    Updates a single message with information from Twilio. The update is a single
+    statement which only writes the row when the callback changes something.
+    Messages reaching a terminal status are marked as due for redaction, which is
+    done by the redaction worker.
     """
     message_sid = request_data["MessageSid"]
     logger.info("Received callback for message with SID %s", message_sid)
-    message: Optional[Message] = Message.query.filter_by(twilio_sid=message_sid).first()
+    changes: Dict[str, str] = {
+        column: request_data[field]
+        for column, field in CALLBACK_FIELDS.items()
+        if request_data.get(field)
+    }
+
+    status: Optional[str] = changes.get("status")
+    recent_callbacks: LRUCache = get_cache(
+        CALLBACK_CACHE_NAME, current_app.config["SMS_CALLBACK_CACHE_SIZE"]
+    )
+    # Keyed on everything the callback would change, so that a repeated status bringing new
+    # details (e.g. an error code) still reaches the database.
+    callback_key: Tuple = (message_sid, *sorted(changes.items()))
+    if status is not None and callback_key in recent_callbacks:
+        logger.debug(
+            "Ignoring repeated callback for message with SID %s (status %s)",
+            message_sid,
+            status,
+        )
+        return
 
-    if not message:
+    updated: Optional[Tuple[str, str]] = _update_message_by_sid(message_sid, changes)
+    if updated is not None:
+        logger.debug(
+            "Updated message %s (SID %s) to status %s",
+            updated[0],
+            message_sid,
+            updated[1],
+        )
+    elif Message.query.filter_by(twilio_sid=message_sid).count() == 0:
+        # Nothing was written: either the message is unknown (or deleted) or the callback
+        # is a no-op.
         raise ValueError(f"Twilio SID {message_sid} not found")
+    else:
+        logger.debug(
+            "Callback for message with SID %s is stale or a duplicate", message_sid
+        )
+
+    if status is not None:
+        recent_callbacks.put(callback_key)
+
 
-    message.status = request_data.get("MessageStatus") or message.status
-    message.date_sent = request_data.get("DateSend") or message.date_sent
-    message.error_code = request_data.get("ErrorCode") or message.error_code
-    message.error_message = request_data.get("ErrorMessage") or message.error_message
+def start_bulk_update() -> Dict:
+    """
+    Starts a bulk update job running in the background, unless one is already in progress in
+    which case that job is returned instead. A job which has not saved any progress within
+    SMS_BULK_UPDATE_JOB_TIMEOUT seconds is assumed to have been abandoned (e.g. the process
+    running it was restarted), and the new job resumes from where it got to.
+    """
+    # Serialise checking for an active job and creating one across replicas.
+    advisory_xact_lock(BULK_UPDATE_JOB_LOCK_NAME)
+    active_job: Optional[BulkUpdateJob] = (
+        BulkUpdateJob.query.filter(BulkUpdateJob.status.in_(JOB_ACTIVE_STATUSES))
+        .order_by(BulkUpdateJob.created.desc())
+        .first()
+    )
+    job: BulkUpdateJob = BulkUpdateJob(uuid=generate_uuid(), status=JOB_STATUS_QUEUED)
+    if active_job is not None:
+        timeout = timedelta(seconds=current_app.config["SMS_BULK_UPDATE_JOB_TIMEOUT"])
+        if active_job.modified > datetime.utcnow() - timeout:
+            logger.info("Bulk update job %s is already in progress", active_job.uuid)
+            return active_job.to_dict()
+        logger.warning("Bulk update job %s was abandoned, resuming", active_job.uuid)
+        active_job.status = JOB_STATUS_FAILED
+        active_job.error = "Abandoned"
+        active_job.finished = datetime.utcnow()
+        job.last_created = active_job.last_created
+        job.last_uuid = active_job.last_uuid
+
+    db.session.add(job)
     db.session.commit()
+    logger.info("Starting bulk update job %s", job.uuid)
+    run_in_background(run_bulk_update_job, job.uuid)
+    return job.to_dict()
+
 
-    # If message status is terminal, attempt to redact the message body in Twilio.
-    if message.status in TWILIO_TERMINAL_SMS_STATUSES:
-        logger.debug("SMS message status is terminal, redacting body in Twilio")
-        success: bool = twilio_client.redact_message_body(message.twilio_sid)
-        if success:
-            message.redacted = datetime.utcnow()
+def get_bulk_update_job(job_id: str) -> Dict:
+    job: BulkUpdateJob = BulkUpdateJob.query.filter_by(uuid=job_id).first_or_404()
+    return job.to_dict()
+
+
+def run_bulk_update_job(job_id: str) -> None:
+    """
+    Runs the bulk update for a job, saving its progress along with each chunk of messages.
+    Only one bulk update runs at a time across all replicas: if another is running the job
+    is skipped.
+    """
+    with try_advisory_lock(BULK_UPDATE_LOCK_NAME) as acquired:
+        job: BulkUpdateJob = BulkUpdateJob.query.filter_by(uuid=job_id).one()
+        if not acquired:
+            logger.warning("Skipping bulk update job %s, another is running", job_id)
+            job.status = JOB_STATUS_SKIPPED
+            job.error = "Another bulk update is running"
+            job.finished = datetime.utcnow()
             db.session.commit()
+            return
+        _run_bulk_update_job(job)
+
+
+def _run_bulk_update_job(job: BulkUpdateJob) -> None:
+    job_id: str = job.uuid
+    job.status = JOB_STATUS_RUNNING
+    job.started = datetime.utcnow()
+    db.session.commit()
+
+    def _save_progress(
+        progress: BulkUpdateProgress, last_key: Optional[MessageKey]
+    ) -> None:
+        job.polled = progress["polled"]
+        job.updated = progress["updated"]
+        job.redacted = progress["redacted"]
+        job.failed = progress["failed"]
+        if last_key is not None:
+            job.last_created, job.last_uuid = last_key
+
+    resume_from: Optional[MessageKey] = None
+    if job.last_created is not None and job.last_uuid is not None:
+        resume_from = (job.last_created, job.last_uuid)
+    try:
+        sms_bulk_update(resume_from=resume_from, on_progress=_save_progress)
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Bulk update job %s failed", job_id)
+        job.status = JOB_STATUS_FAILED
+        job.error = str(e)
+    else:
+        logger.info("Bulk update job %s completed", job_id)
+        job.status = JOB_STATUS_COMPLETED
+    job.finished = datetime.utcnow()
+    db.session.commit()
+
+
+def sms_bulk_update(
+    resume_from: Optional[MessageKey] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> BulkUpdateProgress:
+    """
+    Updates the status of incomplete Messages in the database which are due to be polled
+    (see `poll_due_messages`), then redacts any complete SMS messages in Twilio whose
+    redaction is due (see `redact_all_due_messages`).
+
+    An interrupted run can be continued by passing the key of the last message polled as
+    `resume_from`. If given, `on_progress` is called with the running totals and the last
+    key before each commit.
+    """
+    progress: BulkUpdateProgress = poll_due_messages(
+        resume_from=resume_from, on_progress=on_progress
+    )
+    redact_all_due_messages(progress=progress, on_progress=on_progress)
+    logger.info(
+        "Bulk update finished",
+        extra={"bulk_update_progress": progress},
+    )
+    return progress
+
+
+def poll_due_messages(
+    progress: Optional[BulkUpdateProgress] = None,
+    resume_from: Optional[MessageKey] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    window: Optional[timedelta] = None,
+    chunk_size: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> BulkUpdateProgress:
+    """
+    Updates the status of incomplete Messages in the database which are due to be polled (see
+    `_schedule_next_poll`) and were created within `window` (by default
+    SMS_POLL_GIVE_UP_AFTER seconds). Pending messages which have not been sent yet are
+    skipped. Uses the Twilio API to ask for their most recent status, making up to
+    `max_workers` (by default SMS_BULK_UPDATE_MAX_WORKERS) requests at once.
+
+    Messages are processed in chunks of `chunk_size` (by default SMS_BULK_UPDATE_CHUNK_SIZE)
+    ordered by (created, uuid), committing after each chunk. The key of the last message in
+    each chunk is logged, and an interrupted run can be continued by passing it as
+    `resume_from`. If given, `on_progress` is called with the running totals and the last
+    key before each commit. Totals are added to `progress` if given.
+
+    If SMS_BULK_UPDATE_RECONCILE_FROM_LIST is set, statuses are first reconciled from pages
+    of Twilio's message list (see `_reconcile_from_list`), so that only messages which
+    weren't listed are fetched one at a time.
+    """
+    if progress is None:
+        progress = {"polled": 0, "updated": 0, "redacted": 0, "failed": 0}
+    now: datetime = datetime.utcnow()
+    if (
+        current_app.config["SMS_BULK_UPDATE_RECONCILE_FROM_LIST"]
+        and resume_from is None
+    ):
+        _reconcile_from_list(
+            now=now, progress=progress, on_progress=on_progress, window=window
+        )
+
+    chunk_size = chunk_size or current_app.config["SMS_BULK_UPDATE_CHUNK_SIZE"]
+    last_key: Optional[MessageKey] = resume_from
+    while True:
+        chunk: List[Message] = _get_messages_due_poll(
+            now=now, after_key=last_key, limit=chunk_size, window=window
+        )
+        if not chunk:
+            break
+        updated, failed = _poll_message_statuses(chunk, max_workers=max_workers)
+        last_key = (chunk[-1].created, chunk[-1].uuid)
+        progress["polled"] += len(chunk)
+        progress["updated"] += updated
+        progress["failed"] += failed
+        if on_progress is not None:
+            on_progress(progress, last_key)
+        db.session.commit()
+        logger.info(
+            "Polled %d incomplete SMS messages, up to key %s",
+            progress["polled"],
+            _format_message_key(last_key),
+        )
+    return progress
+
+
+def redact_all_due_messages(
+    progress: Optional[BulkUpdateProgress] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    window: Optional[timedelta] = None,
+    batch_size: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> BulkUpdateProgress:
+    """
+    Redacts the bodies in Twilio of every message whose redaction is due, in batches of
+    `batch_size` (by default SMS_REDACTION_BATCH_SIZE), committing after each batch. Only
+    messages created within `window` are redacted if it is given. If given, `on_progress` is
+    called with the running totals before each commit. Totals are added to `progress` if
+    given.
+    """
+    if progress is None:
+        progress = {"polled": 0, "updated": 0, "redacted": 0, "failed": 0}
+    batch_size = batch_size or current_app.config["SMS_REDACTION_BATCH_SIZE"]
+    while True:
+        attempted, redacted = _redact_due_batch(
+            batch_size=batch_size, max_workers=max_workers, window=window
+        )
+        progress["redacted"] += redacted
+        progress["failed"] += attempted - redacted
+        if on_progress is not None:
+            on_progress(progress, None)
+        db.session.commit()
+        if not attempted:
+            break
+    return progress
+
+
+def count_messages_due_poll(window: Optional[timedelta] = None) -> int:
+    return _messages_due_poll_query(datetime.utcnow(), window=window).count()
+
+
+def count_messages_due_redaction(window: Optional[timedelta] = None) -> int:
+    return _messages_due_redaction_query(datetime.utcnow(), window=window).count()
+
+
+def redact_due_messages(batch_size: int) -> int:
+    """
+    Redacts the bodies in Twilio of up to `batch_size` messages whose redaction is due,
+    making at most SMS_REDACTION_MAX_WORKERS requests to Twilio at once. Failed attempts
+    are retried with exponential backoff, giving up after SMS_REDACTION_MAX_ATTEMPTS.
+    Returns the number of messages that were attempted.
+    """
+    attempted, _ = _redact_due_batch(batch_size=batch_size)
+    db.session.commit()
+    return attempted
+
+
+def _redact_due_batch(
+    batch_size: int,
+    max_workers: Optional[int] = None,
+    window: Optional[timedelta] = None,
+) -> Tuple[int, int]:
+    """
+    Redacts a batch of messages whose redaction is due without committing, returning the
+    number of messages attempted and the number redacted. Messages which weren't sent to
+    Twilio because its circuit breaker is open don't count as attempts, so an outage doesn't
+    use up their retries.
+    """
+    if not twilio_client.is_available(twilio_client.OPERATION_REDACT):
+        logger.warning("Not redacting SMS messages, Twilio circuit breaker is open")
+        return 0, 0
+    now: datetime = datetime.utcnow()
+    due_messages: List[Message] = (
+        _messages_due_redaction_query(now, window=window)
+        .order_by(Message.redaction_due)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    futures: List["Future[bool]"] = run_in_threads(
+        twilio_client.redact_message_body,
+        [sms.twilio_sid for sms in due_messages],
+        max_workers=max_workers or current_app.config["SMS_REDACTION_MAX_WORKERS"],
+    )
+    _forget_cached_messages(sms.uuid for sms in due_messages)
+    attempted: int = 0
+    redacted: int = 0
+    for sms, future in zip(due_messages, futures):
+        if isinstance(future.exception(), CircuitOpenException):
+            continue
+        attempted += 1
+        sms.redaction_attempts += 1
+        if future.exception() is None and future.result():
+            logger.debug("Redacted message %s (SID %s)", sms.uuid, sms.twilio_sid)
+            sms.redacted = datetime.utcnow()
+            sms.redaction_due = None
+            redacted += 1
         else:
             # Don't raise an exception here because we can retry later.
-            logger.error("Failed to redact message in Twilio")
+            _reschedule_redaction(sms, now)
+    return attempted, redacted
+
+
+def _to_e164(receiver: str) -> str:
+    try:
+        base_number: phonenumbers.PhoneNumber = phonenumbers.parse(
+            receiver, current_app.config["COUNTRY_CODE"]
+        )
+    except phonenumbers.NumberParseException as e:
+        raise ValueError(f"Invalid receiver phone number: {e}")
+    return phonenumbers.format_number(base_number, phonenumbers.PhoneNumberFormat.E164)
 
 
-def sms_bulk_update() -> None:
+def _apply_provider_response(
+    message_model: Message, provider_response: ProviderResponse
+) -> None:
+    message_model.status = provider_response["status"]
+    message_model.twilio_sid = provider_response["twilio_sid"]
+
+    if provider_response["date_sent"] is not None:
+        message_model.date_sent = provider_response["date_sent"]
+
+    if provider_response["error_code"] is not None:
+        message_model.error_code = provider_response["error_code"]
+        message_model.error_message = provider_response["error_message"]
+
+    _schedule_redaction(message_model)
+    _schedule_next_poll(message_model, datetime.utcnow())
+
+
+def _get_messages_due_poll(
+    now: datetime,
+    after_key: Optional[MessageKey],
+    limit: int,
+    window: Optional[timedelta] = None,
+) -> List[Message]:
+    message_query = _messages_due_poll_query(now, window=window)
+    if after_key is not None:
+        message_query = message_query.filter(
+            tuple_(Message.created, Message.uuid) > tuple_(*after_key)
+        )
+    return message_query.order_by(Message.created, Message.uuid).limit(limit).all()
+
+
+def _messages_due_poll_query(
+    now: datetime, window: Optional[timedelta] = None
+) -> QueryWithSoftDelete:
+    if window is None:
+        window = timedelta(seconds=current_app.config["SMS_POLL_GIVE_UP_AFTER"])
+    return (
+        Message.query.filter(Message.next_poll_at <= now)
+        .filter(Message.status.notin_(TWILIO_TERMINAL_SMS_STATUSES))
+        .filter(Message.twilio_sid.isnot(None))
+        .filter(Message.created > now - window)
+    )
+
+
+def _messages_due_redaction_query(
+    now: datetime, window: Optional[timedelta] = None
+) -> QueryWithSoftDelete:
+    message_query = (
+        Message.query.filter(Message.redaction_due <= now)
+        .filter(Message.redacted.is_(None))
+        .filter(Message.twilio_sid.isnot(None))
+    )
+    if window is not None:
+        message_query = message_query.filter(Message.created > now - window)
+    return message_query
+
+
+def _reconcile_from_list(
+    now: datetime,
+    progress: BulkUpdateProgress,
+    on_progress: Optional[ProgressCallback],
+    window: Optional[timedelta] = None,
+) -> None:
     """
-    Updates the status of all known incomplete Messages in the database that were created
-    less than 7 days ago. Uses the Twilio API to ask for their most recent status.
-    Also attempts to redact any un-redacted complete SMS messages in Twilio.
+    Lists the messages sent since the oldest message due to be polled from Twilio, a page at
+    a time. The due messages listed in each page are looked up by SID, and their statuses are
+    applied with the same guarded UPDATE as callbacks (see `_status_update_statement`), so a
+    newer status written meanwhile isn't overwritten. Each page is committed. Messages which
+    aren't listed (e.g. those Twilio hasn't sent yet) stay due, to be fetched individually.
+    Messages without a send date are never listed, so at most
+    SMS_BULK_UPDATE_RECONCILE_MAX_PAGES pages are read rather than the whole account's list.
     """
-    datetime_7_days_ago: datetime = datetime.now(tz=timezone.utc) - timedelta(days=7)
-    incomplete_messages: List[Message] = (
-        Message.query.filter(Message.status.notin_(TWILIO_TERMINAL_SMS_STATUSES))
-        .filter(Message.created > datetime_7_days_ago)
-        .all()
+    due_query: QueryWithSoftDelete = _messages_due_poll_query(now, window=window)
+    remaining: int
+    date_sent_after: Optional[datetime]
+    remaining, date_sent_after = due_query.with_entities(
+        func.count(Message.uuid), func.min(Message.created)
+    ).one()
+    if not remaining or date_sent_after is None:
+        return
+
+    logger.info(
+        "Reconciling %d SMS messages from messages listed in Twilio since %s",
+        remaining,
+        date_sent_after.isoformat(),
     )
-    logger.info("Found %d incomplete SMS messages to update", len(incomplete_messages))
-    for sms in incomplete_messages:
-        logger.debug(
-            "Requesting update for message %s (SID %s)", sms.uuid, sms.twilio_sid
+    max_pages: int = current_app.config["SMS_BULK_UPDATE_RECONCILE_MAX_PAGES"]
+    for pages, page in enumerate(
+        twilio_client.list_messages(date_sent_after=date_sent_after), start=1
+    ):
+        listed: Dict[str, ProviderResponse] = {
+            message_update["twilio_sid"]: message_update
+            for message_update in page
+            if message_update["twilio_sid"] is not None
+        }
+        rows: List[Row] = (
+            due_query.filter(Message.twilio_sid.in_(listed))
+            .order_by(Message.created, Message.uuid)
+            .with_entities(
+                Message.uuid,
+                Message.twilio_sid,
+                Message.created,
+                Message.status,
+                Message.poll_attempts,
+            )
+            .all()
         )
-        message_update: Optional[ProviderResponse] = twilio_client.get_message(
-            sms.twilio_sid
+        progress["updated"] += _reconcile_listed_messages(rows, listed, now)
+        _forget_cached_messages(row.uuid for row in rows)
+        remaining -= len(rows)
+        progress["polled"] += len(rows)
+        if on_progress is not None:
+            on_progress(progress, None)
+        db.session.commit()
+        if remaining <= 0:
+            break
+        if pages >= max_pages:
+            logger.info("Stopped listing messages in Twilio after %d pages", pages)
+            break
+    logger.info("%d SMS messages weren't listed in Twilio", max(remaining, 0))
+
+
+def _reconcile_listed_messages(
+    rows: List[Row], listed: Dict[str, ProviderResponse], now: datetime
+) -> int:
+    """
+    Applies the messages' entries in Twilio's message list and schedules their next polls,
+    returning the number of messages whose status changed. Rows whose changes have the same
+    status and details set share a guarded UPDATE, run once for all of them, and the next
+    polls are written with one more. Rows which were soft deleted meanwhile are left alone.
+    """
+    table = Message.__table__
+    status_params: Dict[
+        Tuple[Optional[str], Tuple[str, ...]], List[Dict]
+    ] = defaultdict(list)
+    poll_params: List[Dict] = []
+    updated: int = 0
+    for row in rows:
+        message_update: ProviderResponse = listed[row.twilio_sid]
+        listed_values: Dict[str, Any] = {
+            "date_sent": message_update["date_sent"],
+            "error_code": message_update["error_code"],
+            "error_message": message_update["error_message"],
+        }
+        details: Dict[str, Any] = {
+            column: value
+            for column, value in listed_values.items()
+            if value is not None
+        }
+        status: Optional[str] = message_update["status"]
+        if status is not None or details:
+            status_params[(status, tuple(details))].append(
+                {
+                    "b_uuid": row.uuid,
+                    **{f"b_{column}": value for column, value in details.items()},
+                }
+            )
+        # Status changes are counted from the statuses read with the page, as the guarded
+        # UPDATE below can't say which of its rows it changed.
+        status_changed: bool = _status_supersedes(row.status, status)
+        if status_changed:
+            updated += 1
+
+        # The message isn't attached to the session, so this only computes the next poll.
+        sms = Message(
+            uuid=row.uuid,
+            twilio_sid=row.twilio_sid,
+            created=row.created,
+            status=status if status_changed else row.status,
+            poll_attempts=row.poll_attempts + 1,
+        )
+        _schedule_next_poll(sms, now)
+        poll_params.append({"b_uuid": row.uuid, "b_next_poll_at": sms.next_poll_at})
+
+    for (status, columns), params in status_params.items():
+        changes: Dict[str, Any] = {
+            column: bindparam(f"b_{column}") for column in columns
+        }
+        if status is not None:
+            changes["status"] = status
+        db.session.execute(
+            _status_update_statement(
+                changes,
+                table.c.uuid == bindparam("b_uuid"),
+                table.c.deleted.is_(None),
+            ),
+            params,
+        )
+    if poll_params:
+        # Messages that reached a terminal status above were taken off the poll schedule
+        # already. The statuses are bound one by one, as executemany() can't expand a list.
+        db.session.execute(
+            update(table)
+            .where(
+                table.c.uuid == bindparam("b_uuid"),
+                table.c.deleted.is_(None),
+                table.c.status.notin_(
+                    [literal(status) for status in TWILIO_TERMINAL_SMS_STATUSES]
+                ),
+            )
+            .values(
+                poll_attempts=table.c.poll_attempts + 1,
+                next_poll_at=bindparam("b_next_poll_at"),
+            ),
+            poll_params,
+        )
+    return updated
+
+
+def _poll_message_statuses(
+    messages: List[Message], max_workers: Optional[int] = None
+) -> Tuple[int, int]:
+    """
+    Gets the latest status of each message from Twilio and applies it, returning the number
+    of messages whose status changed and the number which couldn't be polled.
+    """
+    futures: List["Future[Optional[ProviderResponse]]"] = run_in_threads(
+        twilio_client.get_message,
+        [sms.twilio_sid for sms in messages],
+        max_workers=max_workers or current_app.config["SMS_BULK_UPDATE_MAX_WORKERS"],
+    )
+    _forget_cached_messages(sms.uuid for sms in messages)
+    now: datetime = datetime.utcnow()
+    updated: int = 0
+    failed: int = 0
+    for sms, future in zip(messages, futures):
+        sms.poll_attempts += 1
+        message_update: Optional[ProviderResponse] = (
+            future.result() if future.exception() is None else None
         )
         if message_update is None:
             logger.debug(
                 "No update available for message %s (SID %s)", sms.uuid, sms.twilio_sid
             )
-            continue
+            failed += 1
+        else:
+            if _apply_status_update(sms, message_update):
+                updated += 1
+            logger.debug("Updated message %s (SID %s)", sms.uuid, sms.twilio_sid)
+        _schedule_next_poll(sms, now)
+    return updated, failed
 
-        sms.status = message_update["status"] or sms.status
-        sms.date_sent = message_update["date_sent"] or sms.date_sent
-        sms.error_code = message_update["error_code"] or sms.error_code
-        sms.error_message = message_update["error_code"] or sms.error_message
-        logger.debug("Updated message %s (SID %s)", sms.uuid, sms.twilio_sid)
-    db.session.commit()
 
-    unredacted_messages: List[Message] = (
-        Message.query.filter(Message.status.in_(TWILIO_TERMINAL_SMS_STATUSES))
-        .filter(Message.created > datetime_7_days_ago)
-        .filter(Message.redacted.is_(None))
-        .all()
+def _format_message_key(key: MessageKey) -> str:
+    return f"{key[0].isoformat()},{key[1]}"
+
+
+def _encode_cursor(key: MessageKey) -> str:
+    return base64.urlsafe_b64encode(_format_message_key(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> MessageKey:
+    try:
+        created, uuid = base64.urlsafe_b64decode(cursor.encode()).decode().split(",")
+        return datetime.fromisoformat(created), uuid
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def _apply_status_update(
+    message_model: Message, message_update: ProviderResponse
+) -> bool:
+    """
+    Applies an update from Twilio to a message, returning whether its status changed.
+    """
+    status_changed: bool = _status_supersedes(
+        message_model.status, message_update["status"]
     )
-    logger.info(
-        "Found %d un-redacted complete SMS messages to redact", len(unredacted_messages)
+    if status_changed:
+        message_model.status = message_update["status"]
+        _schedule_redaction(message_model)
+    message_model.date_sent = message_update["date_sent"] or message_model.date_sent
+    message_model.error_code = message_update["error_code"] or message_model.error_code
+    message_model.error_message = (
+        message_update["error_message"] or message_model.error_message
     )
-    for sms in unredacted_messages:
-        logger.debug(
-            "Attempting to redact message %s (SID %s)", sms.uuid, sms.twilio_sid
+    return status_changed
+
+
+def _schedule_next_poll(message_model: Message, now: datetime) -> None:
+    """
+    Sets when the status of a message should next be polled in Twilio, in case its callbacks
+    go missing. Polls back off exponentially with the number of attempts, and are spread out
+    further for older messages, which are less likely to change. Messages with a terminal
+    status, or which would be older than SMS_POLL_GIVE_UP_AFTER seconds by their next poll,
+    aren't polled again.
+    """
+    config = current_app.config
+    if (
+        message_model.twilio_sid is None
+        or message_model.status in TWILIO_TERMINAL_SMS_STATUSES
+    ):
+        message_model.next_poll_at = None
+        return
+
+    created: datetime = message_model.created or now
+    age: float = (now - created.replace(tzinfo=None)).total_seconds()
+    attempts: int = message_model.poll_attempts or 0
+    delay: float = config["SMS_POLL_INITIAL_DELAY"]
+    if attempts > 0:
+        delay = max(
+            config["SMS_POLL_RETRY_DELAY"] * 2 ** (attempts - 1),
+            age * config["SMS_POLL_AGE_FACTOR"],
         )
-        success: bool = twilio_client.redact_message_body(sms.twilio_sid)
-        if success:
-            sms.redacted = datetime.utcnow()
-        else:
-            # Don't raise an exception here because we can retry later.
-            logger.error("Failed to redact message in Twilio")
+    delay = min(delay, config["SMS_POLL_MAX_DELAY"])
+    # A poll due after the give up age would never be picked up (see
+    # `_messages_due_poll_query`), leaving the message in the due poll index for good.
+    if age + delay >= config["SMS_POLL_GIVE_UP_AFTER"]:
+        logger.info(
+            "Giving up polling message %s (SID %s), status %s",
+            message_model.uuid,
+            message_model.twilio_sid,
+            message_model.status,
+        )
+        message_model.next_poll_at = None
+        return
+    message_model.next_poll_at = now + timedelta(seconds=delay)
+
+
+def _schedule_redaction(message_model: Message) -> None:
+    if (
+        message_model.status in TWILIO_TERMINAL_SMS_STATUSES
+        and message_model.redacted is None
+        and message_model.redaction_due is None
+    ):
+        message_model.redaction_due = datetime.utcnow()
+
+
+def _reschedule_redaction(message_model: Message, now: datetime) -> None:
+    attempts: int = message_model.redaction_attempts
+    if attempts >= current_app.config["SMS_REDACTION_MAX_ATTEMPTS"]:
+        logger.error(
+            "Giving up redacting message %s (SID %s) after %d attempts",
+            message_model.uuid,
+            message_model.twilio_sid,
+            attempts,
+        )
+        message_model.redaction_due = None
+        return
+
+    delay: float = min(
+        current_app.config["SMS_REDACTION_RETRY_DELAY"] * 2 ** (attempts - 1),
+        current_app.config["SMS_REDACTION_MAX_RETRY_DELAY"],
+    )
+    logger.error(
+        "Failed to redact message %s in Twilio (attempt %d), retrying in %d seconds",
+        message_model.uuid,
+        attempts,
+        delay,
+    )
+    message_model.redaction_due = now + timedelta(seconds=delay)
+
+
+def _is_permanent_send_failure(cause: Any) -> bool:
+    """
+    Twilio rejects some messages outright (e.g. invalid numbers) with a 4xx response. Retrying
+    those would block the queue, whereas anything else is treated as temporary.
+    """
+    return (
+        isinstance(cause, TwilioRestException)
+        and 400 <= cause.status < 500
+        and cause.status != 429
+    )
+
+
+def _send_failure_reason(error: ServiceUnavailableException) -> str:
+    cause = error.args[0] if error.args else None
+    if isinstance(cause, TwilioRestException):
+        return f"Twilio failed to accept SMS request (status {cause.status}, code {cause.code})"
+    return "Twilio failed to accept SMS request"
+
+
+def _update_message_by_sid(
+    twilio_sid: str, changes: Dict[str, str]
+) -> Optional[Tuple[str, str]]:
+    """
+    Applies changes to the message with the given Twilio SID in one guarded UPDATE (see
+    `_status_update_statement`). Deleted messages are left alone. Returns the uuid and status
+    of the updated message, or None if no row was written.
+    """
+    if not changes:
+        return None
+
+    table = Message.__table__
+    statement: Update = _status_update_statement(
+        changes, table.c.twilio_sid == twilio_sid, table.c.deleted.is_(None)
+    )
+
+    row: Optional[Row]
+    if db.engine.dialect.full_returning:
+        row = db.session.execute(
+            statement.returning(table.c.uuid, table.c.status)
+        ).first()
+    else:
+        # SQLite can't return rows from an UPDATE, so read it back in the same transaction.
+        result = db.session.execute(statement)
+        row = None
+        if result.rowcount:
+            row = db.session.execute(
+                select(table.c.uuid, table.c.status).where(
+                    table.c.twilio_sid == twilio_sid
+                )
+            ).first()
+    if row is not None:
+        _forget_cached_messages([row.uuid])
     db.session.commit()
+
+    return None if row is None else (row.uuid, row.status)
+
+
+def _status_update_statement(changes: Dict[str, Any], *where: Any) -> Update:
+    """
+    Builds an UPDATE applying changes to the messages matching `where`, which only matches a
+    row if the status moves forward or, for a repeated status, at least one of the other
+    columns would change. Terminal statuses also schedule redaction and stop polling.
+    """
+    table = Message.__table__
+    status: Optional[str] = changes.get("status")
+    other_changes = [
+        table.c[column].is_distinct_from(value)
+        for column, value in changes.items()
+        if column != "status"
+    ]
+    if status is None:
+        condition = or_(*other_changes)
+    else:
+        # Stale statuses are dropped along with the rest of the changes, but a repeated
+        # status may still bring new details such as an error code.
+        condition = _status_supersedes_clause(table.c.status, status)
+        if other_changes:
+            condition = or_(
+                condition, and_(table.c.status == status, or_(*other_changes))
+            )
+
+    values: Dict[str, Any] = dict(changes)
+    if status in TWILIO_TERMINAL_SMS_STATUSES:
+        # Redaction is done later by the redaction worker, see `redact_due_messages`.
+        values["redaction_due"] = case(
+            (
+                table.c.redacted.is_(None),
+                func.coalesce(table.c.redaction_due, datetime.utcnow()),
+            ),
+            else_=None,
+        )
+        values["next_poll_at"] = None
+
+    return update(table).where(*where, condition).values(**values)
+
+
+def _status_supersedes(current: Optional[str], new: Optional[str]) -> bool:
+    """
+    Whether a message with the current status should move to the new status.
+    """
+    if not new:
+        return False
+    if current is None:
+        return True
+    current_rank: Optional[int] = SMS_STATUS_RANKS.get(current)
+    new_rank: Optional[int] = SMS_STATUS_RANKS.get(new)
+    if current_rank is None or new_rank is None:
+        return new != current
+    return new_rank > current_rank
+
+
+def _status_supersedes_clause(status_column: ColumnElement, new: str) -> ColumnElement:
+    """
+    SQL equivalent of `_status_supersedes`, for use in a WHERE clause.
+    """
+    new_rank: Optional[int] = SMS_STATUS_RANKS.get(new)
+    if new_rank is None:
+        return status_column.is_distinct_from(new)
+    # A NULL status, or one with no known order, is always superseded.
+    current_rank = func.coalesce(case(SMS_STATUS_RANKS, value=status_column), -1)
+    return current_rank < new_rank
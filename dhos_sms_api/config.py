@@ -9,6 +9,68 @@ class Configuration:
     TWILIO_CALL_BACK_URL: str = env.str("TWILIO_CALL_BACK_URL")
     COUNTRY_CODE: str = env.str("COUNTRY_CODE")
     TWILIO_DISABLED: bool = env.bool("TWILIO_DISABLED", False)
+    TWILIO_HTTP_POOL_SIZE: int = env.int("TWILIO_HTTP_POOL_SIZE", 8)
+    TWILIO_CONNECT_TIMEOUT: float = env.float("TWILIO_CONNECT_TIMEOUT", 3.05)
+    TWILIO_SEND_TIMEOUT: float = env.float("TWILIO_SEND_TIMEOUT", 10.0)
+    TWILIO_FETCH_TIMEOUT: float = env.float("TWILIO_FETCH_TIMEOUT", 5.0)
+    TWILIO_REDACT_TIMEOUT: float = env.float("TWILIO_REDACT_TIMEOUT", 5.0)
+    TWILIO_LIST_PAGE_SIZE: int = env.int("TWILIO_LIST_PAGE_SIZE", 500)
+    TWILIO_RATE_LIMIT: float = env.float("TWILIO_RATE_LIMIT", 50.0)
+    TWILIO_CIRCUIT_BREAKER_FAILURE_RATE: float = env.float(
+        "TWILIO_CIRCUIT_BREAKER_FAILURE_RATE", 0.5
+    )
+    TWILIO_CIRCUIT_BREAKER_MINIMUM_CALLS: int = env.int(
+        "TWILIO_CIRCUIT_BREAKER_MINIMUM_CALLS", 10
+    )
+    TWILIO_CIRCUIT_BREAKER_WINDOW: float = env.float(
+        "TWILIO_CIRCUIT_BREAKER_WINDOW", 60.0
+    )
+    TWILIO_CIRCUIT_BREAKER_RESET_TIMEOUT: float = env.float(
+        "TWILIO_CIRCUIT_BREAKER_RESET_TIMEOUT", 30.0
+    )
+    TWILIO_CIRCUIT_BREAKER_DIVERT_TO_QUEUE: bool = env.bool(
+        "TWILIO_CIRCUIT_BREAKER_DIVERT_TO_QUEUE", False
+    )
+    SMS_FAST_JSON: bool = env.bool("SMS_FAST_JSON", True)
+    SMS_BATCH_MAX_WORKERS: int = env.int("SMS_BATCH_MAX_WORKERS", 8)
+    SMS_BULK_UPDATE_MAX_WORKERS: int = env.int("SMS_BULK_UPDATE_MAX_WORKERS", 8)
+    SMS_BULK_UPDATE_RECONCILE_FROM_LIST: bool = env.bool(
+        "SMS_BULK_UPDATE_RECONCILE_FROM_LIST", False
+    )
+    SMS_BULK_UPDATE_RECONCILE_MAX_PAGES: int = env.int(
+        "SMS_BULK_UPDATE_RECONCILE_MAX_PAGES", 20
+    )
+    SMS_BULK_UPDATE_CHUNK_SIZE: int = env.int("SMS_BULK_UPDATE_CHUNK_SIZE", 500)
+    SMS_BULK_UPDATE_JOB_TIMEOUT: float = env.float("SMS_BULK_UPDATE_JOB_TIMEOUT", 900.0)
+    SMS_POLL_INITIAL_DELAY: float = env.float("SMS_POLL_INITIAL_DELAY", 300.0)
+    SMS_POLL_RETRY_DELAY: float = env.float("SMS_POLL_RETRY_DELAY", 300.0)
+    SMS_POLL_MAX_DELAY: float = env.float("SMS_POLL_MAX_DELAY", 21600.0)
+    SMS_POLL_AGE_FACTOR: float = env.float("SMS_POLL_AGE_FACTOR", 0.1)
+    SMS_POLL_GIVE_UP_AFTER: float = env.float("SMS_POLL_GIVE_UP_AFTER", 604800.0)
+    SMS_QUEUED_SEND: bool = env.bool("SMS_QUEUED_SEND", False)
+    SMS_SEND_WORKER_BATCH_SIZE: int = env.int("SMS_SEND_WORKER_BATCH_SIZE", 10)
+    SMS_SEND_WORKER_POLL_INTERVAL: float = env.float(
+        "SMS_SEND_WORKER_POLL_INTERVAL", 1.0
+    )
+    SMS_LIST_DEFAULT_PAGE_SIZE: int = env.int("SMS_LIST_DEFAULT_PAGE_SIZE", 500)
+    SMS_LIST_MAX_PAGE_SIZE: int = env.int("SMS_LIST_MAX_PAGE_SIZE", 2000)
+    SMS_LIST_STREAM_BATCH_SIZE: int = env.int("SMS_LIST_STREAM_BATCH_SIZE", 1000)
+    SMS_CALLBACK_CACHE_SIZE: int = env.int("SMS_CALLBACK_CACHE_SIZE", 10000)
+    SMS_MESSAGE_CACHE_SIZE: int = env.int("SMS_MESSAGE_CACHE_SIZE", 10000)
+    SMS_MESSAGE_CACHE_TTL: float = env.float("SMS_MESSAGE_CACHE_TTL", 5.0)
+    SMS_MESSAGE_CACHE_TERMINAL_TTL: float = env.float(
+        "SMS_MESSAGE_CACHE_TERMINAL_TTL", 300.0
+    )
+    SMS_REDACTION_BATCH_SIZE: int = env.int("SMS_REDACTION_BATCH_SIZE", 50)
+    SMS_REDACTION_MAX_WORKERS: int = env.int("SMS_REDACTION_MAX_WORKERS", 4)
+    SMS_REDACTION_MAX_ATTEMPTS: int = env.int("SMS_REDACTION_MAX_ATTEMPTS", 10)
+    SMS_REDACTION_RETRY_DELAY: float = env.float("SMS_REDACTION_RETRY_DELAY", 60.0)
+    SMS_REDACTION_MAX_RETRY_DELAY: float = env.float(
+        "SMS_REDACTION_MAX_RETRY_DELAY", 3600.0
+    )
+    SMS_REDACTION_WORKER_POLL_INTERVAL: float = env.float(
+        "SMS_REDACTION_WORKER_POLL_INTERVAL", 5.0
+    )
 
 
 def init_config(app: Flask) -> None:
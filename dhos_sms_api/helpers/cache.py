@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from flask import current_app
+
+CACHE_EXTENSION_NAME = "sms_caches"
+
+_cache_lock = threading.Lock()
+
+
+class LRUCache:
+    """
+    A bounded mapping which discards the least recently used entry once it holds `maxsize`
+    entries. Entries may also be given a time to live in seconds, after which they are
+    discarded when next looked up. Lookups are counted as hits or misses.
+
+    Instances are thread-safe.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Values and when they expire (a time.monotonic value), if ever.
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = (
+            OrderedDict()
+        )
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Optional[Any]:
+        with self._lock:
+            if not self._lookup(key):
+                return default
+            return self._entries[key][0]
+
+    def put(
+        self, key: Hashable, value: Any = True, ttl: Optional[float] = None
+    ) -> None:
+        if self.maxsize <= 0:
+            return
+        expires: Optional[float] = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _lookup(self, key: Hashable) -> bool:
+        # Must be called with the lock held.
+        entry: Optional[Tuple[Any, Optional[float]]] = self._entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return False
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return True
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._lookup(key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def get_cache(name: str, maxsize: int) -> LRUCache:
+    """
+    Gets the named cache belonging to the current app, creating it on first use. Caches are
+    per process, so they must only be used where a stale or missing entry is harmless.
+    """
+    caches: Dict[str, LRUCache] = current_app.extensions.setdefault(
+        CACHE_EXTENSION_NAME, {}
+    )
+    cache: Optional[LRUCache] = caches.get(name)
+    if cache is None:
+        with _cache_lock:
+            cache = caches.get(name)
+            if cache is None:
+                cache = LRUCache(maxsize)
+                caches[name] = cache
+    return cache
+
+
+def cache_status() -> Dict[str, Dict[str, int]]:
+    """
+    The size and hit/miss counts of each of the current app's caches in this process.
+    """
+    caches: Dict[str, LRUCache] = current_app.extensions.get(CACHE_EXTENSION_NAME, {})
+    return {name: cache.stats() for name, cache in sorted(caches.items())}
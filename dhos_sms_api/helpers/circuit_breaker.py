@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple, Union
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Tracks the outcome of recent calls to a dependency. When the failure rate within the window
+    reaches the threshold the circuit opens and calls are refused, so that callers fail fast
+    instead of waiting on an unhealthy dependency. After `reset_timeout` seconds a single probe
+    call is allowed through (half open): if it succeeds the circuit closes, otherwise it opens
+    again.
+
+    Instances are thread-safe.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float,
+        minimum_calls: int,
+        window: float,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._state: str = STATE_CLOSED
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight: bool = False
+        self._probe_thread: Optional[int] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._check_reset_timeout()
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            self._check_reset_timeout()
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._probe_thread = threading.get_ident()
+                return True
+            return False
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        Wraps a call allowed by `allow_request`, whose outcome is recorded within the block. If
+        the call is the half open probe and ends without recording an outcome (e.g. it raised
+        an unexpected exception), it counts as a failure, so that the circuit breaker doesn't
+        wait forever for the probe.
+        """
+        try:
+            yield
+        finally:
+            with self._lock:
+                if (
+                    self._state == STATE_HALF_OPEN
+                    and self._probe_in_flight
+                    and self._probe_thread == threading.get_ident()
+                ):
+                    self._open()
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._close()
+            self._record(success=True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._open()
+                return
+            self._record(success=False)
+            calls, failures = self._counts()
+            if (
+                self._state == STATE_CLOSED
+                and calls >= self.minimum_calls
+                and failures / calls >= self.failure_rate_threshold
+            ):
+                self._open()
+
+    def status(self) -> Dict[str, Union[str, int, float, None]]:
+        with self._lock:
+            self._check_reset_timeout()
+            self._prune()
+            calls, failures = self._counts()
+            return {
+                "state": self._state,
+                "calls": calls,
+                "failures": failures,
+                "failure_rate": failures / calls if calls else 0.0,
+                "seconds_until_probe": None
+                if self._state != STATE_OPEN or self._opened_at is None
+                else max(0.0, self._opened_at + self.reset_timeout - self._clock()),
+            }
+
+    def _record(self, success: bool) -> None:
+        self._outcomes.append((self._clock(), success))
+        self._prune()
+
+    def _prune(self) -> None:
+        oldest: float = self._clock() - self.window
+        while self._outcomes and self._outcomes[0][0] < oldest:
+            self._outcomes.popleft()
+
+    def _counts(self) -> Tuple[int, int]:
+        failures: int = sum(1 for _, success in self._outcomes if not success)
+        return len(self._outcomes), failures
+
+    def _check_reset_timeout(self) -> None:
+        if (
+            self._state == STATE_OPEN
+            and self._opened_at is not None
+            and self._clock() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = STATE_HALF_OPEN
+            self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self._state = STATE_OPEN
+        self._opened_at = self._clock()
+        self._probe_in_flight = False
+
+    def _close(self) -> None:
+        self._state = STATE_CLOSED
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._outcomes.clear()
@@ -1,8 +1,16 @@
+import time
+from datetime import timedelta
+from typing import Optional
+
 import click
-from flask import Flask
+from flask import Flask, current_app
 from flask_batteries_included.helpers.apispec import generate_openapi_spec
 
 from dhos_sms_api import blueprint_api
+from dhos_sms_api.blueprint_api import controller
+from dhos_sms_api.helpers.locks import try_advisory_lock
+from dhos_sms_api.helpers.redaction_worker import run_redaction_worker
+from dhos_sms_api.helpers.send_worker import run_send_worker
 from dhos_sms_api.models.api_spec import dhos_sms_api_spec
 
 
@@ -11,3 +19,107 @@ def add_cli_command(app: Flask) -> None:
     @click.argument("output", type=click.Path())
     def create_api(output: str) -> None:
         generate_openapi_spec(dhos_sms_api_spec, output, blueprint_api.api_blueprint)
+
+    @app.cli.command("send-worker")
+    @click.option("--batch-size", type=int, help="Messages to send per transaction")
+    @click.option("--poll-interval", type=float, help="Seconds to wait when idle")
+    @click.option("--once", is_flag=True, help="Exit when there is nothing to send")
+    def send_worker(
+        batch_size: Optional[int], poll_interval: Optional[float], once: bool
+    ) -> None:
+        """Send pending SMS messages to Twilio."""
+        run_send_worker(
+            batch_size=batch_size or current_app.config["SMS_SEND_WORKER_BATCH_SIZE"],
+            poll_interval=poll_interval
+            or current_app.config["SMS_SEND_WORKER_POLL_INTERVAL"],
+            once=once,
+        )
+
+    @app.cli.command("redaction-worker")
+    @click.option("--batch-size", type=int, help="Messages to redact per transaction")
+    @click.option("--poll-interval", type=float, help="Seconds to wait when idle")
+    @click.option("--once", is_flag=True, help="Exit when there is nothing to redact")
+    def redaction_worker(
+        batch_size: Optional[int], poll_interval: Optional[float], once: bool
+    ) -> None:
+        """Redact the bodies of complete SMS messages in Twilio."""
+        run_redaction_worker(
+            batch_size=batch_size or current_app.config["SMS_REDACTION_BATCH_SIZE"],
+            poll_interval=poll_interval
+            or current_app.config["SMS_REDACTION_WORKER_POLL_INTERVAL"],
+            once=once,
+        )
+
+    @app.cli.group("sms")
+    def sms() -> None:
+        """Run sweeps over SMS messages, e.g. from a cron job."""
+
+    @sms.command("reconcile")
+    @click.option(
+        "--window", type=float, help="Only poll messages created in the last N hours"
+    )
+    @click.option("--batch-size", type=int, help="Messages to poll per transaction")
+    @click.option("--max-workers", type=int, help="Requests to Twilio to make at once")
+    @click.option("--dry-run", is_flag=True, help="Count the messages due a poll")
+    def reconcile(
+        window: Optional[float],
+        batch_size: Optional[int],
+        max_workers: Optional[int],
+        dry_run: bool,
+    ) -> None:
+        """Poll Twilio for the status of incomplete SMS messages."""
+        window_delta: Optional[timedelta] = _hours(window)
+        if dry_run:
+            due: int = controller.count_messages_due_poll(window=window_delta)
+            click.echo(f"{due} SMS messages are due a status poll")
+            return
+        with try_advisory_lock(controller.BULK_UPDATE_LOCK_NAME) as acquired:
+            if not acquired:
+                raise click.ClickException("Another bulk update is running")
+            start: float = time.monotonic()
+            progress: controller.BulkUpdateProgress = controller.poll_due_messages(
+                window=window_delta, chunk_size=batch_size, max_workers=max_workers
+            )
+        click.echo(
+            f"Polled {progress['polled']} SMS messages"
+            f" ({progress['updated']} updated, {progress['failed']} failed)"
+            f" {_throughput(progress['polled'], time.monotonic() - start)}"
+        )
+
+    @sms.command("redact")
+    @click.option(
+        "--window", type=float, help="Only redact messages created in the last N hours"
+    )
+    @click.option("--batch-size", type=int, help="Messages to redact per transaction")
+    @click.option("--max-workers", type=int, help="Requests to Twilio to make at once")
+    @click.option("--dry-run", is_flag=True, help="Count the messages due redaction")
+    def redact(
+        window: Optional[float],
+        batch_size: Optional[int],
+        max_workers: Optional[int],
+        dry_run: bool,
+    ) -> None:
+        """Redact the bodies of complete SMS messages in Twilio."""
+        window_delta: Optional[timedelta] = _hours(window)
+        if dry_run:
+            due: int = controller.count_messages_due_redaction(window=window_delta)
+            click.echo(f"{due} SMS messages are due redaction")
+            return
+        start: float = time.monotonic()
+        progress: controller.BulkUpdateProgress = controller.redact_all_due_messages(
+            window=window_delta, batch_size=batch_size, max_workers=max_workers
+        )
+        attempted: int = progress["redacted"] + progress["failed"]
+        click.echo(
+            f"Redacted {progress['redacted']} SMS messages ({progress['failed']} failed)"
+            f" {_throughput(attempted, time.monotonic() - start)}"
+        )
+
+
+def _hours(hours: Optional[float]) -> Optional[timedelta]:
+    return None if hours is None else timedelta(hours=hours)
+
+
+def _throughput(count: int, elapsed: float) -> str:
+    rate: float = count / elapsed if elapsed > 0 else 0.0
+    return f"in {elapsed:.1f}s ({rate:.1f} messages/s)"
@@ -0,0 +1,44 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Sequence, TypeVar
+
+from flask import Flask, current_app
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def run_in_threads(
+    func: Callable[[T], R], items: Sequence[T], max_workers: int
+) -> List["Future[R]"]:
+    """
+    Calls `func` for each item using a bounded pool of threads, each running inside the current
+    app context. Blocks until every call has finished and returns the completed futures in the
+    same order as `items`, so callers can handle exceptions per item.
+
+    `func` should only do I/O such as calling Twilio; database work belongs in the calling thread.
+    """
+    app: Flask = current_app._get_current_object()  # type: ignore
+
+    def _call(item: T) -> R:
+        with app.app_context():
+            return func(item)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return [executor.submit(_call, item) for item in items]
+
+
+def run_in_background(func: Callable[..., Any], *args: Any) -> threading.Thread:
+    """
+    Calls `func` in a new daemon thread running inside the current app context, for work that
+    shouldn't hold up the request that started it. The thread has its own database session.
+    """
+    app: Flask = current_app._get_current_object()  # type: ignore
+
+    def _call() -> None:
+        with app.app_context():
+            func(*args)
+
+    thread = threading.Thread(target=_call, name=func.__name__, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,110 @@
+import re
+from datetime import date, datetime, timedelta
+from typing import Any, Match, Optional, Union
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from flask_batteries_included.helpers.timestamp import (
+    parse_date_to_iso8601,
+    parse_datetime_to_iso8601_typesafe,
+)
+from she_logging import logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+# The separators used by jsonify for compact output, which is what orjson produces.
+COMPACT_SEPARATORS = (",", ":")
+
+# Characters escaped when ensure_ascii is set, as the json module would.
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Serialises compact JSON (as jsonify produces outside debug mode) with orjson when it is
+    installed, falling back to the json module otherwise. The output is identical to the
+    default provider's with the flask-batteries-included encoder: datetimes and dates in
+    ISO8601 with milliseconds, UUIDs as strings, sorted keys and ASCII-only output (unless
+    configured otherwise). Anything else, such as indented output, non-string keys or
+    integers too big for orjson, also falls back to the json module.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if not self._use_orjson() or kwargs != {"separators": COMPACT_SEPARATORS}:
+            return super().dumps(obj, **kwargs)
+        option: int = orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            data: str = orjson.dumps(obj, default=_default, option=option).decode()
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+        if self.ensure_ascii and not data.isascii():
+            data = _NON_ASCII.sub(_escape_non_ascii, data)
+        return data
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if not self._use_orjson() or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def _use_orjson(self) -> bool:
+        # The deprecated config keys override the provider's attributes, so leave them
+        # to the default implementation.
+        return (
+            orjson is not None
+            and self._app.config["JSON_SORT_KEYS"] is None
+            and self._app.config["JSON_AS_ASCII"] is None
+        )
+
+
+def init_json_provider(app: Flask) -> None:
+    if not app.config["SMS_FAST_JSON"]:
+        return
+    app.json = FastJSONProvider(app)
+    logger.info(
+        "Using %s to serialise JSON", "orjson" if orjson is not None else "json module"
+    )
+
+
+def _default(obj: Any) -> Any:
+    # The same formats as flask-batteries-included's CustomJSONEncoder.
+    if isinstance(obj, datetime):
+        return _format_datetime(obj)
+    if isinstance(obj, date):
+        return parse_date_to_iso8601(obj)
+    return DefaultJSONProvider.default(obj)
+
+
+def _format_datetime(dt: datetime) -> str:
+    """
+    A quicker equivalent of `parse_datetime_to_iso8601` for the naive and UTC datetimes
+    stored by the API, e.g. 2000-01-01T01:01:01.123Z.
+    """
+    offset: Optional[timedelta] = dt.utcoffset()
+    if offset or dt.year < 1000:
+        return parse_datetime_to_iso8601_typesafe(dt)
+    return "%04d-%02d-%02dT%02d:%02d:%02d.%03d%s" % (
+        dt.year,
+        dt.month,
+        dt.day,
+        dt.hour,
+        dt.minute,
+        dt.second,
+        dt.microsecond // 1000,
+        "" if offset is None else "Z",
+    )
+
+
+def _escape_non_ascii(match: Match) -> str:
+    code: int = ord(match.group())
+    if code > 0xFFFF:
+        # Characters outside the BMP are written as a surrogate pair.
+        code -= 0x10000
+        return "\\u{0:04x}\\u{1:04x}".format(
+            0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF)
+        )
+    return "\\u{0:04x}".format(code)
@@ -0,0 +1,61 @@
+import hashlib
+from contextlib import contextmanager
+from typing import Iterator
+
+from flask_batteries_included.sqldb import db
+from she_logging import logger
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+@contextmanager
+def try_advisory_lock(name: str) -> Iterator[bool]:
+    """
+    Tries to take a Postgres advisory lock shared by every replica of the service, yielding
+    whether it was acquired. The lock is held on a dedicated connection rather than the session
+    so that it survives commits, and is released when the block exits (or the connection is
+    lost). Other databases don't support advisory locks, so the lock is always acquired.
+    """
+    if db.engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    key: int = _lock_key(name)
+    # Autocommit, so the connection isn't left idle in a transaction while the lock is held.
+    connection: Connection = db.engine.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    )
+    try:
+        acquired: bool = connection.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": key}
+        ).scalar()
+        if not acquired:
+            logger.info("Advisory lock %s is held by another process", name)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": key}
+                )
+    finally:
+        connection.close()
+
+
+def advisory_xact_lock(name: str) -> None:
+    """
+    Takes a Postgres advisory lock for the rest of the session's current transaction, waiting
+    for any other transaction holding it. Does nothing on other databases.
+    """
+    if db.engine.dialect.name != "postgresql":
+        return
+    db.session.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"), {"key": _lock_key(name)}
+    )
+
+
+def _lock_key(name: str) -> int:
+    # Advisory locks are identified by a signed 64 bit integer.
+    return int.from_bytes(
+        hashlib.sha256(name.encode()).digest()[:8], "big", signed=True
+    )
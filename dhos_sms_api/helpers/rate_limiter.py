@@ -0,0 +1,51 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class RateLimiter:
+    """
+    Token bucket limiting how often an action may be performed. Up to `burst` actions may happen
+    at once, after which they are spread out at `rate` per second. A rate of zero or less
+    disables the limit.
+
+    Instances are thread-safe.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.burst = max(1.0, rate if burst is None else burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens: float = self.burst
+        self._updated: float = clock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until the action may be performed, returning True. If that would take longer
+        than `timeout` seconds, returns False straight away instead.
+        """
+        if self.rate <= 0:
+            return True
+        deadline: Optional[float] = None if timeout is None else self._clock() + timeout
+        while True:
+            with self._lock:
+                now: float = self._clock()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait: float = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            self._sleep(wait)
@@ -0,0 +1,25 @@
+import time
+
+from she_logging import logger
+
+from dhos_sms_api.blueprint_api import controller
+
+
+def run_redaction_worker(
+    batch_size: int, poll_interval: float, once: bool = False
+) -> None:
+    """
+    Redacts the bodies of complete SMS messages in Twilio as they become due. When nothing is
+    due the worker sleeps for `poll_interval` seconds before looking again. If `once` is set
+    the worker exits as soon as nothing is due.
+    """
+    logger.info("Starting SMS redaction worker (batch size %d)", batch_size)
+    while True:
+        processed: int = controller.redact_due_messages(batch_size=batch_size)
+        if processed:
+            logger.info("Attempted to redact %d SMS messages", processed)
+            continue
+        if once:
+            break
+        time.sleep(poll_interval)
+    logger.info("SMS redaction worker finished")
@@ -0,0 +1,23 @@
+import time
+
+from she_logging import logger
+
+from dhos_sms_api.blueprint_api import controller
+
+
+def run_send_worker(batch_size: int, poll_interval: float, once: bool = False) -> None:
+    """
+    Drains pending SMS messages, sending them to Twilio. When the queue is empty the worker
+    sleeps for `poll_interval` seconds before looking again. If `once` is set the worker
+    exits as soon as the queue is empty.
+    """
+    logger.info("Starting SMS send worker (batch size %d)", batch_size)
+    while True:
+        processed: int = controller.send_pending_messages(batch_size=batch_size)
+        if processed:
+            logger.info("Processed %d pending SMS messages", processed)
+            continue
+        if once:
+            break
+        time.sleep(poll_interval)
+    logger.info("SMS send worker finished")
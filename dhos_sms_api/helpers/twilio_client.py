@@ -1,17 +1,170 @@
+import atexit
+import socket
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Optional, TypedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TypedDict, Union
+from weakref import WeakSet
 
-from flask import current_app
+from flask import Flask, current_app
 from flask_batteries_included.config import is_not_production_environment
 from flask_batteries_included.helpers import generate_uuid
 from flask_batteries_included.helpers.error_handler import ServiceUnavailableException
+from requests import PreparedRequest, Response, Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectTimeout, ReadTimeout, RequestException
 from she_logging import logger
-from twilio.base.exceptions import TwilioRestException
+from twilio.base.exceptions import TwilioException, TwilioRestException
+from twilio.http.http_client import TwilioHttpClient
 from twilio.request_validator import RequestValidator
 from twilio.rest import Client
-from twilio.rest.api.v2010.account.message import MessageInstance
+from twilio.rest.api.v2010.account.message import MessageInstance, MessagePage
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from dhos_sms_api.helpers.circuit_breaker import STATE_OPEN, CircuitBreaker
+from dhos_sms_api.helpers.rate_limiter import RateLimiter
 
 SECURITY_HEADER_NAME = "X-Twilio-Signature"
+CLIENT_EXTENSION_NAME = "twilio_client"
+SESSION_EXTENSION_NAME = "twilio_session"
+CIRCUIT_BREAKER_EXTENSION_NAME = "twilio_circuit_breakers"
+RATE_LIMITER_EXTENSION_NAME = "twilio_rate_limiter"
+
+# Operations performed against Twilio, each of which has its own timeout.
+OPERATION_SEND = "send"
+OPERATION_FETCH = "fetch"
+OPERATION_REDACT = "redact"
+OPERATION_TIMEOUT_CONFIG = {
+    OPERATION_SEND: "TWILIO_SEND_TIMEOUT",
+    OPERATION_FETCH: "TWILIO_FETCH_TIMEOUT",
+    OPERATION_REDACT: "TWILIO_REDACT_TIMEOUT",
+}
+
+_client_lock = threading.Lock()
+
+# The deadline of the Twilio operation in progress on each thread, see `_operation_deadline`.
+_deadlines = threading.local()
+
+# Apps whose Twilio clients are closed on exit. They are weakly referenced so that apps which
+# are finished with (e.g. in tests) can still be garbage collected.
+_apps: "WeakSet[Flask]" = WeakSet()
+
+
+class CircuitOpenException(ServiceUnavailableException):
+    """
+    Raised instead of calling Twilio while the circuit breaker for the operation is open.
+    """
+
+
+class _DeadlineAdapter(HTTPAdapter):
+    """
+    Holds each request to the deadline of the Twilio operation in progress on the current
+    thread, if any. requests' timeouts only bound connecting and each socket read, so a
+    response that trickles in could otherwise take far longer. When the deadline passes, the
+    sockets used by the request are shut down, which ends any read in progress.
+    """
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _WatchedHTTPConnectionPool,
+            "https": _WatchedHTTPSConnectionPool,
+        }
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Response:
+        deadline: Optional[float] = getattr(_deadlines, "deadline", None)
+        if deadline is None:
+            return super().send(request, stream, timeout, *args, **kwargs)
+        remaining: float = deadline - time.monotonic()
+        if remaining <= 0:
+            raise ConnectTimeout("Twilio operation deadline exceeded", request=request)
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        timeout = (
+            remaining if connect is None else min(connect, remaining),
+            remaining if read is None else min(read, remaining),
+        )
+        sockets: List[socket.socket] = []
+        _deadlines.sockets = sockets
+        timer = threading.Timer(remaining, _abort_sockets, args=(sockets,))
+        timer.daemon = True
+        timer.start()
+        try:
+            response: Response = super().send(request, stream, timeout, *args, **kwargs)
+            if not stream:
+                # Read the body before the deadline is lifted, rather than in the session.
+                response.content
+                if time.monotonic() >= deadline:
+                    # The body may have been cut short without an error.
+                    response.close()
+                    raise ReadTimeout(
+                        "Twilio operation deadline exceeded", request=request
+                    )
+            return response
+        except RequestException as e:
+            if time.monotonic() >= deadline:
+                raise ReadTimeout(
+                    "Twilio operation deadline exceeded", request=request
+                ) from e
+            raise
+        finally:
+            timer.cancel()
+            _deadlines.sockets = None
+
+
+class _WatchedHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        super().connect()
+        _watch_socket(self.sock)
+
+    def request(self, *args: Any, **kwargs: Any) -> None:
+        if self.sock is not None:
+            _watch_socket(self.sock)
+        super().request(*args, **kwargs)
+
+
+class _WatchedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        super().connect()
+        _watch_socket(self.sock)
+
+    def request(self, *args: Any, **kwargs: Any) -> None:
+        if self.sock is not None:
+            _watch_socket(self.sock)
+        super().request(*args, **kwargs)
+
+
+class _WatchedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _WatchedHTTPConnection
+
+
+class _WatchedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _WatchedHTTPSConnection
+
+
+def _watch_socket(sock: socket.socket) -> None:
+    """
+    Records a socket used by a request which is being held to a deadline, if any.
+    """
+    sockets: Optional[List[socket.socket]] = getattr(_deadlines, "sockets", None)
+    if sockets is not None:
+        sockets.append(sock)
+
+
+def _abort_sockets(sockets: List[socket.socket]) -> None:
+    for sock in list(sockets):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
 
 
 class ProviderResponse(TypedDict):
@@ -22,6 +175,28 @@ class ProviderResponse(TypedDict):
     error_message: Optional[str]
 
 
+def init_twilio_client(app: Flask) -> None:
+    """
+    The Twilio clients are created on first use and shared by all threads in the process, so that
+    requests to Twilio reuse pooled keep-alive connections. Make sure they are closed on exit.
+    """
+    _apps.add(app)
+
+
+@atexit.register
+def _close_twilio_clients() -> None:
+    for app in list(_apps):
+        close_twilio_client(app)
+
+
+def close_twilio_client(app: Flask) -> None:
+    with _client_lock:
+        app.extensions.pop(CLIENT_EXTENSION_NAME, None)
+        session: Optional[Session] = app.extensions.pop(SESSION_EXTENSION_NAME, None)
+    if session is not None:
+        session.close()
+
+
 def send_message(phone_number: str, content: str, sender: str) -> ProviderResponse:
     if (
         is_not_production_environment()
@@ -29,29 +204,40 @@ def send_message(phone_number: str, content: str, sender: str) -> ProviderRespon
     ):
         logger.info("Skipping Twilio request due to config")
         return _generate_mock_response()
-    client = Client(
-        current_app.config["TWILIO_ACCOUNT_SID"],
-        current_app.config["TWILIO_AUTH_TOKEN"],
-    )
-    try:
-        message: MessageInstance = client.messages.create(
-            phone_number,
-            body=content,
-            from_=sender,
-            status_callback=current_app.config["TWILIO_CALL_BACK_URL"],
-        )
-    except TwilioRestException as e:
-        logger.exception(
-            "Twilio failed to accept SMS request (status %d, code %d)", e.status, e.code
-        )
-        raise ServiceUnavailableException(e)
-    response: ProviderResponse = {
-        "status": None if message.status is None else str(message.status),
-        "twilio_sid": message.sid,
-        "date_sent": None if message.date_sent is None else str(message.date_sent),
-        "error_code": message.error_code,
-        "error_message": message.error_message,
-    }
+    deadline: float = _get_deadline(OPERATION_SEND)
+    circuit_breaker: CircuitBreaker = _get_circuit_breaker(OPERATION_SEND)
+    if not circuit_breaker.allow_request():
+        logger.warning("Not sending SMS request to Twilio, circuit breaker is open")
+        raise CircuitOpenException("Twilio circuit breaker is open")
+    with circuit_breaker.guard():
+        if not _acquire_rate_limit(deadline):
+            logger.warning(
+                "Not sending SMS request to Twilio, rate limit wait too long"
+            )
+            raise ServiceUnavailableException("Timed out waiting for Twilio rate limit")
+        client: Client = _get_client(OPERATION_SEND)
+        try:
+            with _operation_deadline(deadline):
+                message: MessageInstance = client.messages.create(
+                    phone_number,
+                    body=content,
+                    from_=sender,
+                    status_callback=current_app.config["TWILIO_CALL_BACK_URL"],
+                )
+        except TwilioRestException as e:
+            _record_twilio_error(circuit_breaker, e)
+            logger.exception(
+                "Twilio failed to accept SMS request (status %d, code %d)",
+                e.status,
+                e.code,
+            )
+            raise ServiceUnavailableException(e)
+        except RequestException as e:
+            circuit_breaker.record_failure()
+            logger.exception("Could not send SMS request to Twilio in time")
+            raise ServiceUnavailableException(e)
+        circuit_breaker.record_success()
+    response: ProviderResponse = _to_provider_response(message)
     logger.debug(
         "Sent message to Twilio (SID %s)",
         message.sid,
@@ -62,7 +248,8 @@ def send_message(phone_number: str, content: str, sender: str) -> ProviderRespon
 
 def get_message(twilio_sid: str) -> Optional[ProviderResponse]:
     """
-    Gets an update dict from the Twilio API. Returns `None` if there was an error getting the update.
+    Gets an update dict from the Twilio API. Returns `None` if there was an error getting the
+    update (including timeouts), in which case the update should be retried later.
     """
     if (
         is_not_production_environment()
@@ -70,26 +257,35 @@ def get_message(twilio_sid: str) -> Optional[ProviderResponse]:
     ):
         logger.info("Skipping Twilio request due to config")
         return _generate_mock_response(twilio_sid)
-    client: Client = Client(
-        current_app.config["TWILIO_ACCOUNT_SID"],
-        current_app.config["TWILIO_AUTH_TOKEN"],
-    )
-    try:
-        message: MessageInstance = client.messages.get(twilio_sid).fetch()
-    except TwilioRestException:
-        logger.warning(
-            "Could not get updated status from Twilio for SID %s (error %s)",
+    deadline: float = _get_deadline(OPERATION_FETCH)
+    circuit_breaker: CircuitBreaker = _get_circuit_breaker(OPERATION_FETCH)
+    if not circuit_breaker.allow_request():
+        logger.debug(
+            "Not getting status from Twilio for SID %s, circuit breaker is open",
             twilio_sid,
-            exc_info=True,
         )
         return None
-    response: ProviderResponse = {
-        "status": None if message.status is None else str(message.status),
-        "twilio_sid": message.sid,
-        "date_sent": None if message.date_sent is None else str(message.date_sent),
-        "error_code": message.error_code,
-        "error_message": message.error_message,
-    }
+    with circuit_breaker.guard():
+        if not _acquire_rate_limit(deadline):
+            logger.debug(
+                "Not getting status from Twilio for SID %s, rate limit wait too long",
+                twilio_sid,
+            )
+            return None
+        client: Client = _get_client(OPERATION_FETCH)
+        try:
+            with _operation_deadline(deadline):
+                message: MessageInstance = client.messages.get(twilio_sid).fetch()
+        except (TwilioRestException, RequestException) as e:
+            _record_twilio_error(circuit_breaker, e)
+            logger.warning(
+                "Could not get updated status from Twilio for SID %s, will retry later",
+                twilio_sid,
+                exc_info=True,
+            )
+            return None
+        circuit_breaker.record_success()
+    response: ProviderResponse = _to_provider_response(message)
     logger.debug(
         "Got message from Twilio (SID %s)",
         message.sid,
@@ -98,30 +294,123 @@ def get_message(twilio_sid: str) -> Optional[ProviderResponse]:
     return response
 
 
+def list_messages(date_sent_after: datetime) -> Iterator[List[ProviderResponse]]:
+    """
+    Lists the messages sent since `date_sent_after` from the Twilio API, yielding a page
+    (TWILIO_LIST_PAGE_SIZE messages) at a time. Stops early if there is an error getting a
+    page, in which case the remaining messages should be fetched individually later.
+    """
+    if (
+        is_not_production_environment()
+        and current_app.config["TWILIO_DISABLED"] is True
+    ):
+        logger.info("Skipping Twilio request due to config")
+        return
+    circuit_breaker: CircuitBreaker = _get_circuit_breaker(OPERATION_FETCH)
+    client: Client = _get_client(OPERATION_FETCH)
+    page: Optional[MessagePage] = None
+    while True:
+        deadline: float = _get_deadline(OPERATION_FETCH)
+        if not circuit_breaker.allow_request():
+            logger.debug("Not listing messages in Twilio, circuit breaker is open")
+            return
+        with circuit_breaker.guard():
+            if not _acquire_rate_limit(deadline):
+                logger.debug("Not listing messages in Twilio, rate limit wait too long")
+                return
+            try:
+                with _operation_deadline(deadline):
+                    if page is None:
+                        page = client.messages.page(
+                            date_sent_after=date_sent_after,
+                            page_size=current_app.config["TWILIO_LIST_PAGE_SIZE"],
+                        )
+                    else:
+                        page = page.next_page()
+            except (TwilioException, RequestException) as e:
+                # Twilio raises a plain TwilioException for error responses to list requests.
+                _record_twilio_error(circuit_breaker, e)
+                logger.warning(
+                    "Could not list messages in Twilio, will retry later", exc_info=True
+                )
+                return
+            circuit_breaker.record_success()
+        responses: List[ProviderResponse] = [
+            _to_provider_response(message) for message in page
+        ]
+        logger.debug("Listed %d messages in Twilio", len(responses))
+        yield responses
+        if page.next_page_url is None:
+            return
+
+
 def redact_message_body(twilio_sid: str) -> bool:
+    """
+    Removes the body of a message in Twilio, returning whether it worked. Raises
+    CircuitOpenException without calling Twilio if the circuit breaker is open, as that
+    shouldn't count as a failed attempt.
+    """
     if (
         is_not_production_environment()
         and current_app.config["TWILIO_DISABLED"] is True
     ):
         logger.info("Skipping Twilio request due to config")
         return True
-    client: Client = Client(
-        current_app.config["TWILIO_ACCOUNT_SID"],
-        current_app.config["TWILIO_AUTH_TOKEN"],
-    )
-    try:
-        client.messages(twilio_sid).update(body="")
-    except TwilioRestException as e:
-        logger.exception(
-            "Could not update SMS message in Twilio (status %d, code %d)",
-            e.status,
-            e.code,
+    deadline: float = _get_deadline(OPERATION_REDACT)
+    circuit_breaker: CircuitBreaker = _get_circuit_breaker(OPERATION_REDACT)
+    if not circuit_breaker.allow_request():
+        logger.debug(
+            "Not redacting SMS message in Twilio (SID %s), circuit breaker is open",
+            twilio_sid,
         )
-        return False
+        raise CircuitOpenException("Twilio circuit breaker is open")
+    with circuit_breaker.guard():
+        if not _acquire_rate_limit(deadline):
+            logger.warning(
+                "Not redacting SMS message in Twilio (SID %s), rate limit wait too long",
+                twilio_sid,
+            )
+            return False
+        client: Client = _get_client(OPERATION_REDACT)
+        try:
+            with _operation_deadline(deadline):
+                client.messages(twilio_sid).update(body="")
+        except TwilioRestException as e:
+            _record_twilio_error(circuit_breaker, e)
+            logger.exception(
+                "Could not update SMS message in Twilio (status %d, code %d)",
+                e.status,
+                e.code,
+            )
+            return False
+        except RequestException:
+            circuit_breaker.record_failure()
+            logger.warning(
+                "Could not redact SMS message in Twilio in time (SID %s), will retry later",
+                twilio_sid,
+                exc_info=True,
+            )
+            return False
+        circuit_breaker.record_success()
     logger.debug("Redacted message body in Twilio (SID %s)", twilio_sid)
     return True
 
 
+def is_available(operation: str) -> bool:
+    """
+    Returns False if the circuit breaker for the operation is open, i.e. calls to Twilio are
+    currently being refused.
+    """
+    return _get_circuit_breaker(operation).state != STATE_OPEN
+
+
+def circuit_breaker_status() -> Dict[str, Dict[str, Union[str, int, float, None]]]:
+    return {
+        operation: _get_circuit_breaker(operation).status()
+        for operation in OPERATION_TIMEOUT_CONFIG
+    }
+
+
 def validate_twilio_signature(headers: Dict, params: Dict) -> None:
     """
     Twilio should have signed the request as described here:
@@ -148,6 +437,147 @@ def validate_twilio_signature(headers: Dict, params: Dict) -> None:
         raise PermissionError(f"No valid {SECURITY_HEADER_NAME} header supplied")
 
 
+def _get_client(operation: str) -> Client:
+    """
+    Gets the Twilio client for an operation. There is a client per operation so that each can
+    have its own timeouts, but they all share one connection pool. The timeouts only bound
+    connecting and each socket read; the operation as a whole is held to its deadline (see
+    `_get_deadline`) by the session's adapter.
+    """
+    client: Optional[Client] = current_app.extensions.get(
+        CLIENT_EXTENSION_NAME, {}
+    ).get(operation)
+    if client is None:
+        with _client_lock:
+            clients: Dict[str, Client] = current_app.extensions.setdefault(
+                CLIENT_EXTENSION_NAME, {}
+            )
+            if operation not in clients:
+                clients[operation] = _create_client(operation)
+            client = clients[operation]
+    return client
+
+
+def _create_client(operation: str) -> Client:
+    session: Optional[Session] = current_app.extensions.get(SESSION_EXTENSION_NAME)
+    if session is None:
+        pool_size: int = current_app.config["TWILIO_HTTP_POOL_SIZE"]
+        logger.debug("Creating Twilio session with connection pool size %d", pool_size)
+        session = Session()
+        session.mount(
+            "https://", _DeadlineAdapter(pool_connections=1, pool_maxsize=pool_size)
+        )
+        current_app.extensions[SESSION_EXTENSION_NAME] = session
+
+    http_client = TwilioHttpClient(pool_connections=False)
+    http_client.session = session
+    # The constructor only accepts a single number, but requests allows separate connect and
+    # read timeouts.
+    timeout: Tuple[float, float] = (
+        current_app.config["TWILIO_CONNECT_TIMEOUT"],
+        current_app.config[OPERATION_TIMEOUT_CONFIG[operation]],
+    )
+    http_client.timeout = timeout
+    return Client(
+        current_app.config["TWILIO_ACCOUNT_SID"],
+        current_app.config["TWILIO_AUTH_TOKEN"],
+        http_client=http_client,
+    )
+
+
+def _get_deadline(operation: str) -> float:
+    """
+    The time (by `time.monotonic`) by which an operation started now must finish, including
+    waiting for the rate limit and reading the whole response: the connect timeout plus the
+    operation's read timeout. Twilio requests are not retried.
+    """
+    return (
+        time.monotonic()
+        + current_app.config["TWILIO_CONNECT_TIMEOUT"]
+        + current_app.config[OPERATION_TIMEOUT_CONFIG[operation]]
+    )
+
+
+@contextmanager
+def _operation_deadline(deadline: float) -> Iterator[None]:
+    """
+    Holds the requests made on this thread within the block to the deadline.
+    """
+    previous: Optional[float] = getattr(_deadlines, "deadline", None)
+    _deadlines.deadline = deadline
+    try:
+        yield
+    finally:
+        _deadlines.deadline = previous
+
+
+def _acquire_rate_limit(deadline: float) -> bool:
+    return _get_rate_limiter().acquire(timeout=max(0.0, deadline - time.monotonic()))
+
+
+def _get_circuit_breaker(operation: str) -> CircuitBreaker:
+    with _client_lock:
+        circuit_breakers: Dict[str, CircuitBreaker] = current_app.extensions.setdefault(
+            CIRCUIT_BREAKER_EXTENSION_NAME, {}
+        )
+        if operation not in circuit_breakers:
+            circuit_breakers[operation] = CircuitBreaker(
+                name=operation,
+                failure_rate_threshold=current_app.config[
+                    "TWILIO_CIRCUIT_BREAKER_FAILURE_RATE"
+                ],
+                minimum_calls=current_app.config[
+                    "TWILIO_CIRCUIT_BREAKER_MINIMUM_CALLS"
+                ],
+                window=current_app.config["TWILIO_CIRCUIT_BREAKER_WINDOW"],
+                reset_timeout=current_app.config[
+                    "TWILIO_CIRCUIT_BREAKER_RESET_TIMEOUT"
+                ],
+            )
+        return circuit_breakers[operation]
+
+
+def _get_rate_limiter() -> RateLimiter:
+    """
+    All requests to Twilio made by the process, from any thread, share one rate limit.
+    """
+    with _client_lock:
+        rate_limiter: Optional[RateLimiter] = current_app.extensions.get(
+            RATE_LIMITER_EXTENSION_NAME
+        )
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(rate=current_app.config["TWILIO_RATE_LIMIT"])
+            current_app.extensions[RATE_LIMITER_EXTENSION_NAME] = rate_limiter
+        return rate_limiter
+
+
+def _record_twilio_error(
+    circuit_breaker: CircuitBreaker, error: Union[TwilioException, RequestException]
+) -> None:
+    """
+    Client errors (e.g. an invalid phone number) show that Twilio is healthy, whereas server
+    errors, rate limiting and timeouts count towards opening the circuit.
+    """
+    if (
+        isinstance(error, TwilioRestException)
+        and 400 <= error.status < 500
+        and error.status != 429
+    ):
+        circuit_breaker.record_success()
+    else:
+        circuit_breaker.record_failure()
+
+
+def _to_provider_response(message: MessageInstance) -> ProviderResponse:
+    return {
+        "status": None if message.status is None else str(message.status),
+        "twilio_sid": message.sid,
+        "date_sent": None if message.date_sent is None else str(message.date_sent),
+        "error_code": message.error_code,
+        "error_message": message.error_message,
+    }
+
+
 def _generate_mock_response(twilio_sid: Optional[str] = None) -> ProviderResponse:
     if twilio_sid is None:
         twilio_sid = generate_uuid()
@@ -77,8 +77,8 @@ class SmsMessageResponse(SmsMessageSchema, Identifier):
         ordered = True
 
     twilio_sid = fields.String(
-        required=True,
-        description="Twilio identifier for the SMS message",
+        required=False,
+        description="Twilio identifier for the SMS message (absent until the message is sent)",
         example="12345678",
     )
     date_sent = fields.String(
@@ -98,6 +98,25 @@ class SmsMessageResponse(SmsMessageSchema, Identifier):
     )
 
 
+@openapi_schema(dhos_sms_api_spec)
+class SmsMessageBatchResult(Schema):
+    class Meta:
+        title = "SMS Message Batch Result"
+        unknown = EXCLUDE
+        ordered = True
+
+    message = fields.Nested(
+        SmsMessageResponse,
+        required=False,
+        description="The SMS message, present if it was accepted",
+    )
+    error = fields.String(
+        required=False,
+        description="Reason the SMS message was not accepted",
+        example="Twilio failed to accept SMS request (status 400, code 21211)",
+    )
+
+
 @openapi_schema(dhos_sms_api_spec)
 class SmsMessageStatusReport(Schema):
     class Meta:
@@ -128,6 +147,138 @@ class SmsMessageStatusReport(Schema):
     )
 
 
+@openapi_schema(dhos_sms_api_spec)
+class CircuitBreakerStatus(Schema):
+    class Meta:
+        title = "Circuit Breaker Status"
+        unknown = EXCLUDE
+        ordered = True
+
+    state = fields.String(
+        required=True,
+        description="State of the circuit breaker: closed, open or half_open",
+        example="closed",
+    )
+    calls = fields.Integer(
+        required=True, description="Number of calls in the current window", example=20
+    )
+    failures = fields.Integer(
+        required=True,
+        description="Number of failed calls in the current window",
+        example=1,
+    )
+    failure_rate = fields.Float(
+        required=True,
+        description="Proportion of failed calls in the current window",
+        example=0.05,
+    )
+    seconds_until_probe = fields.Float(
+        required=False,
+        allow_none=True,
+        description="Seconds until an open circuit breaker allows a probe call",
+        example=12.5,
+    )
+
+
+@openapi_schema(dhos_sms_api_spec)
+class CacheStatus(Schema):
+    class Meta:
+        title = "Cache Status"
+        unknown = EXCLUDE
+        ordered = True
+
+    size = fields.Integer(
+        required=True, description="Number of entries in the cache", example=120
+    )
+    maxsize = fields.Integer(
+        required=True, description="Maximum number of entries", example=10000
+    )
+    hits = fields.Integer(
+        required=True, description="Number of lookups which found an entry", example=900
+    )
+    misses = fields.Integer(
+        required=True,
+        description="Number of lookups which found no entry, or an expired one",
+        example=100,
+    )
+
+
+@openapi_schema(dhos_sms_api_spec)
+class SmsProviderStatus(Schema):
+    class Meta:
+        title = "SMS Provider Status"
+        unknown = EXCLUDE
+        ordered = True
+
+    circuit_breakers = fields.Dict(
+        keys=fields.String(),
+        values=fields.Nested(CircuitBreakerStatus),
+        required=True,
+        description="Circuit breaker status per Twilio operation (send, fetch, redact)",
+    )
+    caches = fields.Dict(
+        keys=fields.String(),
+        values=fields.Nested(CacheStatus),
+        required=True,
+        description="Status of this process's caches, by name (e.g. sms_messages)",
+    )
+
+
+@openapi_schema(dhos_sms_api_spec)
+class BulkUpdateJobResponse(Identifier):
+    class Meta:
+        title = "Bulk Update Job Response"
+        unknown = EXCLUDE
+        ordered = True
+
+    status = fields.String(
+        required=True,
+        description="Status of the job: queued, running, completed, failed or skipped",
+        example="running",
+    )
+    started = fields.String(
+        required=False,
+        description="When the job started running",
+        example="2020-01-01T00:00:00.000Z",
+    )
+    finished = fields.String(
+        required=False,
+        description="When the job finished",
+        example="2020-01-01T00:02:30.000Z",
+    )
+    polled = fields.Integer(
+        required=True,
+        description="Number of incomplete messages polled in Twilio",
+        example=1500,
+    )
+    updated = fields.Integer(
+        required=True,
+        description="Number of messages whose status changed",
+        example=1200,
+    )
+    redacted = fields.Integer(
+        required=True,
+        description="Number of complete messages redacted in Twilio",
+        example=1100,
+    )
+    failed = fields.Integer(
+        required=True,
+        description="Number of polls and redactions which failed and will be retried",
+        example=3,
+    )
+    elapsed = fields.Float(
+        required=False,
+        allow_none=True,
+        description="Seconds the job has been running for, or took",
+        example=150.2,
+    )
+    error = fields.String(
+        required=False,
+        description="Reason the job failed",
+        example="Abandoned",
+    )
+
+
 @openapi_schema(dhos_sms_api_spec)
 class CallbackRequest(Schema):
     """
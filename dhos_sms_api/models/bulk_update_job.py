@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from flask_batteries_included.sqldb import ModelIdentifier, db
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_COMPLETED = "completed"
+JOB_STATUS_FAILED = "failed"
+JOB_STATUS_SKIPPED = "skipped"
+JOB_ACTIVE_STATUSES = [JOB_STATUS_QUEUED, JOB_STATUS_RUNNING]
+
+
+class BulkUpdateJob(ModelIdentifier, db.Model):
+    """
+    A run of the bulk update, polling Twilio for the status of incomplete messages and
+    redacting complete ones. Progress is saved after every chunk of messages, including the
+    key of the last message polled so that an abandoned job can be resumed.
+    """
+
+    status = db.Column(db.String, unique=False, nullable=False, index=True)
+    started = db.Column(db.DateTime, unique=False, nullable=True)
+    finished = db.Column(db.DateTime, unique=False, nullable=True)
+    polled = db.Column(db.Integer, unique=False, nullable=False, default=0)
+    updated = db.Column(db.Integer, unique=False, nullable=False, default=0)
+    redacted = db.Column(db.Integer, unique=False, nullable=False, default=0)
+    failed = db.Column(db.Integer, unique=False, nullable=False, default=0)
+    last_created = db.Column(db.DateTime, unique=False, nullable=True)
+    last_uuid = db.Column(db.String, unique=False, nullable=True)
+    error = db.Column(db.String, unique=False, nullable=True)
+
+    def __init__(self, **kwargs: Any) -> None:
+        # Constructor to satisfy linters.
+        super(BulkUpdateJob, self).__init__(**kwargs)
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        if self.started is None:
+            return None
+        end: datetime = self.finished or datetime.utcnow()
+        return (end - self.started).total_seconds()
+
+    def to_dict(self) -> Dict:
+        job: Dict[str, Any] = {
+            "status": self.status,
+            "polled": self.polled,
+            "updated": self.updated,
+            "redacted": self.redacted,
+            "failed": self.failed,
+            "elapsed": self.elapsed,
+        }
+        for key in ("started", "finished", "error"):
+            value = getattr(self, key)
+            if value is not None:
+                job[key] = value
+        return {**job, **self.pack_identifier()}
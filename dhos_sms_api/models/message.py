@@ -1,23 +1,73 @@
-from datetime import datetime
-from typing import Any, Dict
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
 from flask_batteries_included.sqldb import ModelIdentifier, db
+from sqlalchemy.orm.attributes import InstrumentedAttribute
 
 from dhos_sms_api.query.softdelete import QueryWithSoftDelete
 
+POLL_DUE_PREDICATE = (
+    "next_poll_at IS NOT NULL AND twilio_sid IS NOT NULL AND deleted IS NULL"
+)
+REDACTION_DUE_PREDICATE = (
+    "redaction_due IS NOT NULL AND redacted IS NULL"
+    " AND twilio_sid IS NOT NULL AND deleted IS NULL"
+)
+NOT_DELETED_PREDICATE = "deleted IS NULL"
+
 
 class Message(ModelIdentifier, db.Model):
     query_class = QueryWithSoftDelete
 
+    __table_args__ = (
+        # Match the filters and sort order of the message list, so that a page is read
+        # straight off the index.
+        db.Index(
+            "ix_message_list",
+            "trustomer_code",
+            "product_name",
+            db.text("created DESC"),
+            db.text("uuid DESC"),
+            postgresql_where=db.text(NOT_DELETED_PREDICATE),
+            sqlite_where=db.text(NOT_DELETED_PREDICATE),
+        ),
+        db.Index(
+            "ix_message_list_receiver",
+            "trustomer_code",
+            "product_name",
+            "receiver",
+            db.text("created DESC"),
+            db.text("uuid DESC"),
+            postgresql_where=db.text(NOT_DELETED_PREDICATE),
+            sqlite_where=db.text(NOT_DELETED_PREDICATE),
+        ),
+        # Only a small fraction of messages are ever due a status poll or redaction, so
+        # these indexes cover just those rows, keeping the work sets quick to find however
+        # large the table grows.
+        db.Index(
+            "ix_message_due_poll",
+            "next_poll_at",
+            postgresql_where=db.text(POLL_DUE_PREDICATE),
+            sqlite_where=db.text(POLL_DUE_PREDICATE),
+        ),
+        db.Index(
+            "ix_message_due_redaction",
+            "redaction_due",
+            postgresql_where=db.text(REDACTION_DUE_PREDICATE),
+            sqlite_where=db.text(REDACTION_DUE_PREDICATE),
+        ),
+    )
+
     # required
     sender = db.Column(db.String, unique=False, nullable=False)
-    receiver = db.Column(db.String, unique=False, nullable=False, index=True)
+    receiver = db.Column(db.String, unique=False, nullable=False)
     content = db.Column(db.String, unique=False, nullable=False)
-    twilio_sid = db.Column(db.String, unique=False, nullable=False)
-    trustomer_code = db.Column(db.String, unique=False, nullable=False, index=True)
-    product_name = db.Column(db.String, unique=False, nullable=False, index=True)
+    trustomer_code = db.Column(db.String, unique=False, nullable=False)
+    product_name = db.Column(db.String, unique=False, nullable=False)
 
     # optional
+    twilio_sid = db.Column(db.String, unique=True, nullable=True, index=True)
     status = db.Column(db.String, unique=False, nullable=True, index=True)
     error_code = db.Column(db.String, unique=False, nullable=True)
     error_message = db.Column(db.String, unique=False, nullable=True)
@@ -25,7 +75,15 @@ class Message(ModelIdentifier, db.Model):
 
     # system
     deleted = db.Column(db.DateTime, unique=False, nullable=True)
-    redacted = db.Column(db.DateTime, unique=False, nullable=True, index=True)
+    redacted = db.Column(db.DateTime, unique=False, nullable=True)
+    redaction_due = db.Column(db.DateTime, unique=False, nullable=True)
+    redaction_attempts = db.Column(
+        db.Integer, unique=False, nullable=False, default=0, server_default="0"
+    )
+    next_poll_at = db.Column(db.DateTime, unique=False, nullable=True)
+    poll_attempts = db.Column(
+        db.Integer, unique=False, nullable=False, default=0, server_default="0"
+    )
 
     def __init__(self, **kwargs: Any) -> None:
         # Constructor to satisfy linters.
@@ -82,3 +140,79 @@ class Message(ModelIdentifier, db.Model):
         self.deleted = datetime.utcnow()
         db.session.commit()
         return self.to_dict()
+
+
+# How each field of a message's dict is produced from its column.
+_ALWAYS = 0  # Always included.
+_IF_SET = 1  # Left out when null.
+_UTC = 2  # A datetime stored in UTC, always included.
+
+# The fields of a message's dict, in order, with their columns.
+_RESPONSE_FIELDS: List[Tuple[str, InstrumentedAttribute, int]] = [
+    *((key, getattr(Message, key), _ALWAYS) for key in Message.schema()["required"]),
+    *((key, getattr(Message, key), _IF_SET) for key in Message.schema()["optional"]),
+    ("deleted", Message.deleted, _IF_SET),
+    ("redacted", Message.redacted, _IF_SET),
+    ("uuid", Message.uuid, _ALWAYS),
+    ("created", Message.created, _UTC),
+    ("created_by", Message.created_by_, _ALWAYS),
+    ("modified", Message.modified, _UTC),
+    ("modified_by", Message.modified_by_, _ALWAYS),
+]
+MESSAGE_RESPONSE_FIELDS: List[str] = [key for key, _, _ in _RESPONSE_FIELDS]
+
+
+class MessageFieldPlan:
+    """
+    The columns to select for a set of a message's fields, and how to convert rows of those
+    columns to the same dict as `Message.to_dict` (limited to those fields). This lets
+    messages be returned without loading Message objects, or the columns nobody asked for.
+    Get plans with `get_field_plan`, which works each one out once.
+    """
+
+    def __init__(self, fields: Optional[FrozenSet[str]] = None) -> None:
+        if fields is not None:
+            unknown: FrozenSet[str] = fields - frozenset(MESSAGE_RESPONSE_FIELDS)
+            if unknown:
+                raise ValueError(
+                    f"Unknown message fields: {', '.join(sorted(unknown))}"
+                )
+        selected = [
+            field for field in _RESPONSE_FIELDS if fields is None or field[0] in fields
+        ]
+        self.columns: List[InstrumentedAttribute] = [
+            column for _, column, _ in selected
+        ]
+        self._steps: List[Tuple[str, int, int]] = [
+            (key, index, kind) for index, (key, _, kind) in enumerate(selected)
+        ]
+
+    def columns_with(
+        self, *extra: InstrumentedAttribute
+    ) -> List[InstrumentedAttribute]:
+        """
+        The plan's columns followed by any of `extra` it doesn't already include, which
+        don't affect `to_dict`.
+        """
+        return self.columns + [column for column in extra if column not in self.columns]
+
+    def to_dict(self, row: Sequence[Any]) -> Dict[str, Any]:
+        message: Dict[str, Any] = {}
+        for key, index, kind in self._steps:
+            value = row[index]
+            if kind == _IF_SET:
+                if value is None:
+                    continue
+            elif kind == _UTC and value:
+                value = value.replace(tzinfo=timezone.utc)
+            message[key] = value
+        return message
+
+
+@lru_cache(maxsize=128)
+def get_field_plan(fields: Optional[FrozenSet[str]] = None) -> MessageFieldPlan:
+    """
+    Gets the plan for returning `fields` of messages, or all of their fields by default.
+    Raises ValueError if any of the fields are unknown.
+    """
+    return MessageFieldPlan(fields)
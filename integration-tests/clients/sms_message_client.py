@@ -58,13 +58,21 @@ def get_message_count(start_date: datetime, end_date: datetime) -> Response:
 
 
 def bulk_update_messages() -> Response:
-    return requests.get(
+    return requests.post(
         f"{_get_base_url()}/bulk_update",
         timeout=15,
         headers=_get_auth_headers(),
     )
 
 
+def get_bulk_update_job(job_uuid: str) -> Response:
+    return requests.get(
+        f"{_get_base_url()}/bulk_update/{job_uuid}",
+        timeout=15,
+        headers=_get_auth_headers(),
+    )
+
+
 def process_message_callback(callback_details: Dict[str, Any]) -> Response:
     return requests.post(
         f"{_get_base_url()}/callback",
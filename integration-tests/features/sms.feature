@@ -20,7 +20,8 @@ Feature: Article management
         Given an SMS message is sent
         When a message callback is received with status "delivered"
         Then the message status is updated accordingly
-        And the message body has been marked as redacted
+        When a bulk update call is received
+        Then the message body has been marked as redacted
 
     Scenario: Bulk update messages' status
         Given an SMS message is sent
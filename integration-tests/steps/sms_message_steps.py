@@ -1,4 +1,5 @@
 import operator
+import time
 from datetime import datetime, timedelta, timezone
 from itertools import accumulate
 from typing import Dict
@@ -12,6 +13,9 @@ from requests import Response, codes
 
 use_step_matcher("re")
 
+# How long to wait in seconds for a bulk update job to finish.
+BULK_UPDATE_TIMEOUT = 60
+
 
 @step("(?:an|another) SMS message is sent")
 def send_new_message(context: Context) -> None:
@@ -39,8 +43,10 @@ def add_delivered_unredacted_message(context: Context) -> None:
     post_response.raise_for_status()
 
     # We have to go directly into the database to mark the message as delivered to get around the mocking.
+    # Callbacks would also mark it as due for redaction.
     database_client.execute_query(
-        "UPDATE message SET status='delivered' WHERE message.uuid=%(message_uuid)s",
+        "UPDATE message SET status='delivered', redaction_due=timezone('utc', now()) "
+        "WHERE message.uuid=%(message_uuid)s",
         params={"message_uuid": post_response.json()["uuid"]},
     )
 
@@ -110,6 +116,18 @@ def update_message(context: Context, status: str) -> None:
 def bulk_update(context: Context) -> None:
     response: Response = sms_message_client.bulk_update_messages()
     response.raise_for_status()
+    assert response.status_code == codes.accepted
+    job: dict = response.json()
+
+    # The bulk update runs in the background, so wait for the job to finish.
+    deadline: float = time.monotonic() + BULK_UPDATE_TIMEOUT
+    while job["status"] in ["queued", "running"]:
+        assert time.monotonic() < deadline, f"Bulk update job {job['uuid']} timed out"
+        time.sleep(0.5)
+        response = sms_message_client.get_bulk_update_job(job_uuid=job["uuid"])
+        response.raise_for_status()
+        job = response.json()
+    assert job["status"] == "completed", job
 
 
 @step("the status of all incomplete messages is updated")
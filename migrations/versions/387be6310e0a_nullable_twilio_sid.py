@@ -0,0 +1,28 @@
+"""nullable twilio_sid
+
+Messages queued for sending don't have a Twilio SID until the send worker has
+handed them to Twilio.
+
+Revision ID: 387be6310e0a
+Revises: df31da1209da
+Create Date: 2026-10-17 09:12:41.204513
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "387be6310e0a"
+down_revision = "df31da1209da"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column("message", "twilio_sid", nullable=True)
+
+
+def downgrade():
+    # Unsent messages can't be represented without a SID, so they are discarded.
+    print("Deleting messages which were never sent to Twilio")
+    op.execute("DELETE FROM message WHERE twilio_sid IS NULL")
+    op.alter_column("message", "twilio_sid", nullable=False)
@@ -0,0 +1,38 @@
+"""unique twilio_sid index
+
+Twilio callbacks look messages up by SID. The index is built concurrently so
+that the message table stays writable while it is created.
+
+Revision ID: 8e4f2b7c1d90
+Revises: 387be6310e0a
+Create Date: 2026-10-17 10:02:17.553108
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8e4f2b7c1d90"
+down_revision = "387be6310e0a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_message_twilio_sid",
+            "message",
+            ["twilio_sid"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_message_twilio_sid",
+            table_name="message",
+            postgresql_concurrently=True,
+        )
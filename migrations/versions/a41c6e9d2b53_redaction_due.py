@@ -0,0 +1,81 @@
+"""redaction due
+
+Redaction of message bodies in Twilio moves out of the callback into a worker,
+which picks up messages by `redaction_due`. Complete messages created in the
+last 7 days which haven't been redacted yet are due straight away, matching the
+window the bulk update used to redact. Older messages are left as they were.
+They are marked in batches, each committed on its own.
+
+Revision ID: a41c6e9d2b53
+Revises: 8e4f2b7c1d90
+Create Date: 2026-10-17 11:24:05.918342
+
+"""
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a41c6e9d2b53"
+down_revision = "8e4f2b7c1d90"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 10000
+BACKFILL_WINDOW = timedelta(days=7)
+
+
+def upgrade():
+    op.add_column("message", sa.Column("redaction_due", sa.DateTime(), nullable=True))
+    op.add_column(
+        "message",
+        sa.Column(
+            "redaction_attempts", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+    op.create_index(
+        op.f("ix_message_redaction_due"), "message", ["redaction_due"], unique=False
+    )
+    # Walk the recent messages in primary key order, committing each batch, so that the
+    # whole table isn't locked (or rescanned) by one big UPDATE.
+    backfill = sa.text(
+        """
+        UPDATE message SET redaction_due = timezone('utc', now())
+        WHERE uuid IN :uuids
+        AND status IN ('delivered', 'undelivered', 'failed')
+        AND redacted IS NULL
+        AND twilio_sid IS NOT NULL
+        """
+    ).bindparams(sa.bindparam("uuids", expanding=True))
+    next_batch = sa.text(
+        """
+        SELECT uuid FROM message WHERE created > :created_after AND uuid > :last
+        ORDER BY uuid LIMIT :batch_size
+        """
+    )
+    created_after = datetime.utcnow() - BACKFILL_WINDOW
+    with op.get_context().autocommit_block():
+        last_uuid = ""
+        while True:
+            uuids = [
+                row.uuid
+                for row in op.get_bind().execute(
+                    next_batch,
+                    {
+                        "created_after": created_after,
+                        "last": last_uuid,
+                        "batch_size": BACKFILL_BATCH_SIZE,
+                    },
+                )
+            ]
+            if not uuids:
+                break
+            op.get_bind().execute(backfill, {"uuids": uuids})
+            last_uuid = uuids[-1]
+
+
+def downgrade():
+    op.drop_index(op.f("ix_message_redaction_due"), table_name="message")
+    op.drop_column("message", "redaction_attempts")
+    op.drop_column("message", "redaction_due")
@@ -0,0 +1,83 @@
+"""partial work set indexes
+
+The bulk update and the redaction worker only look for messages due a status
+poll or a redaction, which are a small fraction of the table. These partial
+indexes cover just those rows, replacing the full indexes on `next_poll_at`,
+`redaction_due` and `redacted`. They are built concurrently so that the message
+table stays writable while they are created.
+
+Revision ID: b93d4e7a0f18
+Revises: e58a1b3f6c27
+Create Date: 2026-10-17 16:21:05.118342
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b93d4e7a0f18"
+down_revision = "e58a1b3f6c27"
+branch_labels = None
+depends_on = None
+
+POLL_DUE_PREDICATE = (
+    "next_poll_at IS NOT NULL AND twilio_sid IS NOT NULL AND deleted IS NULL"
+)
+REDACTION_DUE_PREDICATE = (
+    "redaction_due IS NOT NULL AND redacted IS NULL"
+    " AND twilio_sid IS NOT NULL AND deleted IS NULL"
+)
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_message_due_poll",
+            "message",
+            ["next_poll_at"],
+            unique=False,
+            postgresql_where=POLL_DUE_PREDICATE,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_message_due_redaction",
+            "message",
+            ["redaction_due"],
+            unique=False,
+            postgresql_where=REDACTION_DUE_PREDICATE,
+            postgresql_concurrently=True,
+        )
+        for index_name in (
+            "ix_message_next_poll_at",
+            "ix_message_redaction_due",
+            "ix_message_redacted",
+        ):
+            op.drop_index(
+                index_name, table_name="message", postgresql_concurrently=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for index_name, column in (
+            ("ix_message_next_poll_at", "next_poll_at"),
+            ("ix_message_redaction_due", "redaction_due"),
+            ("ix_message_redacted", "redacted"),
+        ):
+            op.create_index(
+                index_name,
+                "message",
+                [column],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+        op.drop_index(
+            "ix_message_due_redaction",
+            table_name="message",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_message_due_poll",
+            table_name="message",
+            postgresql_concurrently=True,
+        )
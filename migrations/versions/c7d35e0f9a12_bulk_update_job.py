@@ -0,0 +1,45 @@
+"""bulk update job
+
+Revision ID: c7d35e0f9a12
+Revises: a41c6e9d2b53
+Create Date: 2026-10-17 13:40:52.071664
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c7d35e0f9a12"
+down_revision = "a41c6e9d2b53"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "bulk_update_job",
+        sa.Column("uuid", sa.String(length=36), nullable=False),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.Column("created_by_", sa.String(), nullable=False),
+        sa.Column("modified", sa.DateTime(), nullable=False),
+        sa.Column("modified_by_", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("started", sa.DateTime(), nullable=True),
+        sa.Column("finished", sa.DateTime(), nullable=True),
+        sa.Column("polled", sa.Integer(), nullable=False),
+        sa.Column("updated", sa.Integer(), nullable=False),
+        sa.Column("redacted", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("last_created", sa.DateTime(), nullable=True),
+        sa.Column("last_uuid", sa.String(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("uuid"),
+    )
+    op.create_index(
+        op.f("ix_bulk_update_job_status"), "bulk_update_job", ["status"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_bulk_update_job_status"), table_name="bulk_update_job")
+    op.drop_table("bulk_update_job")
@@ -0,0 +1,89 @@
+"""list indexes
+
+The message list always filters on trustomer_code and product_name, optionally
+receiver, and sorts by (created, uuid) descending. These composite indexes
+match that, so a page is read straight off the index, and replace the single
+column indexes on trustomer_code, product_name and receiver. They are built
+concurrently so that the message table stays writable while they are created.
+
+Revision ID: d4f6a8c2e913
+Revises: b93d4e7a0f18
+Create Date: 2026-10-17 17:48:36.902114
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d4f6a8c2e913"
+down_revision = "b93d4e7a0f18"
+branch_labels = None
+depends_on = None
+
+NOT_DELETED_PREDICATE = "deleted IS NULL"
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_message_list",
+            "message",
+            [
+                "trustomer_code",
+                "product_name",
+                sa.text("created DESC"),
+                sa.text("uuid DESC"),
+            ],
+            unique=False,
+            postgresql_where=NOT_DELETED_PREDICATE,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_message_list_receiver",
+            "message",
+            [
+                "trustomer_code",
+                "product_name",
+                "receiver",
+                sa.text("created DESC"),
+                sa.text("uuid DESC"),
+            ],
+            unique=False,
+            postgresql_where=NOT_DELETED_PREDICATE,
+            postgresql_concurrently=True,
+        )
+        for index_name in (
+            "ix_message_trustomer_code",
+            "ix_message_product_name",
+            "ix_message_receiver",
+        ):
+            op.drop_index(
+                index_name, table_name="message", postgresql_concurrently=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for index_name, column in (
+            ("ix_message_trustomer_code", "trustomer_code"),
+            ("ix_message_product_name", "product_name"),
+            ("ix_message_receiver", "receiver"),
+        ):
+            op.create_index(
+                index_name,
+                "message",
+                [column],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+        op.drop_index(
+            "ix_message_list_receiver",
+            table_name="message",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_message_list",
+            table_name="message",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,43 @@
+"""next poll at
+
+The bulk update only polls messages whose `next_poll_at` has passed. Incomplete
+messages from the last 7 days are due straight away.
+
+Revision ID: e58a1b3f6c27
+Revises: c7d35e0f9a12
+Create Date: 2026-10-17 14:52:33.407186
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e58a1b3f6c27"
+down_revision = "c7d35e0f9a12"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("message", sa.Column("next_poll_at", sa.DateTime(), nullable=True))
+    op.add_column(
+        "message",
+        sa.Column("poll_attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index(
+        op.f("ix_message_next_poll_at"), "message", ["next_poll_at"], unique=False
+    )
+    op.execute(
+        """
+        UPDATE message SET next_poll_at = timezone('utc', now())
+        WHERE status NOT IN ('delivered', 'undelivered', 'failed')
+        AND twilio_sid IS NOT NULL
+        AND created > timezone('utc', now()) - interval '7 days'
+        """
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_message_next_poll_at"), table_name="message")
+    op.drop_column("message", "poll_attempts")
+    op.drop_column("message", "next_poll_at")
@@ -1,12 +1,17 @@
 import json
-from typing import Callable, Dict, Generator, List, Type, Union
+import re
+from itertools import count
+from typing import Any, Callable, Dict, Generator, List, Type, Union
 
 import pytest
+from _pytest.monkeypatch import MonkeyPatch
 from flask import Flask
 from flask_batteries_included.sqldb import db
 from marshmallow import RAISE, Schema
 from mock import Mock
 from pytest_mock import MockFixture
+from requests_mock import Mocker
+from requests_mock.request import _RequestObjectProxy
 
 from dhos_sms_api.helpers import twilio_client
 from dhos_sms_api.helpers.twilio_client import ProviderResponse
@@ -51,14 +56,19 @@ def assert_valid_schema(
 
 @pytest.fixture
 def mock_twilio_send(mocker: MockFixture) -> Mock:
-    return_value: ProviderResponse = {
-        "status": "some_status",
-        "twilio_sid": "some_sid",
-        "date_sent": "some_date",
-        "error_code": None,
-        "error_message": None,
-    }
-    return mocker.patch.object(twilio_client, "send_message", return_value=return_value)
+    sids = count(1)
+
+    def _send(**kwargs: Any) -> ProviderResponse:
+        # Twilio SIDs are unique, and so is the column they are stored in.
+        return {
+            "status": "some_status",
+            "twilio_sid": f"some_sid_{next(sids)}",
+            "date_sent": "some_date",
+            "error_code": None,
+            "error_message": None,
+        }
+
+    return mocker.patch.object(twilio_client, "send_message", side_effect=_send)
 
 
 @pytest.fixture
@@ -73,6 +83,42 @@ def mock_twilio_get(mocker: MockFixture) -> Mock:
     return mocker.patch.object(twilio_client, "get_message", return_value=return_value)
 
 
+@pytest.fixture
+def fake_twilio_list(
+    app: Flask, monkeypatch: MonkeyPatch, requests_mock: Mocker
+) -> List[Dict]:
+    """
+    A local fake of Twilio's message list endpoint, serving the messages added to the
+    returned list a page at a time.
+    """
+    monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+    messages: List[Dict] = []
+
+    def _list_messages(request: _RequestObjectProxy, context: Any) -> Dict:
+        page_size = int(request.qs["pagesize"][0])
+        page = int(request.qs.get("page", ["0"])[0])
+        start = page * page_size
+        next_page_uri = None
+        if start + page_size < len(messages):
+            next_page_uri = f"{request.path}?PageSize={page_size}&Page={page + 1}"
+        return {
+            "messages": messages[start : start + page_size],
+            "next_page_uri": next_page_uri,
+            "page": page,
+            "page_size": page_size,
+            "uri": request.path,
+        }
+
+    requests_mock.get(
+        re.compile(
+            r"https://api\.twilio\.com/2010-04-01/Accounts/\w+/Messages\.json",
+            re.IGNORECASE,
+        ),
+        json=_list_messages,
+    )
+    return messages
+
+
 @pytest.fixture
 def message() -> Generator[Dict, None, None]:
     yield {
@@ -1,7 +1,10 @@
-from typing import Dict
+from datetime import datetime
+from typing import Callable, Dict
 
+import pytest
 from _pytest.logging import LogCaptureFixture
-from flask import Flask
+from _pytest.monkeypatch import MonkeyPatch
+from flask import Flask, jsonify
 from flask.testing import FlaskClient
 from flask_batteries_included.helpers import generate_uuid
 from flask_batteries_included.helpers.error_handler import ServiceUnavailableException
@@ -11,9 +14,21 @@ from twilio.request_validator import RequestValidator
 
 from dhos_sms_api.blueprint_api import controller
 from dhos_sms_api.helpers import twilio_client
+from dhos_sms_api.models.api_spec import BulkUpdateJobResponse, SmsProviderStatus
 
 
 class TestApi:
+    @pytest.fixture(autouse=True)
+    def mock_etags(self, mocker: MockFixture) -> Dict[str, Mock]:
+        return {
+            "message": mocker.patch.object(
+                controller, "get_message_etag", return_value="etag_1"
+            ),
+            "messages": mocker.patch.object(
+                controller, "get_messages_etag", return_value="etag_2"
+            ),
+        }
+
     def _generate_twilio_signature(self, config: Dict, params: Dict) -> str:
         return RequestValidator(token=config["TWILIO_AUTH_TOKEN"]).compute_signature(
             uri=config["TWILIO_CALL_BACK_URL"], params=params
@@ -46,6 +61,35 @@ class TestApi:
         assert response.json is not None
         assert response.json["content"] == message["content"]
 
+    def test_create_message_queued(
+        self,
+        app: Flask,
+        client: FlaskClient,
+        mocker: MockFixture,
+        monkeypatch: MonkeyPatch,
+        message: Dict,
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_QUEUED_SEND", True)
+        mock_queue: Mock = mocker.patch.object(
+            controller,
+            "queue_message",
+            return_value={**message, "uuid": generate_uuid(), "status": "pending"},
+        )
+        mock_create: Mock = mocker.patch.object(controller, "create_message")
+        response = client.post(
+            "/dhos/v1/sms",
+            json=message,
+            headers={
+                "X-Trustomer": "some_trustomer_code",
+                "X-Product": "some_product_name",
+            },
+        )
+        assert response.status_code == 202
+        assert response.json is not None
+        assert response.json["status"] == "pending"
+        assert mock_queue.call_count == 1
+        assert mock_create.call_count == 0
+
     def test_create_message_no_headers(
         self, client: FlaskClient, message: Dict
     ) -> None:
@@ -148,22 +192,170 @@ class TestApi:
         )
         assert response.status_code == 503
 
+    def test_create_messages(
+        self, client: FlaskClient, mocker: MockFixture, message: Dict
+    ) -> None:
+        expected = [{"message": {**message, "uuid": generate_uuid()}}, {"error": "x"}]
+        mock_create: Mock = mocker.patch.object(
+            controller, "create_messages", return_value=expected
+        )
+        response = client.post(
+            "/dhos/v1/sms/batch",
+            json=[message, message],
+            headers={
+                "X-Trustomer": "Some_Trustomer_Code",
+                "X-Product": "some_product_name",
+            },
+        )
+        assert response.status_code == 200
+        assert response.json == expected
+        mock_create.assert_called_with(
+            [
+                {
+                    **message,
+                    "trustomer_code": "some_trustomer_code",
+                    "product_name": "some_product_name",
+                }
+            ]
+            * 2
+        )
+
+    def test_create_messages_queued(
+        self,
+        app: Flask,
+        client: FlaskClient,
+        mocker: MockFixture,
+        monkeypatch: MonkeyPatch,
+        message: Dict,
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_QUEUED_SEND", True)
+        mock_queue: Mock = mocker.patch.object(
+            controller, "queue_messages", return_value=[]
+        )
+        response = client.post(
+            "/dhos/v1/sms/batch",
+            json=[message],
+            headers={
+                "X-Trustomer": "some_trustomer_code",
+                "X-Product": "some_product_name",
+            },
+        )
+        assert response.status_code == 202
+        assert mock_queue.call_count == 1
+
+    def test_create_messages_too_many(
+        self, client: FlaskClient, mocker: MockFixture, message: Dict
+    ) -> None:
+        mock_create: Mock = mocker.patch.object(controller, "create_messages")
+        response = client.post(
+            "/dhos/v1/sms/batch",
+            json=[message] * 1001,
+            headers={
+                "X-Trustomer": "some_trustomer_code",
+                "X-Product": "some_product_name",
+            },
+        )
+        assert response.status_code == 400
+        assert mock_create.call_count == 0
+
+    def test_create_message_diverted(
+        self, client: FlaskClient, mocker: MockFixture, message: Dict
+    ) -> None:
+        mocker.patch.object(
+            controller,
+            "create_message",
+            return_value={**message, "uuid": generate_uuid(), "status": "pending"},
+        )
+        response = client.post(
+            "/dhos/v1/sms",
+            json=message,
+            headers={
+                "X-Trustomer": "some_trustomer_code",
+                "X-Product": "some_product_name",
+            },
+        )
+        assert response.status_code == 202
+
+    def test_get_provider_status(
+        self, client: FlaskClient, assert_valid_schema: Callable
+    ) -> None:
+        response = client.get("/dhos/v1/sms_provider_status")
+        assert response.status_code == 200
+        assert response.json is not None
+        assert_valid_schema(SmsProviderStatus, response.json)
+
     def test_get_message_by_uuid(
-        self, client: FlaskClient, mocker: MockFixture
+        self, client: FlaskClient, mocker: MockFixture, mock_etags: Dict[str, Mock]
     ) -> None:
         expected = {"some": "message"}
         message_uuid: str = generate_uuid()
         mock_get: Mock = mocker.patch.object(
-            controller, "get_message_by_uuid", return_value=expected
+            controller, "get_message_with_etag", return_value=(expected, "etag_3")
         )
         response = client.get(f"/dhos/v1/sms/{message_uuid}")
-        mock_get.assert_called_with(message_uuid)
+        mock_get.assert_called_with(message_uuid, fields=None)
         assert response.status_code == 200
         assert response.json == expected
+        assert response.headers["ETag"] == '"etag_3"'
+        # The ETag comes from the message read, without looking it up first.
+        assert mock_etags["message"].call_count == 0
 
-    def test_get_all_messages(self, client: FlaskClient, mocker: MockFixture) -> None:
+    def test_get_message_by_uuid_modified(
+        self, client: FlaskClient, mocker: MockFixture, mock_etags: Dict[str, Mock]
+    ) -> None:
+        message_uuid: str = generate_uuid()
+        mocker.patch.object(
+            controller, "get_message_with_etag", return_value=({}, "etag_3")
+        )
+        response = client.get(
+            f"/dhos/v1/sms/{message_uuid}", headers={"If-None-Match": '"etag_0"'}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"etag_3"'
+        mock_etags["message"].assert_called_with(message_uuid)
+
+    def test_get_message_by_uuid_not_modified(
+        self, client: FlaskClient, mocker: MockFixture, mock_etags: Dict[str, Mock]
+    ) -> None:
+        message_uuid: str = generate_uuid()
+        mock_get: Mock = mocker.patch.object(controller, "get_message_with_etag")
+        response = client.get(
+            f"/dhos/v1/sms/{message_uuid}", headers={"If-None-Match": '"etag_1"'}
+        )
+        assert response.status_code == 304
+        assert response.headers["ETag"] == '"etag_1"'
+        assert response.data == b""
+        mock_etags["message"].assert_called_with(message_uuid)
+        assert mock_get.call_count == 0
+
+    def test_get_message_by_uuid_fields(
+        self, client: FlaskClient, mocker: MockFixture
+    ) -> None:
+        message_uuid: str = generate_uuid()
         mock_get: Mock = mocker.patch.object(
-            controller, "get_all_messages", return_value=[{"uuid": generate_uuid()}]
+            controller,
+            "get_message_with_etag",
+            return_value=({"status": "sent"}, "etag_3"),
+        )
+        response = client.get(f"/dhos/v1/sms/{message_uuid}?fields=uuid,status")
+        assert response.status_code == 200
+        mock_get.assert_called_with(message_uuid, fields=["uuid", "status"])
+
+    def test_get_message_by_uuid_unknown_field(
+        self, client: FlaskClient, mocker: MockFixture
+    ) -> None:
+        mock_get: Mock = mocker.patch.object(controller, "get_message_with_etag")
+        response = client.get(f"/dhos/v1/sms/{generate_uuid()}?fields=uuid,password")
+        assert response.status_code == 400
+        assert mock_get.call_count == 0
+
+    def test_get_all_messages(
+        self, client: FlaskClient, mocker: MockFixture, mock_etags: Dict[str, Mock]
+    ) -> None:
+        mock_get: Mock = mocker.patch.object(
+            controller,
+            "get_all_messages_with_etag",
+            return_value=([{"uuid": generate_uuid()}], None, "etag_4"),
         )
         response = client.get(
             "/dhos/v1/sms",
@@ -176,15 +368,61 @@ class TestApi:
         assert response.status_code == 200
         assert response.json is not None
         assert len(response.json) == 1
+        assert "Link" not in response.headers
+        assert response.headers["ETag"] == '"etag_4"'
+        assert mock_etags["messages"].call_count == 0
+
+    def test_get_all_messages_modified(
+        self, client: FlaskClient, mocker: MockFixture, mock_etags: Dict[str, Mock]
+    ) -> None:
+        mocker.patch.object(
+            controller, "get_all_messages_with_etag", return_value=([], None, "etag_4")
+        )
+        response = client.get(
+            "/dhos/v1/sms",
+            headers={
+                "X-Trustomer": "some_trustomer_code",
+                "X-Product": "some_product_name",
+                "If-None-Match": '"etag_0"',
+            },
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"etag_4"'
+        assert mock_etags["messages"].call_count == 1
+
+    def test_get_all_messages_not_modified(
+        self, client: FlaskClient, mocker: MockFixture, mock_etags: Dict[str, Mock]
+    ) -> None:
+        mock_get: Mock = mocker.patch.object(controller, "get_all_messages_with_etag")
+        response = client.get(
+            "/dhos/v1/sms?limit=5&cursor=this_page",
+            headers={
+                "X-Trustomer": "some_trustomer_code",
+                "X-Product": "some_product_name",
+                "If-None-Match": '"etag_0", "etag_2"',
+            },
+        )
+        assert response.status_code == 304
+        assert response.headers["ETag"] == '"etag_2"'
+        mock_etags["messages"].assert_called_with(
+            trustomer_code="some_trustomer_code",
+            product_name="some_product_name",
+            receiver=None,
+            limit=5,
+            cursor="this_page",
+        )
+        assert mock_get.call_count == 0
 
     def test_get_all_messages_filtered(
         self, client: FlaskClient, mocker: MockFixture
     ) -> None:
         mock_get: Mock = mocker.patch.object(
-            controller, "get_all_messages", return_value=[{"uuid": generate_uuid()}]
+            controller,
+            "get_all_messages_with_etag",
+            return_value=([{"uuid": generate_uuid()}], "next_page", "etag_4"),
         )
         response = client.get(
-            "/dhos/v1/sms?receiver=%2B447123456789&limit=5",
+            "/dhos/v1/sms?receiver=%2B447123456789&limit=5&cursor=this_page",
             headers={
                 "X-Trustomer": "some_trustomer_code",
                 "X-Product": "some_product_name",
@@ -199,8 +437,87 @@ class TestApi:
             product_name="some_product_name",
             receiver="+447123456789",
             limit=5,
+            cursor="this_page",
+            fields=None,
+        )
+        assert (
+            response.headers["Link"]
+            == '</dhos/v1/sms?receiver=%2B447123456789&limit=5&cursor=next_page>; rel="next"'
         )
 
+    def test_get_all_messages_ndjson(
+        self, app: Flask, client: FlaskClient, mocker: MockFixture
+    ) -> None:
+        messages = [
+            {
+                "uuid": generate_uuid(),
+                "created": datetime(2026, 1, 1, 12, 0, 0, 123000),
+            },
+            {"uuid": generate_uuid(), "created": datetime(2026, 1, 1, 11, 0, 0)},
+        ]
+        mock_stream: Mock = mocker.patch.object(
+            controller, "stream_all_messages", return_value=iter(messages)
+        )
+        mock_get: Mock = mocker.patch.object(controller, "get_all_messages_with_etag")
+        response = client.get(
+            "/dhos/v1/sms?receiver=%2B447123456789",
+            headers={
+                "X-Trustomer": "some_trustomer_code",
+                "X-Product": "some_product_name",
+                "Accept": "application/x-ndjson",
+            },
+        )
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        assert response.is_streamed
+        lines = response.get_data(as_text=True).splitlines(keepends=True)
+        # Each message is encoded exactly as jsonify would encode it.
+        with app.test_request_context():
+            assert lines == [jsonify(m).get_data(as_text=True) for m in messages]
+        assert mock_get.call_count == 0
+        mock_stream.assert_called_once_with(
+            trustomer_code="some_trustomer_code",
+            product_name="some_product_name",
+            receiver="+447123456789",
+            limit=None,
+            cursor=None,
+            fields=None,
+        )
+
+    def test_get_all_messages_stream(
+        self, client: FlaskClient, mocker: MockFixture
+    ) -> None:
+        messages = [{"uuid": generate_uuid()} for _ in range(3)]
+        mocker.patch.object(
+            controller, "stream_all_messages", return_value=iter(messages)
+        )
+        response = client.get(
+            "/dhos/v1/sms?stream=true",
+            headers={
+                "X-Trustomer": "some_trustomer_code",
+                "X-Product": "some_product_name",
+            },
+        )
+        assert response.status_code == 200
+        assert response.mimetype == "application/json"
+        assert response.is_streamed
+        assert response.json == messages
+        assert "Link" not in response.headers
+
+    def test_get_all_messages_stream_empty(
+        self, client: FlaskClient, mocker: MockFixture
+    ) -> None:
+        mocker.patch.object(controller, "stream_all_messages", return_value=iter([]))
+        response = client.get(
+            "/dhos/v1/sms?stream=true",
+            headers={
+                "X-Trustomer": "some_trustomer_code",
+                "X-Product": "some_product_name",
+            },
+        )
+        assert response.status_code == 200
+        assert response.json == []
+
     def test_sms_callback(
         self, app: Flask, client: FlaskClient, mocker: MockFixture
     ) -> None:
@@ -312,11 +629,37 @@ class TestApi:
         assert response.status_code == 200
         assert response.json == expected
 
-    def test_sms_bulk_update(self, client: FlaskClient, mocker: MockFixture) -> None:
-        mock_update: Mock = mocker.patch.object(
-            controller,
-            "sms_bulk_update",
-        )
+    def test_sms_bulk_update(
+        self, client: FlaskClient, mocker: MockFixture, assert_valid_schema: Callable
+    ) -> None:
+        mock_background: Mock = mocker.patch.object(controller, "run_in_background")
         response = client.post("/dhos/v1/sms/bulk_update")
-        assert mock_update.call_count == 1
-        assert response.status_code == 204
+        assert response.status_code == 202
+        assert response.json is not None
+        assert_valid_schema(BulkUpdateJobResponse, response.json)
+        job_id = response.json["uuid"]
+        assert response.headers["Location"] == f"/dhos/v1/sms/bulk_update/{job_id}"
+        mock_background.assert_called_once_with(controller.run_bulk_update_job, job_id)
+
+        # The job is already in progress, so isn't started again.
+        response = client.post("/dhos/v1/sms/bulk_update")
+        assert response.status_code == 202
+        assert response.json is not None
+        assert response.json["uuid"] == job_id
+        assert mock_background.call_count == 1
+
+    def test_get_bulk_update_job(
+        self, client: FlaskClient, mocker: MockFixture, assert_valid_schema: Callable
+    ) -> None:
+        mocker.patch.object(controller, "run_in_background")
+        job_id = client.post("/dhos/v1/sms/bulk_update").json["uuid"]  # type: ignore
+        controller.run_bulk_update_job(job_id)
+        response = client.get(f"/dhos/v1/sms/bulk_update/{job_id}")
+        assert response.status_code == 200
+        assert response.json is not None
+        assert_valid_schema(BulkUpdateJobResponse, response.json)
+        assert response.json["status"] == "completed"
+
+    def test_get_bulk_update_job_not_found(self, client: FlaskClient) -> None:
+        response = client.get(f"/dhos/v1/sms/bulk_update/{generate_uuid()}")
+        assert response.status_code == 404
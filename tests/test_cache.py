@@ -0,0 +1,71 @@
+from flask import Flask
+from pytest_mock import MockFixture
+
+from dhos_sms_api.helpers import cache as cache_module
+from dhos_sms_api.helpers.cache import LRUCache, cache_status, get_cache
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self) -> None:
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert len(cache) == 2
+
+    def test_get_default(self) -> None:
+        cache = LRUCache(maxsize=2)
+        assert cache.get("missing") is None
+        assert cache.get("missing", "default") == "default"
+
+    def test_disabled(self) -> None:
+        cache = LRUCache(maxsize=0)
+        cache.put("a", 1)
+        assert "a" not in cache
+
+    def test_ttl(self, mocker: MockFixture) -> None:
+        now = mocker.patch.object(cache_module.time, "monotonic", return_value=100.0)
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1, ttl=10)
+        cache.put("b", 2)
+        now.return_value = 110.0
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert len(cache) == 1
+
+    def test_stats(self) -> None:
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("b")
+        assert "a" in cache
+        assert cache.stats() == {"size": 1, "maxsize": 2, "hits": 2, "misses": 1}
+
+    def test_discard(self) -> None:
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.discard("a")
+        cache.discard("b")
+        assert "a" not in cache
+
+    def test_clear(self) -> None:
+        cache = LRUCache(maxsize=2)
+        cache.put("a")
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_get_cache(self, app: Flask) -> None:
+        cache = get_cache("something", 5)
+        assert get_cache("something", 5) is cache
+        assert get_cache("something_else", 5) is not cache
+        assert cache.maxsize == 5
+
+    def test_cache_status(self, app: Flask) -> None:
+        get_cache("something", 5).put("a")
+        assert cache_status() == {
+            "something": {"size": 1, "maxsize": 5, "hits": 0, "misses": 0}
+        }
@@ -0,0 +1,98 @@
+from typing import List
+
+import pytest
+
+from dhos_sms_api.helpers.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+)
+
+
+class TestCircuitBreaker:
+    @pytest.fixture
+    def now(self) -> List[float]:
+        return [1000.0]
+
+    @pytest.fixture
+    def breaker(self, now: List[float]) -> CircuitBreaker:
+        return CircuitBreaker(
+            name="send",
+            failure_rate_threshold=0.5,
+            minimum_calls=4,
+            window=60,
+            reset_timeout=30,
+            clock=lambda: now[0],
+        )
+
+    def test_stays_closed_below_minimum_calls(self, breaker: CircuitBreaker) -> None:
+        for _ in range(3):
+            breaker.record_failure()
+        assert breaker.state == STATE_CLOSED
+        assert breaker.allow_request() is True
+
+    def test_opens_at_failure_rate(self, breaker: CircuitBreaker) -> None:
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == STATE_CLOSED
+        breaker.record_failure()
+        assert breaker.state == STATE_OPEN
+        assert breaker.allow_request() is False
+        assert breaker.status()["failure_rate"] == 0.5
+
+    def test_old_outcomes_leave_window(
+        self, breaker: CircuitBreaker, now: List[float]
+    ) -> None:
+        for _ in range(3):
+            breaker.record_failure()
+        now[0] += 61
+        breaker.record_failure()
+        assert breaker.state == STATE_CLOSED
+        assert breaker.status()["calls"] == 1
+
+    def test_half_open_probe_closes(
+        self, breaker: CircuitBreaker, now: List[float]
+    ) -> None:
+        for _ in range(4):
+            breaker.record_failure()
+        assert breaker.status()["seconds_until_probe"] == 30
+        now[0] += 30
+        assert breaker.state == STATE_HALF_OPEN
+        assert breaker.allow_request() is True
+        # Only one probe at a time.
+        assert breaker.allow_request() is False
+        breaker.record_success()
+        assert breaker.state == STATE_CLOSED
+        assert breaker.status()["calls"] == 1
+
+    def test_half_open_probe_failure_reopens(
+        self, breaker: CircuitBreaker, now: List[float]
+    ) -> None:
+        for _ in range(4):
+            breaker.record_failure()
+        now[0] += 30
+        assert breaker.allow_request() is True
+        breaker.record_failure()
+        assert breaker.state == STATE_OPEN
+        now[0] += 29
+        assert breaker.allow_request() is False
+
+    def test_half_open_probe_exception_reopens(
+        self, breaker: CircuitBreaker, now: List[float]
+    ) -> None:
+        for _ in range(4):
+            breaker.record_failure()
+        now[0] += 30
+        assert breaker.allow_request() is True
+        with pytest.raises(RuntimeError):
+            with breaker.guard():
+                raise RuntimeError("Unexpected")
+        assert breaker.state == STATE_OPEN
+        # Another probe is allowed after the reset timeout.
+        now[0] += 30
+        assert breaker.allow_request() is True
+        with breaker.guard():
+            breaker.record_success()
+        assert breaker.state == STATE_CLOSED
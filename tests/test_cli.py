@@ -0,0 +1,115 @@
+from datetime import timedelta
+from typing import Generator
+
+import pytest
+from click.testing import Result
+from flask import Flask
+from flask.testing import FlaskCliRunner
+from mock import Mock
+from pytest_mock import MockFixture
+
+from dhos_sms_api.blueprint_api import controller
+from dhos_sms_api.helpers import cli
+
+
+class TestSmsCli:
+    @pytest.fixture
+    def runner(self, app: Flask) -> FlaskCliRunner:
+        return app.test_cli_runner()
+
+    @pytest.fixture
+    def mock_lock(self, mocker: MockFixture) -> Generator[Mock, None, None]:
+        mock_lock: Mock = mocker.patch.object(cli, "try_advisory_lock")
+        mock_lock.return_value.__enter__.return_value = True
+        yield mock_lock
+
+    def test_reconcile(
+        self, runner: FlaskCliRunner, mocker: MockFixture, mock_lock: Mock
+    ) -> None:
+        mock_poll: Mock = mocker.patch.object(
+            controller,
+            "poll_due_messages",
+            return_value={"polled": 12, "updated": 5, "redacted": 0, "failed": 1},
+        )
+        result: Result = runner.invoke(
+            args=[
+                "sms",
+                "reconcile",
+                "--window",
+                "24",
+                "--batch-size",
+                "100",
+                "--max-workers",
+                "3",
+            ]
+        )
+        assert result.exit_code == 0, result.output
+        mock_poll.assert_called_once_with(
+            window=timedelta(hours=24), chunk_size=100, max_workers=3
+        )
+        mock_lock.assert_called_once_with(controller.BULK_UPDATE_LOCK_NAME)
+        assert "Polled 12 SMS messages (5 updated, 1 failed) in " in result.output
+        assert "messages/s" in result.output
+
+    def test_reconcile_defaults(
+        self, runner: FlaskCliRunner, mocker: MockFixture, mock_lock: Mock
+    ) -> None:
+        mock_poll: Mock = mocker.patch.object(
+            controller,
+            "poll_due_messages",
+            return_value={"polled": 0, "updated": 0, "redacted": 0, "failed": 0},
+        )
+        result: Result = runner.invoke(args=["sms", "reconcile"])
+        assert result.exit_code == 0, result.output
+        mock_poll.assert_called_once_with(
+            window=None, chunk_size=None, max_workers=None
+        )
+
+    def test_reconcile_locked(
+        self, runner: FlaskCliRunner, mocker: MockFixture, mock_lock: Mock
+    ) -> None:
+        mock_lock.return_value.__enter__.return_value = False
+        mock_poll: Mock = mocker.patch.object(controller, "poll_due_messages")
+        result: Result = runner.invoke(args=["sms", "reconcile"])
+        assert result.exit_code == 1
+        assert "Another bulk update is running" in result.output
+        assert mock_poll.call_count == 0
+
+    def test_reconcile_dry_run(
+        self, runner: FlaskCliRunner, mocker: MockFixture
+    ) -> None:
+        mock_count: Mock = mocker.patch.object(
+            controller, "count_messages_due_poll", return_value=42
+        )
+        mock_poll: Mock = mocker.patch.object(controller, "poll_due_messages")
+        result: Result = runner.invoke(
+            args=["sms", "reconcile", "--dry-run", "--window", "1.5"]
+        )
+        assert result.exit_code == 0, result.output
+        mock_count.assert_called_once_with(window=timedelta(hours=1.5))
+        assert mock_poll.call_count == 0
+        assert "42 SMS messages are due a status poll" in result.output
+
+    def test_redact(self, runner: FlaskCliRunner, mocker: MockFixture) -> None:
+        mock_redact: Mock = mocker.patch.object(
+            controller,
+            "redact_all_due_messages",
+            return_value={"polled": 0, "updated": 0, "redacted": 9, "failed": 2},
+        )
+        result: Result = runner.invoke(
+            args=["sms", "redact", "--batch-size", "20", "--max-workers", "2"]
+        )
+        assert result.exit_code == 0, result.output
+        mock_redact.assert_called_once_with(window=None, batch_size=20, max_workers=2)
+        assert "Redacted 9 SMS messages (2 failed) in " in result.output
+
+    def test_redact_dry_run(self, runner: FlaskCliRunner, mocker: MockFixture) -> None:
+        mock_count: Mock = mocker.patch.object(
+            controller, "count_messages_due_redaction", return_value=7
+        )
+        mock_redact: Mock = mocker.patch.object(controller, "redact_all_due_messages")
+        result: Result = runner.invoke(args=["sms", "redact", "--dry-run"])
+        assert result.exit_code == 0, result.output
+        mock_count.assert_called_once_with(window=None)
+        assert mock_redact.call_count == 0
+        assert "7 SMS messages are due redaction" in result.output
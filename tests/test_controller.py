@@ -1,15 +1,31 @@
+import threading
 from datetime import datetime, timedelta, timezone
-from typing import Callable, Dict, Generator, List
+from typing import Any, Callable, Dict, Generator, Iterator, List, Optional
 
 import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from flask import Flask, jsonify
+from flask_batteries_included.helpers.error_handler import ServiceUnavailableException
 from flask_batteries_included.sqldb import db
 from mock import Mock
 from pytest_mock import MockFixture
+from requests_mock import Mocker
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from twilio.base.exceptions import TwilioRestException
+from werkzeug.exceptions import NotFound
 
 from dhos_sms_api.blueprint_api import controller
 from dhos_sms_api.helpers import twilio_client
-from dhos_sms_api.models.api_spec import SmsMessageResponse
-from dhos_sms_api.models.message import Message
+from dhos_sms_api.helpers.cache import get_cache
+from dhos_sms_api.models.api_spec import SmsMessageBatchResult, SmsMessageResponse
+from dhos_sms_api.models.bulk_update_job import BulkUpdateJob
+from dhos_sms_api.models.message import (
+    MESSAGE_RESPONSE_FIELDS,
+    Message,
+    MessageFieldPlan,
+    get_field_plan,
+)
 
 
 @pytest.mark.usefixtures("app")
@@ -23,7 +39,7 @@ class TestMessageController:
                 content="Heyo :)",
                 status="Sent",
                 uuid="5",
-                twilio_sid="twilio_sid",
+                twilio_sid="twilio_sid_5",
                 created=datetime(2019, 11, 14, 0, 0, 0, 0, tzinfo=timezone.utc),
                 trustomer_code="tox",
                 product_name="gdm",
@@ -34,7 +50,7 @@ class TestMessageController:
                 content="Hey",
                 status="Sent",
                 uuid="1",
-                twilio_sid="twilio_sid",
+                twilio_sid="twilio_sid_1",
                 created=datetime(2019, 11, 14, 0, 0, 0, 0, tzinfo=timezone.utc),
                 trustomer_code="tox",
                 product_name="gdm",
@@ -45,7 +61,7 @@ class TestMessageController:
                 content="You be ill",
                 status="Received",
                 uuid="2",
-                twilio_sid="twilio_sid",
+                twilio_sid="twilio_sid_2",
                 created=datetime(2019, 11, 14, 14, 0, 0, 0, tzinfo=timezone.utc),
                 trustomer_code="tox",
                 product_name="gdm",
@@ -56,7 +72,7 @@ class TestMessageController:
                 content="waddup",
                 status="Read",
                 uuid="3",
-                twilio_sid="twilio_sid",
+                twilio_sid="twilio_sid_3",
                 created=datetime(2019, 11, 15, 0, 0, 0, 0, tzinfo=timezone.utc),
                 trustomer_code="tox",
                 product_name="gdm",
@@ -67,7 +83,7 @@ class TestMessageController:
                 content="?",
                 status="Read",
                 uuid="4",
-                twilio_sid="twilio_sid",
+                twilio_sid="twilio_sid_4",
                 created=datetime(2019, 11, 16, 0, 11, 0, 0, tzinfo=timezone.utc),
                 trustomer_code="different",
                 product_name="different",
@@ -113,6 +129,191 @@ class TestMessageController:
             sender=message_optional["sender"],
         )
 
+    def test_create_message_circuit_open(
+        self, app: Flask, message: Dict, mock_twilio_send: Mock
+    ) -> None:
+        mock_twilio_send.side_effect = twilio_client.CircuitOpenException
+        with pytest.raises(ServiceUnavailableException):
+            controller.create_message(message)
+        assert Message.query.count() == 0
+
+    def test_create_message_circuit_open_divert(
+        self,
+        app: Flask,
+        monkeypatch: MonkeyPatch,
+        message: Dict,
+        mock_twilio_send: Mock,
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_CIRCUIT_BREAKER_DIVERT_TO_QUEUE", True)
+        mock_twilio_send.side_effect = twilio_client.CircuitOpenException
+        result = controller.create_message(message)
+        assert result["status"] == controller.PENDING_SMS_STATUS
+        assert Message.query.count() == 1
+
+    def test_create_messages_circuit_open_divert(
+        self,
+        app: Flask,
+        monkeypatch: MonkeyPatch,
+        message: Dict,
+        mock_twilio_send: Mock,
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_CIRCUIT_BREAKER_DIVERT_TO_QUEUE", True)
+        mock_twilio_send.side_effect = twilio_client.CircuitOpenException
+        results = controller.create_messages([message, message])
+        assert [r["message"]["status"] for r in results] == ["pending", "pending"]
+
+    def test_get_provider_status(self) -> None:
+        result = controller.get_provider_status()
+        assert set(result["circuit_breakers"]) == {"send", "fetch", "redact"}
+        assert result["circuit_breakers"]["send"]["state"] == "closed"
+
+    def test_queue_message(
+        self, message: Dict, mock_twilio_send: Mock, assert_valid_schema: Callable
+    ) -> None:
+        result = controller.queue_message(message)
+        assert result["status"] == controller.PENDING_SMS_STATUS
+        assert "twilio_sid" not in result
+        assert_valid_schema(SmsMessageResponse, result)
+        assert mock_twilio_send.call_count == 0
+
+    def test_queue_message_invalid_receiver(
+        self, message: Dict, mock_twilio_send: Mock
+    ) -> None:
+        with pytest.raises(ValueError):
+            controller.queue_message({**message, "receiver": "not a number"})
+        assert Message.query.count() == 0
+
+    def test_send_pending_messages(self, message: Dict, mock_twilio_send: Mock) -> None:
+        queued = controller.queue_message(message)
+        assert controller.send_pending_messages(batch_size=10) == 1
+        mock_twilio_send.assert_called_with(
+            phone_number=message["receiver"],
+            content=message["content"],
+            sender=message["sender"],
+        )
+        sent_message = Message.query.filter_by(uuid=queued["uuid"]).first()
+        assert sent_message.status == "some_status"
+        assert sent_message.twilio_sid == "some_sid_1"
+        assert controller.send_pending_messages(batch_size=10) == 0
+
+    def test_send_pending_messages_twilio_unavailable(
+        self, message: Dict, mock_twilio_send: Mock
+    ) -> None:
+        queued = controller.queue_message(message)
+        mock_twilio_send.side_effect = ServiceUnavailableException(
+            TwilioRestException(status=503, uri="/Messages", msg="Unavailable")
+        )
+        assert controller.send_pending_messages(batch_size=10) == 0
+        pending_message = Message.query.filter_by(uuid=queued["uuid"]).first()
+        assert pending_message.status == controller.PENDING_SMS_STATUS
+
+    def test_send_pending_messages_rejected(
+        self, message: Dict, mock_twilio_send: Mock
+    ) -> None:
+        queued = controller.queue_message(message)
+        mock_twilio_send.side_effect = ServiceUnavailableException(
+            TwilioRestException(
+                status=400, uri="/Messages", msg="Invalid 'To' number", code=21211
+            )
+        )
+        assert controller.send_pending_messages(batch_size=10) == 1
+        failed_message = Message.query.filter_by(uuid=queued["uuid"]).first()
+        assert failed_message.status == "failed"
+        assert failed_message.error_code == "21211"
+        assert failed_message.twilio_sid is None
+
+    def test_send_pending_messages_unexpected_error(
+        self, message: Dict, mock_twilio_send: Mock
+    ) -> None:
+        first = controller.queue_message(message)
+        broken = controller.queue_message(message)
+        last = controller.queue_message(message)
+        Message.query.filter_by(uuid=broken["uuid"]).update({"receiver": "nonsense"})
+        db.session.commit()
+        send = mock_twilio_send.side_effect
+        mock_twilio_send.side_effect = [
+            send(phone_number="", content="", sender=""),
+            RuntimeError("Surprise"),
+        ]
+        # The message already sent is saved before the failure.
+        assert controller.send_pending_messages(batch_size=1) == 1
+        assert controller.send_pending_messages(batch_size=10) == 2
+        messages = {sms.uuid: sms for sms in Message.query.all()}
+        assert messages[first["uuid"]].twilio_sid == "some_sid_1"
+        assert messages[broken["uuid"]].status == "failed"
+        assert "Invalid receiver" in messages[broken["uuid"]].error_message
+        assert messages[last["uuid"]].status == "failed"
+        assert messages[last["uuid"]].error_message == "Surprise"
+
+    def test_create_messages(
+        self, message: Dict, mock_twilio_send: Mock, assert_valid_schema: Callable
+    ) -> None:
+        def _send(phone_number: str, content: str, sender: str) -> Dict:
+            if content == "unlucky":
+                raise ServiceUnavailableException(
+                    TwilioRestException(status=400, uri="/Messages", code=21610)
+                )
+            return {
+                "status": "queued",
+                "twilio_sid": f"sid_{content}",
+                "date_sent": None,
+                "error_code": None,
+                "error_message": None,
+            }
+
+        mock_twilio_send.side_effect = _send
+        results = controller.create_messages(
+            [
+                {**message, "content": "first"},
+                {**message, "receiver": "not a number"},
+                {**message, "content": "unlucky"},
+                {**message, "content": "second"},
+            ]
+        )
+        assert len(results) == 4
+        assert results[0]["message"]["twilio_sid"] == "sid_first"
+        assert "Invalid receiver" in results[1]["error"]
+        assert "code 21610" in results[2]["error"]
+        assert results[3]["message"]["twilio_sid"] == "sid_second"
+        assert_valid_schema(SmsMessageBatchResult, results, many=True)
+        assert mock_twilio_send.call_count == 3
+        assert Message.query.count() == 2
+        stored = controller.get_message_by_uuid(results[3]["message"]["uuid"])
+        assert stored == results[3]["message"]
+
+    def test_create_messages_unexpected_error(
+        self, message: Dict, mock_twilio_send: Mock
+    ) -> None:
+        send = mock_twilio_send.side_effect
+
+        def _send(phone_number: str, content: str, sender: str) -> Dict:
+            if content == "unlucky":
+                raise RuntimeError("Surprise")
+            return send(phone_number=phone_number, content=content, sender=sender)
+
+        mock_twilio_send.side_effect = _send
+        results = controller.create_messages(
+            [message, {**message, "content": "unlucky"}, message]
+        )
+        assert results[1] == {"error": "Failed to send SMS request"}
+        assert {sms.uuid for sms in Message.query.all()} == {
+            results[0]["message"]["uuid"],
+            results[2]["message"]["uuid"],
+        }
+
+    def test_queue_messages(
+        self, message: Dict, mock_twilio_send: Mock, assert_valid_schema: Callable
+    ) -> None:
+        results = controller.queue_messages(
+            [message, {**message, "receiver": "not a number"}, message]
+        )
+        assert results[0]["message"]["status"] == controller.PENDING_SMS_STATUS
+        assert "error" in results[1]
+        assert results[2]["message"]["status"] == controller.PENDING_SMS_STATUS
+        assert_valid_schema(SmsMessageBatchResult, results, many=True)
+        assert mock_twilio_send.call_count == 0
+        assert Message.query.count() == 2
+
     def test_get_message_by_uuid(
         self, message: Dict, assert_valid_schema: Callable
     ) -> None:
@@ -121,17 +322,201 @@ class TestMessageController:
         assert result == message_response
         assert_valid_schema(SmsMessageResponse, result)
 
+    def test_get_message_by_uuid_fields(self, message: Dict) -> None:
+        message_response = controller.create_message(message)
+        result = controller.get_message_by_uuid(
+            message_response["uuid"], fields=["status", "uuid", "created"]
+        )
+        assert result == {
+            key: message_response[key] for key in ("uuid", "status", "created")
+        }
+
+    def test_get_message_by_uuid_unknown_fields(self, message: Dict) -> None:
+        message_response = controller.create_message(message)
+        with pytest.raises(ValueError, match="Unknown message fields: bar, foo"):
+            controller.get_message_by_uuid(
+                message_response["uuid"], fields=["uuid", "foo", "bar"]
+            )
+
+    def test_get_message_by_uuid_cached(self, message: Dict) -> None:
+        message_uuid: str = controller.create_message(message)["uuid"]
+        first = controller.get_message_by_uuid(message_uuid)
+        # Written behind the cache's back, so not seen until the entry expires.
+        Message.query.filter_by(uuid=message_uuid).update({"status": "sending"})
+        db.session.commit()
+        assert controller.get_message_by_uuid(message_uuid) == first
+        assert controller.get_message_by_uuid(message_uuid, fields=["status"]) == {
+            "status": first["status"]
+        }
+        assert get_cache(controller.MESSAGE_CACHE_NAME, 0).stats() == {
+            "size": 1,
+            "maxsize": 10000,
+            "hits": 2,
+            "misses": 1,
+        }
+
+    def test_get_message_by_uuid_cache_ttl(
+        self, app: Flask, monkeypatch: MonkeyPatch, message: Dict
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_MESSAGE_CACHE_TTL", 0)
+        message_uuid: str = controller.create_message(message)["uuid"]
+        for status in ["sending", "delivered", "failed"]:
+            controller.get_message_by_uuid(message_uuid)
+            Message.query.filter_by(uuid=message_uuid).update({"status": status})
+            db.session.commit()
+        # Terminal messages are cached for longer.
+        assert controller.get_message_by_uuid(message_uuid)["status"] == "delivered"
+
+    def test_get_message_by_uuid_cache_ttl_redaction_due(
+        self, app: Flask, monkeypatch: MonkeyPatch, message: Dict
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_MESSAGE_CACHE_TTL", 0)
+        message_uuid: str = controller.create_message(message)["uuid"]
+        Message.query.filter_by(uuid=message_uuid).update(
+            {"status": "delivered", "redaction_due": datetime.utcnow()}
+        )
+        db.session.commit()
+        controller.get_message_by_uuid(message_uuid)
+        # Redaction is still due, so the message isn't cached for longer.
+        Message.query.filter_by(uuid=message_uuid).update(
+            {"redacted": datetime.utcnow(), "redaction_due": None}
+        )
+        db.session.commit()
+        assert "redacted" in controller.get_message_by_uuid(message_uuid)
+
+    def test_get_message_by_uuid_no_status(self, message: Dict) -> None:
+        message_uuid: str = controller.create_message(message)["uuid"]
+        Message.query.filter_by(uuid=message_uuid).update({"status": None})
+        db.session.commit()
+        result = controller.get_message_by_uuid(message_uuid)
+        assert result["uuid"] == message_uuid
+        assert "status" not in result
+
+    def test_get_message_by_uuid_fields_not_cached(self, message: Dict) -> None:
+        message_uuid: str = controller.create_message(message)["uuid"]
+        controller.get_message_by_uuid(message_uuid, fields=["uuid"])
+        assert len(get_cache(controller.MESSAGE_CACHE_NAME, 0)) == 0
+
+    def test_message_cache_invalidated(self, message: Dict) -> None:
+        existing_message = controller.create_message(message)
+        message_uuid: str = existing_message["uuid"]
+        controller.get_message_by_uuid(message_uuid)
+        controller.sms_callback(
+            {"MessageSid": existing_message["twilio_sid"], "MessageStatus": "sent"}
+        )
+        assert controller.get_message_by_uuid(message_uuid)["status"] == "sent"
+        controller.delete_message(
+            message_uuid,
+            trustomer_code=existing_message["trustomer_code"],
+            product_name=existing_message["product_name"],
+        )
+        with pytest.raises(NotFound):
+            controller.get_message_by_uuid(message_uuid)
+
+    def test_message_cache_invalidated_on_commit(self, message: Dict) -> None:
+        message_uuid: str = controller.create_message(message)["uuid"]
+        cached = controller.get_message_by_uuid(message_uuid)
+        controller._forget_cached_messages([message_uuid])
+        db.session.rollback()
+        assert controller.get_message_by_uuid(message_uuid) == cached
+        controller._forget_cached_messages([message_uuid])
+        assert controller.get_message_by_uuid(message_uuid) == cached
+        db.session.commit()
+        assert len(get_cache(controller.MESSAGE_CACHE_NAME, 0)) == 0
+
+    def test_get_message_etag(self, message: Dict) -> None:
+        existing_message = controller.create_message(message)
+        message_uuid: str = existing_message["uuid"]
+        etag: str = controller.get_message_etag(message_uuid)
+        controller.get_message_by_uuid(message_uuid)
+        assert controller.get_message_etag(message_uuid) == etag
+        controller.sms_callback(
+            {"MessageSid": existing_message["twilio_sid"], "MessageStatus": "delivered"}
+        )
+        assert controller.get_message_etag(message_uuid) != etag
+        with pytest.raises(NotFound):
+            controller.get_message_etag("unknown")
+
+    def test_get_message_with_etag(self, message: Dict) -> None:
+        message_uuid: str = controller.create_message(message)["uuid"]
+        etag: str = controller.get_message_etag(message_uuid)
+        # From the database, limited or not, and then from the cache.
+        for fields in [["uuid"], None, None, ["status"]]:
+            result, result_etag = controller.get_message_with_etag(
+                message_uuid, fields=fields
+            )
+            assert result_etag == etag
+        assert list(result) == ["status"]
+
+    def test_get_message_etag_stale_cache(self, message: Dict) -> None:
+        message_uuid: str = controller.create_message(message)["uuid"]
+        etag: str = controller.get_message_etag(message_uuid)
+        controller.get_message_by_uuid(message_uuid)
+        # Written behind the cache's back, as by another process.
+        Message.query.filter_by(uuid=message_uuid).update(
+            {
+                "status": "delivered",
+                "modified": datetime.utcnow() + timedelta(seconds=1),
+            }
+        )
+        db.session.commit()
+        assert controller.get_message_etag(message_uuid) != etag
+        # The stale cached message was dropped along the way.
+        assert controller.get_message_by_uuid(message_uuid)["status"] == "delivered"
+
+    def test_get_messages_etag(self, existing_messages: List[Message]) -> None:
+        def page_etags() -> List[str]:
+            return [
+                controller.get_messages_etag(limit=2),
+                controller.get_messages_etag(limit=3),
+            ]
+
+        etags: List[str] = page_etags()
+        assert etags == page_etags()
+        assert len(set(etags)) == 2
+
+        # Pages are 4, 3 and 4, 3, 2. Updating a message on them changes them...
+        Message.query.filter_by(uuid="4").update({"status": "delivered"})
+        db.session.commit()
+        updated_etags: List[str] = page_etags()
+        assert updated_etags[0] != etags[0]
+        assert updated_etags[1] != etags[1]
+
+        # ...as does deleting one, even though the next message is older...
+        Message.query.filter_by(uuid="3").update({"deleted": datetime(2000, 1, 1)})
+        db.session.commit()
+        deleted_etags: List[str] = page_etags()
+        assert deleted_etags[0] != updated_etags[0]
+        assert deleted_etags[1] != updated_etags[1]
+
+        # ...but not updating a message on a later page.
+        Message.query.filter_by(uuid="1").update({"status": "delivered"})
+        db.session.commit()
+        assert page_etags() == deleted_etags
+
+    def test_get_all_messages_with_etag(self, existing_messages: List[Dict]) -> None:
+        cursor: Optional[str] = None
+        for fields in [None, ["status"], ["uuid", "modified"]]:
+            page, next_cursor, etag = controller.get_all_messages_with_etag(
+                limit=2, cursor=cursor, fields=fields
+            )
+            assert etag == controller.get_messages_etag(limit=2, cursor=cursor)
+            cursor = next_cursor
+        assert len(page) == 1
+        assert next_cursor is None
+
     def test_get_all_messages(
         self, existing_messages: List[Dict], assert_valid_schema: Callable
     ) -> None:
-        result = controller.get_all_messages()
+        result, next_cursor = controller.get_all_messages()
         assert len(result) == 5
+        assert next_cursor is None
         assert_valid_schema(SmsMessageResponse, result, many=True)
 
     def test_get_all_messages_filter(
         self, existing_messages: List[Dict], assert_valid_schema: Callable
     ) -> None:
-        result = controller.get_all_messages(receiver="+447123456789", limit=2)
+        result, _ = controller.get_all_messages(receiver="+447123456789", limit=2)
         assert len(result) == 2
         assert_valid_schema(SmsMessageResponse, result, many=True)
         assert all(m["receiver"] == "+447123456789" for m in result)
@@ -139,6 +524,87 @@ class TestMessageController:
         created_timestamps = [m["created"] for m in result]
         assert sorted(created_timestamps, reverse=True) == created_timestamps
 
+    def test_get_all_messages_pages(self, existing_messages: List[Dict]) -> None:
+        all_messages, _ = controller.get_all_messages()
+        pages: List[List[Dict]] = []
+        cursor: Optional[str] = None
+        while True:
+            page, cursor = controller.get_all_messages(limit=2, cursor=cursor)
+            pages.append(page)
+            if cursor is None:
+                break
+        assert [len(page) for page in pages] == [2, 2, 1]
+        # Messages created at the same time are ordered by uuid, so none are skipped.
+        assert [m["uuid"] for page in pages for m in page] == [
+            m["uuid"] for m in all_messages
+        ]
+
+    def test_stream_all_messages(
+        self,
+        app: Flask,
+        monkeypatch: MonkeyPatch,
+        existing_messages: List[Dict],
+        assert_valid_schema: Callable,
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_LIST_STREAM_BATCH_SIZE", 2)
+        all_messages, _ = controller.get_all_messages()
+        streamed = controller.stream_all_messages()
+        assert isinstance(streamed, Iterator)
+        result = list(streamed)
+        assert result == all_messages
+        assert_valid_schema(SmsMessageResponse, result, many=True)
+        result = list(controller.stream_all_messages(receiver="+447123456789", limit=2))
+        assert [m["uuid"] for m in result] == [
+            m["uuid"] for m in all_messages if m["receiver"] == "+447123456789"
+        ][:2]
+
+    def test_get_all_messages_fields(self, existing_messages: List[Dict]) -> None:
+        all_messages, _ = controller.get_all_messages()
+        pages: List[List[Dict]] = []
+        cursor: Optional[str] = None
+        while True:
+            # The cursor still works without the key fields.
+            page, cursor = controller.get_all_messages(
+                limit=2, cursor=cursor, fields=["status", "error_code"]
+            )
+            pages.append(page)
+            if cursor is None:
+                break
+        assert [m for page in pages for m in page] == [
+            {key: m[key] for key in ("status", "error_code") if key in m}
+            for m in all_messages
+        ]
+        streamed = list(controller.stream_all_messages(fields=["uuid"]))
+        assert streamed == [{"uuid": m["uuid"]} for m in all_messages]
+
+    def test_field_plan_columns(self) -> None:
+        plan: MessageFieldPlan = get_field_plan(frozenset(["uuid", "status"]))
+        # In the order of the message's dict, and only those columns.
+        assert plan.columns == [Message.status, Message.uuid]
+        assert plan.columns_with(Message.created, Message.uuid) == [
+            Message.status,
+            Message.uuid,
+            Message.created,
+        ]
+        assert get_field_plan(frozenset(["status", "uuid"])) is plan
+        assert len(get_field_plan().columns) == len(MESSAGE_RESPONSE_FIELDS)
+
+    def test_get_all_messages_page_size(
+        self, app: Flask, monkeypatch: MonkeyPatch, existing_messages: List[Dict]
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_LIST_DEFAULT_PAGE_SIZE", 3)
+        monkeypatch.setitem(app.config, "SMS_LIST_MAX_PAGE_SIZE", 4)
+        result, next_cursor = controller.get_all_messages()
+        assert len(result) == 3
+        assert next_cursor is not None
+        result, _ = controller.get_all_messages(limit=100)
+        assert len(result) == 4
+
+    @pytest.mark.parametrize("cursor", ["not a cursor", "bm9wZQ==", "bm8sZGF0ZQ=="])
+    def test_get_all_messages_invalid_cursor(self, cursor: str) -> None:
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            controller.get_all_messages(cursor=cursor)
+
     def test_sms_callback(self, message: Dict) -> None:
         existing_message = controller.create_message(message)
         controller.sms_callback(
@@ -154,12 +620,53 @@ class TestMessageController:
         assert resulting_message.error_code == "1234"
         assert resulting_message.status == "error"
 
-    @pytest.mark.parametrize(
-        "status,redact_expected",
-        [("error", False), ("sent", False), ("delivered", True)],
-    )
-    def test_sms_callback_redaction(
-        self, mocker: MockFixture, message: Dict, status: str, redact_expected: bool
+    def test_sms_callback_deleted_message(self, message: Dict) -> None:
+        existing_message = controller.create_message(message)
+        controller.delete_message(
+            existing_message["uuid"],
+            trustomer_code=existing_message["trustomer_code"],
+            product_name=existing_message["product_name"],
+        )
+        # Deleted messages are treated as unknown, and left alone.
+        with pytest.raises(ValueError):
+            controller.sms_callback(
+                {
+                    "MessageSid": existing_message["twilio_sid"],
+                    "MessageStatus": "delivered",
+                }
+            )
+        deleted: Message = Message.query_class(
+            Message, session=db.session(), _with_deleted=True
+        ).one()
+        assert deleted.status == existing_message["status"]
+        assert deleted.redaction_due is None
+
+    def test_sms_callback_unknown_sid(self) -> None:
+        with pytest.raises(ValueError):
+            controller.sms_callback(
+                {"MessageSid": "unknown", "MessageStatus": "delivered"}
+            )
+
+    def test_sms_callback_no_change(self, mocker: MockFixture, message: Dict) -> None:
+        existing_message = controller.create_message(message)
+        callback = {
+            "MessageSid": existing_message["twilio_sid"],
+            "MessageStatus": "delivered",
+        }
+        controller.sms_callback(callback)
+        modified = Message.query.filter_by(uuid=existing_message["uuid"]).one().modified
+        mock_update: Mock = mocker.spy(controller, "_update_message_by_sid")
+
+        controller.sms_callback(callback)
+
+        assert mock_update.spy_return is None
+        assert (
+            Message.query.filter_by(uuid=existing_message["uuid"]).one().modified
+            == modified
+        )
+
+    def test_sms_callback_does_not_redact(
+        self, mocker: MockFixture, message: Dict
     ) -> None:
         mock_redact: Mock = mocker.patch.object(
             twilio_client, "redact_message_body", return_value=True
@@ -168,19 +675,245 @@ class TestMessageController:
         controller.sms_callback(
             {
                 "MessageSid": existing_message["twilio_sid"],
-                "MessageStatus": status,
+                "MessageStatus": "delivered",
             }
         )
         resulting_message = Message.query.filter_by(
             uuid=existing_message["uuid"]
         ).first()
-        assert resulting_message.status == status
-        if redact_expected:
-            mock_redact.assert_called_with(existing_message["twilio_sid"])
-            assert resulting_message.redacted is not None
-        else:
-            assert mock_redact.call_count == 0
-            assert resulting_message.redacted is None
+        assert resulting_message.status == "delivered"
+        # Redaction is left to the redaction worker.
+        assert mock_redact.call_count == 0
+        assert resulting_message.redacted is None
+        assert resulting_message.redaction_due is not None
+
+    @pytest.mark.parametrize(
+        "initial,callbacks,expected",
+        [
+            ("sent", ["queued"], "sent"),
+            ("sent", ["delivered", "sent"], "delivered"),
+            ("delivered", ["failed"], "delivered"),
+            ("pending", ["accepted", "sending"], "sending"),
+            ("sent", ["read"], "read"),
+            ("some_status", ["queued"], "queued"),
+        ],
+    )
+    def test_sms_callback_status_order(
+        self,
+        message: Dict,
+        mock_twilio_send: Mock,
+        initial: str,
+        callbacks: List[str],
+        expected: str,
+    ) -> None:
+        existing_message = controller.create_message(message)
+        Message.query.filter_by(uuid=existing_message["uuid"]).update(
+            {"status": initial}
+        )
+        db.session.commit()
+        for status in callbacks:
+            controller.sms_callback(
+                {"MessageSid": existing_message["twilio_sid"], "MessageStatus": status}
+            )
+        resulting_message = Message.query.filter_by(uuid=existing_message["uuid"]).one()
+        assert resulting_message.status == expected
+
+    def test_sms_callback_repeated_status_with_details(
+        self, message: Dict, mock_twilio_send: Mock
+    ) -> None:
+        existing_message = controller.create_message(message)
+        callback = {
+            "MessageSid": existing_message["twilio_sid"],
+            "MessageStatus": "failed",
+        }
+        controller.sms_callback(callback)
+        get_cache(controller.CALLBACK_CACHE_NAME, 1).clear()
+        controller.sms_callback({**callback, "ErrorCode": "30003"})
+        resulting_message = Message.query.filter_by(uuid=existing_message["uuid"]).one()
+        assert resulting_message.status == "failed"
+        assert resulting_message.error_code == "30003"
+
+    def test_sms_callback_duplicate_skips_database(
+        self, mocker: MockFixture, message: Dict, mock_twilio_send: Mock
+    ) -> None:
+        existing_message = controller.create_message(message)
+        callback = {
+            "MessageSid": existing_message["twilio_sid"],
+            "MessageStatus": "delivered",
+        }
+        mock_update: Mock = mocker.spy(controller, "_update_message_by_sid")
+        controller.sms_callback(callback)
+        controller.sms_callback(callback)
+        assert mock_update.call_count == 1
+
+        # The same status with new details isn't a duplicate.
+        controller.sms_callback({**callback, "ErrorCode": "30003"})
+        assert mock_update.call_count == 2
+        assert Message.query.one().error_code == "30003"
+
+    @pytest.mark.parametrize(
+        "current,new,expected",
+        [
+            (None, "queued", True),
+            ("queued", None, False),
+            ("queued", "sent", True),
+            ("sent", "queued", False),
+            ("sent", "sent", False),
+            ("delivered", "undelivered", False),
+            ("delivered", "read", True),
+            ("read", "read", False),
+        ],
+    )
+    def test_status_supersedes(
+        self, current: Optional[str], new: Optional[str], expected: bool
+    ) -> None:
+        assert controller._status_supersedes(current, new) is expected
+
+    def test_create_message_terminal_schedules_redaction(
+        self, message: Dict, mock_twilio_send: Mock
+    ) -> None:
+        mock_twilio_send.side_effect = None
+        mock_twilio_send.return_value = {
+            "status": "failed",
+            "twilio_sid": "failed_sid",
+            "date_sent": None,
+            "error_code": "30003",
+            "error_message": "Unreachable destination handset",
+        }
+        result = controller.create_message(message)
+        sms = Message.query.filter_by(uuid=result["uuid"]).one()
+        assert sms.redaction_due is not None
+        assert sms.next_poll_at is None
+
+    @pytest.fixture
+    def due_messages(self) -> List[Message]:
+        messages = [
+            Message(
+                sender="GDm-Health",
+                receiver="+447123456789",
+                content="Heyo :)",
+                status="delivered",
+                uuid=f"uuid_{i}",
+                twilio_sid=f"twilio_sid_{i}",
+                trustomer_code="tox",
+                product_name="gdm",
+                redaction_due=datetime.utcnow() - timedelta(minutes=i),
+            )
+            for i in range(3)
+        ]
+        db.session.add_all(messages)
+        db.session.commit()
+        return messages
+
+    def test_redact_due_messages(
+        self, mocker: MockFixture, due_messages: List[Message]
+    ) -> None:
+        mock_redact: Mock = mocker.patch.object(
+            twilio_client, "redact_message_body", return_value=True
+        )
+        assert controller.redact_due_messages(batch_size=2) == 2
+        # Oldest first.
+        assert [c.args[0] for c in mock_redact.call_args_list] == [
+            "twilio_sid_2",
+            "twilio_sid_1",
+        ]
+        assert controller.redact_due_messages(batch_size=2) == 1
+        assert controller.redact_due_messages(batch_size=2) == 0
+        for sms in Message.query.all():
+            assert sms.redacted is not None
+            assert sms.redaction_due is None
+            assert sms.redaction_attempts == 1
+
+    def test_redact_all_due_messages(
+        self, mocker: MockFixture, due_messages: List[Message]
+    ) -> None:
+        mocker.patch.object(
+            twilio_client, "redact_message_body", side_effect=[True, False, True]
+        )
+        assert controller.count_messages_due_redaction() == 3
+        progress = controller.redact_all_due_messages(batch_size=2, max_workers=1)
+        assert progress == {"polled": 0, "updated": 0, "redacted": 2, "failed": 1}
+        # The failed redaction is retried later.
+        assert controller.count_messages_due_redaction() == 0
+
+    def test_redact_all_due_messages_window(
+        self, mocker: MockFixture, due_messages: List[Message]
+    ) -> None:
+        due_messages[0].created = datetime.utcnow() - timedelta(days=2)
+        db.session.commit()
+        mock_redact: Mock = mocker.patch.object(
+            twilio_client, "redact_message_body", return_value=True
+        )
+        window = timedelta(days=1)
+        assert controller.count_messages_due_redaction(window=window) == 2
+        progress = controller.redact_all_due_messages(window=window)
+        assert progress["redacted"] == 2
+        assert [c.args[0] for c in mock_redact.call_args_list] == [
+            "twilio_sid_2",
+            "twilio_sid_1",
+        ]
+
+    @pytest.mark.freeze_time("2026-01-01T12:00:00")
+    def test_redact_due_messages_backoff(
+        self, app: Flask, mocker: MockFixture, due_messages: List[Message]
+    ) -> None:
+        mocker.patch.object(
+            twilio_client,
+            "redact_message_body",
+            side_effect=[False, Exception("oops"), True],
+        )
+        assert controller.redact_due_messages(batch_size=10) == 3
+        redaction_due = {
+            sms.uuid: sms.redaction_due
+            for sms in Message.query.filter(Message.redacted.is_(None))
+        }
+        retry_at = datetime(2026, 1, 1, 12, 1)
+        assert redaction_due == {"uuid_2": retry_at, "uuid_1": retry_at}
+
+        # Nothing is due until the retry delay has passed.
+        assert controller.redact_due_messages(batch_size=10) == 0
+
+    def test_redact_due_messages_gives_up(
+        self,
+        app: Flask,
+        monkeypatch: MonkeyPatch,
+        mocker: MockFixture,
+        due_messages: List[Message],
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_REDACTION_MAX_ATTEMPTS", 2)
+        monkeypatch.setitem(app.config, "SMS_REDACTION_RETRY_DELAY", 0)
+        mocker.patch.object(twilio_client, "redact_message_body", return_value=False)
+        assert controller.redact_due_messages(batch_size=10) == 3
+        assert controller.redact_due_messages(batch_size=10) == 3
+        assert controller.redact_due_messages(batch_size=10) == 0
+        for sms in Message.query.all():
+            assert sms.redacted is None
+            assert sms.redaction_due is None
+            assert sms.redaction_attempts == 2
+
+    def test_redact_due_messages_circuit_open(
+        self,
+        app: Flask,
+        monkeypatch: MonkeyPatch,
+        mocker: MockFixture,
+        due_messages: List[Message],
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_REDACTION_MAX_ATTEMPTS", 1)
+        mock_redact: Mock = mocker.patch.object(
+            twilio_client,
+            "redact_message_body",
+            side_effect=[True, twilio_client.CircuitOpenException, False],
+        )
+        # Refused by the circuit breaker part way through the batch.
+        assert controller.redact_due_messages(batch_size=10) == 2
+        refused: Message = Message.query.filter_by(uuid="uuid_1").one()
+        assert refused.redaction_attempts == 0
+        assert refused.redaction_due is not None
+        # Nothing is attempted while the circuit breaker is open.
+        mocker.patch.object(twilio_client, "is_available", return_value=False)
+        assert controller.redact_due_messages(batch_size=10) == 0
+        assert mock_redact.call_count == 3
+        assert Message.query.filter_by(uuid="uuid_1").one().redaction_due is not None
 
     def test_delete_message(self, message: Dict) -> None:
         existing_message = controller.create_message(message)
@@ -190,6 +923,42 @@ class TestMessageController:
             product_name=existing_message["product_name"],
         )
         assert result["uuid"] == existing_message["uuid"]
+        assert result["deleted"] is not None
+        deleted: Message = Message.query_class(
+            Message, session=db.session(), _with_deleted=True
+        ).one()
+        assert result == deleted.to_dict()
+
+    def test_delete_message_other_trustomer(self, message: Dict) -> None:
+        existing_message = controller.create_message(message)
+        with pytest.raises(PermissionError):
+            controller.delete_message(
+                existing_message["uuid"],
+                trustomer_code="someone_else",
+                product_name=existing_message["product_name"],
+            )
+        assert Message.query.count() == 1
+
+    def test_field_plan_to_dict(
+        self, app: Flask, existing_messages: List[Dict]
+    ) -> None:
+        sms: Message = Message.query.filter_by(uuid="2").one()
+        sms.redacted = datetime(2019, 11, 15, 1, 2, 3)
+        sms.error_code = None
+        db.session.commit()
+        plan: MessageFieldPlan = get_field_plan()
+        for sms in Message.query.all():
+            row = (
+                Message.query.with_entities(*plan.columns)
+                .filter_by(uuid=sms.uuid)
+                .one()
+            )
+            result = plan.to_dict(row)
+            assert result == sms.to_dict()
+            assert list(result) == list(sms.to_dict())
+            # So the JSON is byte-identical.
+            with app.test_request_context():
+                assert jsonify(result).get_data() == jsonify(sms.to_dict()).get_data()
 
     @pytest.mark.freeze_time("2019-11-14T00:00:00.000Z")
     def test_message_status_counts(self, existing_messages: List[Dict]) -> None:
@@ -242,6 +1011,20 @@ class TestMessageController:
             },
         }
 
+    def test_twilio_sid_is_unique(self, existing_messages: List[Message]) -> None:
+        duplicate = Message(
+            sender="GDm-Health",
+            receiver="+447123456789",
+            content="again",
+            twilio_sid=existing_messages[0].twilio_sid,
+            trustomer_code="tox",
+            product_name="gdm",
+        )
+        db.session.add(duplicate)
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+
     def test_sms_bulk_update_messages(self, mocker: MockFixture) -> None:
         messages = [
             Message(
@@ -250,8 +1033,9 @@ class TestMessageController:
                 content="Heyo :)",
                 status="Sent",
                 uuid="5",
-                twilio_sid="twilio_sid",
+                twilio_sid="twilio_sid_5",
                 created=datetime.now(tz=timezone.utc) - timedelta(days=2),
+                next_poll_at=datetime.utcnow(),
                 trustomer_code="tox",
                 product_name="gdm",
             ),
@@ -261,8 +1045,9 @@ class TestMessageController:
                 content="Hey",
                 status="Sent",
                 uuid="1",
-                twilio_sid="twilio_sid",
+                twilio_sid="twilio_sid_1",
                 created=datetime.now(tz=timezone.utc) - timedelta(days=1),
+                next_poll_at=datetime.utcnow(),
                 trustomer_code="tox",
                 product_name="gdm",
             ),
@@ -307,8 +1092,9 @@ class TestMessageController:
             content="Heyo :)",
             status="Sent",
             uuid="5",
-            twilio_sid="twilio_sid",
+            twilio_sid="twilio_sid_5",
             created=datetime.now(tz=timezone.utc) - timedelta(days=2),
+            next_poll_at=datetime.utcnow(),
             trustomer_code="tox",
             product_name="gdm",
         )
@@ -321,6 +1107,456 @@ class TestMessageController:
         controller.sms_bulk_update()
         assert mock_get.call_count == 1
 
+    def test_sms_bulk_update_concurrent(
+        self, app: Flask, monkeypatch: MonkeyPatch, mocker: MockFixture
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_BULK_UPDATE_MAX_WORKERS", 4)
+        messages = [
+            Message(
+                sender="GDm-Health",
+                receiver="+447123456789",
+                content="Heyo :)",
+                status="sent",
+                uuid=f"uuid_{i}",
+                twilio_sid=f"twilio_sid_{i}",
+                created=datetime.now(tz=timezone.utc) - timedelta(days=1),
+                next_poll_at=datetime.utcnow(),
+                trustomer_code="tox",
+                product_name="gdm",
+            )
+            for i in range(4)
+        ]
+        db.session.add_all(messages)
+        db.session.commit()
+        # Every poll waits for the others, so this only completes if all four run at once.
+        barrier = threading.Barrier(4, timeout=5)
+
+        def _get_message(twilio_sid: str) -> Optional[Dict]:
+            barrier.wait()
+            if twilio_sid == "twilio_sid_3":
+                raise Exception("oops")
+            return {
+                "status": "undelivered",
+                "twilio_sid": twilio_sid,
+                "date_sent": "some_date",
+                "error_code": "30003",
+                "error_message": "Unreachable destination handset",
+            }
+
+        mocker.patch.object(twilio_client, "get_message", side_effect=_get_message)
+        mocker.patch.object(twilio_client, "redact_message_body", return_value=True)
+        controller.sms_bulk_update()
+        statuses = {sms.uuid: sms.status for sms in Message.query.all()}
+        assert statuses == {
+            "uuid_0": "undelivered",
+            "uuid_1": "undelivered",
+            "uuid_2": "undelivered",
+            "uuid_3": "sent",
+        }
+        sms = Message.query.filter_by(uuid="uuid_0").one()
+        assert sms.error_code == "30003"
+        assert sms.error_message == "Unreachable destination handset"
+
+    @pytest.fixture
+    def incomplete_messages(self) -> List[Message]:
+        created = datetime.utcnow() - timedelta(days=1)
+        messages = [
+            Message(
+                sender="GDm-Health",
+                receiver="+447123456789",
+                content="Heyo :)",
+                status="sent",
+                uuid=f"uuid_{i}",
+                twilio_sid=f"twilio_sid_{i}",
+                # Pairs of messages share a created time, so the uuid breaks the tie.
+                created=created + timedelta(seconds=i // 2),
+                next_poll_at=datetime.utcnow(),
+                trustomer_code="tox",
+                product_name="gdm",
+            )
+            for i in range(5)
+        ]
+        db.session.add_all(messages)
+        db.session.commit()
+        return messages
+
+    def test_poll_due_messages_invalidates_cache(
+        self, mock_twilio_get: Mock, incomplete_messages: List[Message]
+    ) -> None:
+        assert controller.get_message_by_uuid("uuid_0")["status"] == "sent"
+        controller.poll_due_messages()
+        assert controller.get_message_by_uuid("uuid_0")["status"] == "some_status"
+
+    def test_poll_due_messages_window(
+        self, mocker: MockFixture, incomplete_messages: List[Message]
+    ) -> None:
+        incomplete_messages[4].created = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+        mock_get: Mock = mocker.patch.object(
+            twilio_client, "get_message", return_value=None
+        )
+        window = timedelta(hours=2)
+        assert controller.count_messages_due_poll() == 5
+        assert controller.count_messages_due_poll(window=window) == 1
+        progress = controller.poll_due_messages(window=window, max_workers=1)
+        assert progress == {"polled": 1, "updated": 0, "redacted": 0, "failed": 1}
+        mock_get.assert_called_once_with("twilio_sid_4")
+
+    def test_sms_bulk_update_chunks(
+        self,
+        app: Flask,
+        monkeypatch: MonkeyPatch,
+        mocker: MockFixture,
+        incomplete_messages: List[Message],
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_BULK_UPDATE_CHUNK_SIZE", 2)
+        mock_get: Mock = mocker.patch.object(
+            twilio_client, "get_message", return_value=None
+        )
+        spy_commit: Mock = mocker.spy(db.session, "commit")
+        controller.sms_bulk_update()
+        assert [c.args[0] for c in mock_get.call_args_list] == [
+            f"twilio_sid_{i}" for i in range(5)
+        ]
+        # One commit per chunk, plus the redaction phase.
+        assert spy_commit.call_count == 4
+
+    def test_sms_bulk_update_resume(
+        self,
+        app: Flask,
+        monkeypatch: MonkeyPatch,
+        mocker: MockFixture,
+        incomplete_messages: List[Message],
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_BULK_UPDATE_CHUNK_SIZE", 2)
+        mock_get: Mock = mocker.patch.object(
+            twilio_client, "get_message", return_value=None
+        )
+        resume_from = (incomplete_messages[2].created, incomplete_messages[2].uuid)
+        controller.sms_bulk_update(resume_from=resume_from)
+        assert [c.args[0] for c in mock_get.call_args_list] == [
+            "twilio_sid_3",
+            "twilio_sid_4",
+        ]
+
+    def test_run_bulk_update_job(
+        self,
+        app: Flask,
+        monkeypatch: MonkeyPatch,
+        mocker: MockFixture,
+        incomplete_messages: List[Message],
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_BULK_UPDATE_CHUNK_SIZE", 2)
+        mocker.patch.object(controller, "run_in_background")
+        mocker.patch.object(
+            twilio_client,
+            "get_message",
+            side_effect=lambda twilio_sid: None
+            if twilio_sid == "twilio_sid_4"
+            else {
+                "status": "delivered",
+                "twilio_sid": twilio_sid,
+                "date_sent": None,
+                "error_code": None,
+                "error_message": None,
+            },
+        )
+        mocker.patch.object(twilio_client, "redact_message_body", return_value=True)
+        job = controller.start_bulk_update()
+        assert job["status"] == "queued"
+
+        controller.run_bulk_update_job(job["uuid"])
+
+        result = controller.get_bulk_update_job(job["uuid"])
+        assert result["status"] == "completed"
+        assert result["polled"] == 5
+        assert result["updated"] == 4
+        assert result["redacted"] == 4
+        assert result["failed"] == 1
+        assert result["elapsed"] >= 0
+        assert "finished" in result
+        last_job = BulkUpdateJob.query.filter_by(uuid=job["uuid"]).one()
+        assert last_job.last_uuid == "uuid_4"
+
+    def test_run_bulk_update_job_fails(self, mocker: MockFixture) -> None:
+        mocker.patch.object(controller, "run_in_background")
+        mocker.patch.object(
+            controller, "sms_bulk_update", side_effect=Exception("Database is down")
+        )
+        job = controller.start_bulk_update()
+        controller.run_bulk_update_job(job["uuid"])
+        result = controller.get_bulk_update_job(job["uuid"])
+        assert result["status"] == "failed"
+        assert result["error"] == "Database is down"
+
+        # A new job can be started once the previous one has failed.
+        assert controller.start_bulk_update()["uuid"] != job["uuid"]
+
+    def test_run_bulk_update_job_skipped(self, mocker: MockFixture) -> None:
+        mocker.patch.object(controller, "run_in_background")
+        mock_lock: Mock = mocker.patch.object(controller, "try_advisory_lock")
+        mock_lock.return_value.__enter__.return_value = False
+        mock_update: Mock = mocker.patch.object(controller, "sms_bulk_update")
+        job = controller.start_bulk_update()
+        controller.run_bulk_update_job(job["uuid"])
+        assert mock_update.call_count == 0
+        mock_lock.assert_called_with(controller.BULK_UPDATE_LOCK_NAME)
+        assert controller.get_bulk_update_job(job["uuid"])["status"] == "skipped"
+
+    def test_start_bulk_update_lock_differs_from_job_lock(
+        self, mocker: MockFixture
+    ) -> None:
+        # Postgres advisory locks on the same key block each other whether they are session
+        # or transaction locks, so starting a job must not take the running job's lock.
+        mocker.patch.object(controller, "run_in_background")
+        mock_xact_lock: Mock = mocker.patch.object(controller, "advisory_xact_lock")
+        controller.start_bulk_update()
+        mock_xact_lock.assert_called_once_with(controller.BULK_UPDATE_JOB_LOCK_NAME)
+        assert controller.BULK_UPDATE_JOB_LOCK_NAME != controller.BULK_UPDATE_LOCK_NAME
+
+    def test_start_bulk_update_resumes_abandoned_job(
+        self, mocker: MockFixture, incomplete_messages: List[Message]
+    ) -> None:
+        mock_background: Mock = mocker.patch.object(controller, "run_in_background")
+        abandoned = BulkUpdateJob(
+            uuid="abandoned",
+            status="running",
+            last_created=incomplete_messages[2].created,
+            last_uuid=incomplete_messages[2].uuid,
+            modified=datetime.utcnow() - timedelta(hours=1),
+        )
+        db.session.add(abandoned)
+        db.session.commit()
+
+        job = controller.start_bulk_update()
+
+        assert job["uuid"] != "abandoned"
+        mock_background.assert_called_once_with(
+            controller.run_bulk_update_job, job["uuid"]
+        )
+        assert controller.get_bulk_update_job("abandoned")["status"] == "failed"
+        mock_update: Mock = mocker.patch.object(controller, "sms_bulk_update")
+        controller.run_bulk_update_job(job["uuid"])
+        assert mock_update.call_args.kwargs["resume_from"] == (
+            incomplete_messages[2].created,
+            "uuid_2",
+        )
+
+    @pytest.mark.freeze_time("2026-01-08T12:00:00")
+    @pytest.mark.parametrize(
+        "age,attempts,status,expected_delay",
+        [
+            (timedelta(0), 0, "sent", 300),
+            (timedelta(minutes=5), 1, "sent", 300),
+            (timedelta(minutes=15), 3, "queued", 1200),
+            (timedelta(days=2), 1, "sent", 17280),
+            (timedelta(days=6), 10, "sent", 21600),
+            # The last poll must be due before the give up age, or it never happens.
+            (timedelta(days=7, hours=-6, seconds=-1), 10, "sent", 21600),
+            (timedelta(days=7, hours=-6), 10, "sent", None),
+            (timedelta(days=6, hours=23), 10, "sent", None),
+            (timedelta(days=7), 1, "sent", None),
+            (timedelta(minutes=5), 1, "delivered", None),
+        ],
+    )
+    def test_schedule_next_poll(
+        self,
+        age: timedelta,
+        attempts: int,
+        status: str,
+        expected_delay: Optional[int],
+    ) -> None:
+        now = datetime.utcnow()
+        sms = Message(
+            status=status,
+            twilio_sid="twilio_sid",
+            created=now - age,
+            poll_attempts=attempts,
+        )
+        controller._schedule_next_poll(sms, now)
+        if expected_delay is None:
+            assert sms.next_poll_at is None
+        else:
+            assert sms.next_poll_at == now + timedelta(seconds=expected_delay)
+
+    def test_create_message_schedules_poll(
+        self, message: Dict, mock_twilio_send: Mock
+    ) -> None:
+        result = controller.create_message(message)
+        sms = Message.query.filter_by(uuid=result["uuid"]).one()
+        assert sms.next_poll_at is not None
+        assert sms.next_poll_at > datetime.utcnow()
+
+    def test_sms_callback_terminal_stops_polling(
+        self, message: Dict, mock_twilio_send: Mock
+    ) -> None:
+        existing_message = controller.create_message(message)
+        controller.sms_callback(
+            {
+                "MessageSid": existing_message["twilio_sid"],
+                "MessageStatus": "delivered",
+            }
+        )
+        sms = Message.query.filter_by(uuid=existing_message["uuid"]).one()
+        assert sms.next_poll_at is None
+
+    def test_sms_bulk_update_only_polls_due_messages(
+        self, mocker: MockFixture, incomplete_messages: List[Message]
+    ) -> None:
+        Message.query.filter(Message.uuid.in_(["uuid_1", "uuid_3"])).update(
+            {"next_poll_at": datetime.utcnow() + timedelta(minutes=5)},
+            synchronize_session=False,
+        )
+        db.session.commit()
+        mock_get: Mock = mocker.patch.object(
+            twilio_client, "get_message", return_value=None
+        )
+        controller.sms_bulk_update()
+        assert [c.args[0] for c in mock_get.call_args_list] == [
+            "twilio_sid_0",
+            "twilio_sid_2",
+            "twilio_sid_4",
+        ]
+        sms = Message.query.filter_by(uuid="uuid_0").one()
+        assert sms.poll_attempts == 1
+        assert sms.next_poll_at > datetime.utcnow()
+
+        # Nothing is due any more.
+        mock_get.reset_mock()
+        controller.sms_bulk_update()
+        assert mock_get.call_count == 0
+
+    def test_sms_bulk_update_reconcile_from_list(
+        self,
+        app: Flask,
+        monkeypatch: MonkeyPatch,
+        mocker: MockFixture,
+        incomplete_messages: List[Message],
+        fake_twilio_list: List[Dict],
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_BULK_UPDATE_RECONCILE_FROM_LIST", True)
+        monkeypatch.setitem(app.config, "TWILIO_LIST_PAGE_SIZE", 2)
+        fake_twilio_list.extend(
+            {
+                "sid": sid,
+                "status": status,
+                "date_sent": "Thu, 01 Jan 2026 12:00:00 +0000",
+                "error_code": error_code,
+                "error_message": None,
+            }
+            for sid, status, error_code in [
+                ("someone_elses_sid", "delivered", None),
+                ("twilio_sid_0", "delivered", None),
+                ("twilio_sid_1", "undelivered", 30003),
+                ("twilio_sid_2", "sent", None),
+            ]
+        )
+        mock_get: Mock = mocker.patch.object(
+            twilio_client, "get_message", return_value=None
+        )
+        mocker.patch.object(twilio_client, "redact_message_body", return_value=True)
+        for sms in incomplete_messages:
+            controller.get_message_by_uuid(sms.uuid)
+
+        progress = controller.sms_bulk_update()
+
+        # Messages which weren't listed are fetched individually.
+        assert [c.args[0] for c in mock_get.call_args_list] == [
+            "twilio_sid_3",
+            "twilio_sid_4",
+        ]
+        assert progress == {"polled": 5, "updated": 2, "redacted": 2, "failed": 2}
+        messages = {sms.uuid: sms for sms in Message.query.all()}
+        assert messages["uuid_0"].status == "delivered"
+        assert messages["uuid_0"].next_poll_at is None
+        assert messages["uuid_0"].redacted is not None
+        assert messages["uuid_1"].status == "undelivered"
+        assert messages["uuid_1"].error_code == "30003"
+        assert messages["uuid_2"].status == "sent"
+        assert messages["uuid_2"].poll_attempts == 1
+        assert messages["uuid_2"].next_poll_at > datetime.utcnow()
+        # The updated messages aren't served from the cache.
+        for uuid, sms in messages.items():
+            cached = controller.get_message_by_uuid(uuid)
+            assert cached["status"] == sms.status
+            assert cached.get("redacted") == sms.to_dict().get("redacted")
+
+    def test_sms_bulk_update_reconcile_from_list_stale_status(
+        self,
+        app: Flask,
+        monkeypatch: MonkeyPatch,
+        mocker: MockFixture,
+        incomplete_messages: List[Message],
+        fake_twilio_list: List[Dict],
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_BULK_UPDATE_RECONCILE_FROM_LIST", True)
+        fake_twilio_list.extend(
+            {
+                "sid": f"twilio_sid_{i}",
+                "status": "sending",
+                "date_sent": None,
+                "error_code": None,
+                "error_message": None,
+            }
+            for i in range(5)
+        )
+        mock_get: Mock = mocker.patch.object(twilio_client, "get_message")
+        updates: List[str] = []
+
+        def _record_update(*args: Any) -> None:
+            statement: str = args[2]
+            if statement.startswith("UPDATE message "):
+                updates.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", _record_update)
+        try:
+            progress = controller.sms_bulk_update()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _record_update)
+
+        # The page is applied with one status update and one poll update for all its rows.
+        assert len(updates) == 2
+        # The listed statuses are older than ours, so only the next polls change.
+        assert mock_get.call_count == 0
+        assert progress == {"polled": 5, "updated": 0, "redacted": 0, "failed": 0}
+        for sms in Message.query.all():
+            assert sms.status == "sent"
+            assert sms.poll_attempts == 1
+            assert sms.next_poll_at > datetime.utcnow()
+
+    def test_sms_bulk_update_reconcile_from_list_max_pages(
+        self,
+        app: Flask,
+        monkeypatch: MonkeyPatch,
+        mocker: MockFixture,
+        requests_mock: Mocker,
+        incomplete_messages: List[Message],
+        fake_twilio_list: List[Dict],
+    ) -> None:
+        monkeypatch.setitem(app.config, "SMS_BULK_UPDATE_RECONCILE_FROM_LIST", True)
+        monkeypatch.setitem(app.config, "SMS_BULK_UPDATE_RECONCILE_MAX_PAGES", 3)
+        monkeypatch.setitem(app.config, "TWILIO_LIST_PAGE_SIZE", 2)
+        fake_twilio_list.extend(
+            {
+                "sid": sid,
+                "status": "delivered",
+                "date_sent": "Thu, 01 Jan 2026 12:00:00 +0000",
+                "error_code": None,
+                "error_message": None,
+            }
+            for sid in [*(f"someone_elses_sid_{i}" for i in range(10)), "twilio_sid_0"]
+        )
+        mock_get: Mock = mocker.patch.object(
+            twilio_client, "get_message", return_value=None
+        )
+
+        controller.sms_bulk_update()
+
+        # None of the due messages were in the pages read, so all were fetched individually.
+        assert requests_mock.call_count == 3
+        assert mock_get.call_count == 5
+        assert Message.query.filter_by(uuid="uuid_0").one().status == "sent"
+
     def test_sms_bulk_update_redaction(self, mocker: MockFixture) -> None:
         message_complete_redacted = Message(
             sender="GDm-Health",
@@ -330,6 +1566,7 @@ class TestMessageController:
             uuid="uuid_1",
             twilio_sid="twilio_sid_1",
             created=datetime.now(tz=timezone.utc) - timedelta(days=2),
+            next_poll_at=datetime.utcnow(),
             trustomer_code="tox",
             product_name="gdm",
             redacted=datetime.utcnow(),
@@ -342,8 +1579,10 @@ class TestMessageController:
             uuid="uuid_2",
             twilio_sid="twilio_sid_2",
             created=datetime.now(tz=timezone.utc) - timedelta(days=2),
+            next_poll_at=datetime.utcnow(),
             trustomer_code="tox",
             product_name="gdm",
+            redaction_due=datetime.utcnow(),
         )
         message_incomplete = Message(
             sender="GDm-Health",
@@ -353,6 +1592,7 @@ class TestMessageController:
             uuid="uuid_3",
             twilio_sid="twilio_sid_3",
             created=datetime.now(tz=timezone.utc) - timedelta(days=2),
+            next_poll_at=datetime.utcnow(),
             trustomer_code="tox",
             product_name="gdm",
         )
@@ -377,7 +1617,6 @@ class TestMessageController:
         controller.sms_bulk_update()
         assert mock_get.call_count == 1
         assert mock_redact.call_count == 1
-        assert mock_redact.call_count == 1
         mock_redact.assert_called_with(message_complete_unredacted.twilio_sid)
         assert (
             Message.query.filter_by(uuid=message_complete_unredacted.uuid)
@@ -0,0 +1,80 @@
+from datetime import datetime
+from typing import List, Optional
+
+import pytest
+from flask_batteries_included.sqldb import db
+from sqlalchemy.orm import Query
+
+from dhos_sms_api.blueprint_api import controller
+from dhos_sms_api.models.message import Message
+
+
+def explain(query: Query) -> List[str]:
+    compiled = query.statement.compile(
+        db.engine, compile_kwargs={"render_postcompile": True}
+    )
+    params = tuple(compiled.params[key] for key in compiled.positiontup)
+    return [
+        row.detail
+        for row in db.session.connection().exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {compiled}", params
+        )
+    ]
+
+
+@pytest.mark.usefixtures("app")
+class TestIndexes:
+    def test_poll_work_set_uses_partial_index(self) -> None:
+        query: Query = (
+            controller._messages_due_poll_query(datetime.utcnow())
+            .order_by(Message.created, Message.uuid)
+            .limit(500)
+        )
+        plan: List[str] = explain(query)
+        assert any("USING INDEX ix_message_due_poll " in step for step in plan)
+
+    def test_redaction_work_set_uses_partial_index(self) -> None:
+        query: Query = (
+            controller._messages_due_redaction_query(datetime.utcnow())
+            .order_by(Message.redaction_due)
+            .limit(50)
+        )
+        plan: List[str] = explain(query)
+        assert any("USING INDEX ix_message_due_redaction " in step for step in plan)
+        # Ordered by the index, so no sort is needed.
+        assert not any("TEMP B-TREE" in step for step in plan)
+
+    @pytest.mark.parametrize(
+        "receiver,index_name",
+        [(None, "ix_message_list"), ("+447123456789", "ix_message_list_receiver")],
+    )
+    def test_message_list_uses_composite_index(
+        self, receiver: Optional[str], index_name: str
+    ) -> None:
+        query: Query = Message.query.filter(Message.trustomer_code == "tox").filter(
+            Message.product_name == "gdm"
+        )
+        if receiver is not None:
+            query = query.filter(Message.receiver == receiver)
+        plan: List[str] = explain(
+            query.order_by(Message.created.desc(), Message.uuid.desc()).limit(500)
+        )
+        assert any(f"USING INDEX {index_name} " in step for step in plan)
+        # Already in the right order, so no sort is needed.
+        assert not any("TEMP B-TREE" in step for step in plan)
+
+    @pytest.mark.parametrize(
+        "index_name",
+        [
+            "ix_message_list",
+            "ix_message_list_receiver",
+            "ix_message_due_poll",
+            "ix_message_due_redaction",
+        ],
+    )
+    def test_work_set_indexes_exclude_deleted_messages(self, index_name: str) -> None:
+        sql: str = db.session.execute(
+            db.text("SELECT sql FROM sqlite_master WHERE name = :name"),
+            {"name": index_name},
+        ).scalar()
+        assert "deleted IS NULL" in sql
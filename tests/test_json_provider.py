@@ -0,0 +1,82 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from dhos_sms_api.helpers import json_provider
+from dhos_sms_api.helpers.json_provider import FastJSONProvider, init_json_provider
+
+
+class TestFastJSONProvider:
+    @pytest.fixture
+    def payload(self) -> Dict[str, Any]:
+        return {
+            "uuid": uuid.UUID("acd39afe-4583-401c-ae99-62227d0a86ed"),
+            "created": datetime(2026, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc),
+            "modified": datetime(2026, 1, 1, 12, 0, 0),
+            "sent": datetime(
+                2026, 1, 1, 13, 0, 0, 5000, tzinfo=timezone(timedelta(hours=1))
+            ),
+            "midnight": datetime(2026, 1, 1, tzinfo=timezone.utc),
+            "ancient": datetime(999, 1, 1, 0, 0, 0, 999999),
+            "day": date(2026, 1, 1),
+            "content": 'Héllo "there" \\ 😀\n ',
+            "zebra": [1, 2.5, True, None, {"b": 1, "a": 2}],
+            "elapsed": 0.1,
+        }
+
+    @pytest.fixture(params=[True, False], ids=["orjson", "json"])
+    def orjson_installed(self, request: Any, monkeypatch: MonkeyPatch) -> bool:
+        if request.param:
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr(json_provider, "orjson", None)
+        return request.param
+
+    def test_response_matches_default(
+        self, app: Flask, payload: Dict[str, Any], orjson_installed: bool
+    ) -> None:
+        expected: bytes = DefaultJSONProvider(app).response(payload).get_data()
+        assert FastJSONProvider(app).response(payload).get_data() == expected
+
+    def test_response_without_ensure_ascii(
+        self, app: Flask, payload: Dict[str, Any], orjson_installed: bool
+    ) -> None:
+        default = DefaultJSONProvider(app)
+        default.ensure_ascii = False
+        fast = FastJSONProvider(app)
+        fast.ensure_ascii = False
+        assert fast.response(payload).get_data() == default.response(payload).get_data()
+
+    def test_pretty_response_matches_default(
+        self, app: Flask, payload: Dict[str, Any]
+    ) -> None:
+        app.debug = True
+        expected: bytes = DefaultJSONProvider(app).response(payload).get_data()
+        assert FastJSONProvider(app).response(payload).get_data() == expected
+
+    @pytest.mark.parametrize(
+        "payload", [{"big": 2**70}, {1: "non-string key"}], ids=["int", "key"]
+    )
+    def test_unsupported_values_fall_back(self, app: Flask, payload: Dict) -> None:
+        expected: bytes = DefaultJSONProvider(app).response(payload).get_data()
+        assert FastJSONProvider(app).response(payload).get_data() == expected
+
+    def test_unserialisable_values_raise(self, app: Flask) -> None:
+        with pytest.raises(TypeError):
+            FastJSONProvider(app).dumps({"x": object()}, separators=(",", ":"))
+
+    @pytest.mark.parametrize("data", ['{"a": [1, "é"]}', b'{"a": [1, "\\u00e9"]}'])
+    def test_loads(self, app: Flask, data: Any, orjson_installed: bool) -> None:
+        assert FastJSONProvider(app).loads(data) == {"a": [1, "é"]}
+
+    def test_init_json_provider(self, app: Flask) -> None:
+        assert isinstance(app.json, FastJSONProvider)
+        other_app = Flask(__name__)
+        other_app.config["SMS_FAST_JSON"] = False
+        init_json_provider(other_app)
+        assert not isinstance(other_app.json, FastJSONProvider)
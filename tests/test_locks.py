@@ -0,0 +1,48 @@
+import pytest
+from flask import Flask
+from mock import Mock
+from pytest_mock import MockFixture
+
+from dhos_sms_api.helpers import locks
+
+
+class TestLocks:
+    @pytest.fixture
+    def mock_postgres(self, mocker: MockFixture) -> Mock:
+        mock_db: Mock = mocker.patch.object(locks, "db")
+        mock_db.engine.dialect.name = "postgresql"
+        return mock_db
+
+    def test_try_advisory_lock_sqlite(self, app: Flask) -> None:
+        with locks.try_advisory_lock("something") as acquired:
+            assert acquired is True
+
+    @pytest.mark.parametrize("acquired", [True, False])
+    def test_try_advisory_lock_postgres(
+        self, app: Flask, mock_postgres: Mock, acquired: bool
+    ) -> None:
+        mock_connection: Mock = (
+            mock_postgres.engine.connect.return_value.execution_options.return_value
+        )
+        mock_connection.execute.return_value.scalar.return_value = acquired
+        with locks.try_advisory_lock("something") as result:
+            assert result is acquired
+            assert mock_connection.execute.call_count == 1
+        statements = [str(c.args[0]) for c in mock_connection.execute.call_args_list]
+        assert statements[0] == "SELECT pg_try_advisory_lock(:key)"
+        if acquired:
+            assert statements[1] == "SELECT pg_advisory_unlock(:key)"
+        else:
+            assert len(statements) == 1
+        assert mock_connection.close.call_count == 1
+
+    def test_advisory_xact_lock_postgres(self, app: Flask, mock_postgres: Mock) -> None:
+        locks.advisory_xact_lock("something")
+        statement = mock_postgres.session.execute.call_args.args[0]
+        assert str(statement) == "SELECT pg_advisory_xact_lock(:key)"
+
+    def test_lock_key(self) -> None:
+        key = locks._lock_key("something")
+        assert key == locks._lock_key("something")
+        assert key != locks._lock_key("something else")
+        assert -(2**63) <= key < 2**63
@@ -0,0 +1,53 @@
+from typing import List
+
+from dhos_sms_api.helpers.rate_limiter import RateLimiter
+
+
+class TestRateLimiter:
+    def test_burst_then_rate(self) -> None:
+        now: List[float] = [0.0]
+        sleeps: List[float] = []
+
+        def _sleep(seconds: float) -> None:
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(rate=2, clock=lambda: now[0], sleep=_sleep)
+        for _ in range(4):
+            limiter.acquire()
+        assert sleeps == [0.5, 0.5]
+        assert now[0] == 1.0
+
+    def test_tokens_refill(self) -> None:
+        now: List[float] = [0.0]
+        sleeps: List[float] = []
+        limiter = RateLimiter(
+            rate=10, burst=1, clock=lambda: now[0], sleep=sleeps.append
+        )
+        limiter.acquire()
+        now[0] += 0.1
+        limiter.acquire()
+        assert sleeps == []
+
+    def test_disabled(self) -> None:
+        sleeps: List[float] = []
+        limiter = RateLimiter(rate=0, sleep=sleeps.append)
+        for _ in range(100):
+            limiter.acquire()
+        assert sleeps == []
+
+    def test_timeout(self) -> None:
+        now: List[float] = [0.0]
+        sleeps: List[float] = []
+
+        def _sleep(seconds: float) -> None:
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(rate=2, burst=1, clock=lambda: now[0], sleep=_sleep)
+        assert limiter.acquire(timeout=0) is True
+        # The next token is half a second away.
+        assert limiter.acquire(timeout=0.25) is False
+        assert sleeps == []
+        assert limiter.acquire(timeout=0.5) is True
+        assert sleeps == [0.5]
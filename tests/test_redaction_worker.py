@@ -0,0 +1,30 @@
+from mock import Mock
+from pytest_mock import MockFixture
+
+from dhos_sms_api.blueprint_api import controller
+from dhos_sms_api.helpers import redaction_worker
+
+
+class TestRedactionWorker:
+    def test_run_redaction_worker_once(self, mocker: MockFixture) -> None:
+        mock_redact: Mock = mocker.patch.object(
+            controller, "redact_due_messages", side_effect=[50, 7, 0]
+        )
+        mock_sleep: Mock = mocker.patch.object(redaction_worker.time, "sleep")
+        redaction_worker.run_redaction_worker(
+            batch_size=50, poll_interval=1.0, once=True
+        )
+        assert mock_redact.call_count == 3
+        mock_redact.assert_called_with(batch_size=50)
+        assert mock_sleep.call_count == 0
+
+    def test_run_redaction_worker_sleeps_when_idle(self, mocker: MockFixture) -> None:
+        mocker.patch.object(
+            controller, "redact_due_messages", side_effect=[0, KeyboardInterrupt]
+        )
+        mock_sleep: Mock = mocker.patch.object(redaction_worker.time, "sleep")
+        try:
+            redaction_worker.run_redaction_worker(batch_size=5, poll_interval=2.5)
+        except KeyboardInterrupt:
+            pass
+        mock_sleep.assert_called_once_with(2.5)
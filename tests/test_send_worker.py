@@ -0,0 +1,28 @@
+from mock import Mock
+from pytest_mock import MockFixture
+
+from dhos_sms_api.blueprint_api import controller
+from dhos_sms_api.helpers import send_worker
+
+
+class TestSendWorker:
+    def test_run_send_worker_once(self, mocker: MockFixture) -> None:
+        mock_send: Mock = mocker.patch.object(
+            controller, "send_pending_messages", side_effect=[10, 3, 0]
+        )
+        mock_sleep: Mock = mocker.patch.object(send_worker.time, "sleep")
+        send_worker.run_send_worker(batch_size=10, poll_interval=1.0, once=True)
+        assert mock_send.call_count == 3
+        mock_send.assert_called_with(batch_size=10)
+        assert mock_sleep.call_count == 0
+
+    def test_run_send_worker_sleeps_when_idle(self, mocker: MockFixture) -> None:
+        mocker.patch.object(
+            controller, "send_pending_messages", side_effect=[0, KeyboardInterrupt]
+        )
+        mock_sleep: Mock = mocker.patch.object(send_worker.time, "sleep")
+        try:
+            send_worker.run_send_worker(batch_size=5, poll_interval=2.5)
+        except KeyboardInterrupt:
+            pass
+        mock_sleep.assert_called_once_with(2.5)
@@ -1,14 +1,62 @@
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Dict, Iterator, List
+
 import pytest
 from _pytest.logging import LogCaptureFixture
 from _pytest.monkeypatch import MonkeyPatch
 from flask import Flask
+from flask_batteries_included.helpers.error_handler import ServiceUnavailableException
 from mock import Mock
 from pytest_mock import MockFixture
+from requests import Session
+from requests.exceptions import ConnectTimeout, ReadTimeout
+from requests_mock import ANY as requests_mock_any
+from requests_mock import Mocker
+from twilio.base.exceptions import TwilioRestException
 
 from dhos_sms_api.helpers import twilio_client
 
 
+class _TrickleHandler(BaseHTTPRequestHandler):
+    """
+    Serves a body one byte every 0.1s from /slow, and all at once from anywhere else.
+    """
+
+    def do_GET(self) -> None:
+        body: bytes = b"0123456789"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        for byte in body:
+            self.wfile.write(bytes([byte]))
+            self.wfile.flush()
+            if self.path == "/slow":
+                time.sleep(0.1)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
 class TestTwilioClient:
+    @pytest.fixture
+    def trickle_server(self) -> Iterator[str]:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _TrickleHandler)
+        thread = Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    @pytest.fixture
+    def deadline_session(self) -> Iterator[Session]:
+        session = Session()
+        session.mount("http://", twilio_client._DeadlineAdapter())
+        yield session
+        session.close()
+
     @pytest.fixture
     def mock_twilio_client(self, mocker: MockFixture) -> Mock:
         return mocker.patch("dhos_sms_api.helpers.twilio_client.Client")
@@ -97,3 +145,300 @@ class TestTwilioClient:
         assert mock_twilio_client.call_count == 1
         assert actual is True
         assert "Redacted message body in Twilio" in caplog.messages[-1]
+
+    def test_clients_are_reused(
+        self, app: Flask, mock_twilio_client: Mock, monkeypatch: MonkeyPatch
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+        for _ in range(2):
+            twilio_client.send_message(
+                phone_number="07777777777", content="some content", sender="GDm-Health"
+            )
+            twilio_client.get_message(twilio_sid="something")
+            twilio_client.redact_message_body(twilio_sid="something")
+        # One client per operation, all sharing the same connection pool.
+        assert mock_twilio_client.call_count == 3
+        http_clients = [
+            call.kwargs["http_client"] for call in mock_twilio_client.call_args_list
+        ]
+        assert len({id(http_client.session) for http_client in http_clients}) == 1
+        adapter = http_clients[0].session.get_adapter("https://api.twilio.com")
+        assert adapter._pool_maxsize == app.config["TWILIO_HTTP_POOL_SIZE"]
+
+    def test_clients_have_timeouts(
+        self, app: Flask, mock_twilio_client: Mock, monkeypatch: MonkeyPatch
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+        monkeypatch.setitem(app.config, "TWILIO_CONNECT_TIMEOUT", 1.5)
+        monkeypatch.setitem(app.config, "TWILIO_SEND_TIMEOUT", 8.0)
+        monkeypatch.setitem(app.config, "TWILIO_FETCH_TIMEOUT", 4.0)
+        monkeypatch.setitem(app.config, "TWILIO_REDACT_TIMEOUT", 2.0)
+        twilio_client.send_message(
+            phone_number="07777777777", content="some content", sender="GDm-Health"
+        )
+        twilio_client.get_message(twilio_sid="something")
+        twilio_client.redact_message_body(twilio_sid="something")
+        timeouts = {
+            call.kwargs["http_client"].timeout
+            for call in mock_twilio_client.call_args_list
+        }
+        assert timeouts == {(1.5, 8.0), (1.5, 4.0), (1.5, 2.0)}
+
+    def test_close_twilio_client(
+        self,
+        app: Flask,
+        mock_twilio_client: Mock,
+        monkeypatch: MonkeyPatch,
+        mocker: MockFixture,
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+        twilio_client.get_message(twilio_sid="something")
+        session = mock_twilio_client.call_args.kwargs["http_client"].session
+        mock_close: Mock = mocker.patch.object(session, "close")
+        twilio_client.close_twilio_client(app)
+        assert twilio_client.CLIENT_EXTENSION_NAME not in app.extensions
+        assert mock_close.call_count == 1
+        twilio_client.get_message(twilio_sid="something")
+        assert mock_twilio_client.call_count == 2
+
+    def test_unexpected_error_releases_probe(
+        self,
+        app: Flask,
+        mock_twilio_client: Mock,
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+        breaker = twilio_client._get_circuit_breaker(twilio_client.OPERATION_SEND)
+        monkeypatch.setattr(breaker, "_state", "half_open")
+        mock_twilio_client.return_value.messages.create.side_effect = ValueError
+        with pytest.raises(ValueError):
+            twilio_client.send_message(
+                phone_number="+447123456789", content="Hi", sender="Me"
+            )
+        assert breaker.state == "open"
+
+    def test_close_twilio_clients_on_exit(self, mocker: MockFixture) -> None:
+        from dhos_sms_api.app import create_app
+
+        mock_register: Mock = mocker.patch("atexit.register")
+        apps = [
+            create_app(testing=True, use_pgsql=False, use_sqlite=True) for _ in "ab"
+        ]
+        # The exit handler is registered once, not per app.
+        assert mock_register.call_count == 0
+        assert set(apps) <= set(twilio_client._apps)
+        mock_close: Mock = mocker.patch.object(twilio_client, "close_twilio_client")
+        twilio_client._close_twilio_clients()
+        for app in apps:
+            mock_close.assert_any_call(app)
+
+    def test_send_message_timeout(
+        self, app: Flask, mock_twilio_client: Mock, monkeypatch: MonkeyPatch
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+        mock_twilio_client.return_value.messages.create.side_effect = ReadTimeout
+        with pytest.raises(ServiceUnavailableException):
+            twilio_client.send_message(
+                phone_number="07777777777", content="some content", sender="GDm-Health"
+            )
+
+    def test_get_message_timeout(
+        self,
+        app: Flask,
+        mock_twilio_client: Mock,
+        monkeypatch: MonkeyPatch,
+        caplog: LogCaptureFixture,
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+        mock_twilio_client.return_value.messages.get.return_value.fetch.side_effect = (
+            ConnectTimeout
+        )
+        assert twilio_client.get_message(twilio_sid="something") is None
+        assert "will retry later" in caplog.text
+
+    def test_redact_message_body_timeout(
+        self,
+        app: Flask,
+        mock_twilio_client: Mock,
+        monkeypatch: MonkeyPatch,
+        caplog: LogCaptureFixture,
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+        mock_twilio_client.return_value.messages.return_value.update.side_effect = (
+            ReadTimeout
+        )
+        assert twilio_client.redact_message_body(twilio_sid="something") is False
+        assert "will retry later" in caplog.text
+
+    def test_circuit_breaker_opens(
+        self, app: Flask, mock_twilio_client: Mock, monkeypatch: MonkeyPatch
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+        monkeypatch.setitem(app.config, "TWILIO_CIRCUIT_BREAKER_MINIMUM_CALLS", 2)
+        mock_create: Mock = mock_twilio_client.return_value.messages.create
+        mock_create.side_effect = ReadTimeout
+        for _ in range(2):
+            with pytest.raises(ServiceUnavailableException):
+                twilio_client.send_message(
+                    phone_number="07777777777", content="content", sender="GDm-Health"
+                )
+        assert twilio_client.is_available(twilio_client.OPERATION_SEND) is False
+        with pytest.raises(twilio_client.CircuitOpenException):
+            twilio_client.send_message(
+                phone_number="07777777777", content="content", sender="GDm-Health"
+            )
+        assert mock_create.call_count == 2
+        # Other operations have their own circuit breakers.
+        assert twilio_client.is_available(twilio_client.OPERATION_FETCH) is True
+        status = twilio_client.circuit_breaker_status()
+        assert status[twilio_client.OPERATION_SEND]["state"] == "open"
+        assert status[twilio_client.OPERATION_FETCH]["state"] == "closed"
+
+    def test_circuit_breaker_ignores_client_errors(
+        self, app: Flask, mock_twilio_client: Mock, monkeypatch: MonkeyPatch
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+        monkeypatch.setitem(app.config, "TWILIO_CIRCUIT_BREAKER_MINIMUM_CALLS", 2)
+        mock_twilio_client.return_value.messages.return_value.update.side_effect = (
+            TwilioRestException(status=404, uri="/Messages/something", code=20404)
+        )
+        for _ in range(3):
+            assert twilio_client.redact_message_body(twilio_sid="something") is False
+        assert twilio_client.is_available(twilio_client.OPERATION_REDACT) is True
+
+    def test_get_message_circuit_open(
+        self, app: Flask, mock_twilio_client: Mock, monkeypatch: MonkeyPatch
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+        monkeypatch.setitem(app.config, "TWILIO_CIRCUIT_BREAKER_MINIMUM_CALLS", 1)
+        mock_fetch: Mock = (
+            mock_twilio_client.return_value.messages.get.return_value.fetch
+        )
+        mock_fetch.side_effect = ConnectTimeout
+        assert twilio_client.get_message(twilio_sid="something") is None
+        assert twilio_client.get_message(twilio_sid="something") is None
+        assert mock_fetch.call_count == 1
+
+    def test_redact_message_body_circuit_open(
+        self, app: Flask, mock_twilio_client: Mock, monkeypatch: MonkeyPatch
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+        monkeypatch.setitem(app.config, "TWILIO_CIRCUIT_BREAKER_MINIMUM_CALLS", 1)
+        mock_update: Mock = mock_twilio_client.return_value.messages.return_value.update
+        mock_update.side_effect = ConnectTimeout
+        assert twilio_client.redact_message_body(twilio_sid="something") is False
+        with pytest.raises(twilio_client.CircuitOpenException):
+            twilio_client.redact_message_body(twilio_sid="something")
+        assert mock_update.call_count == 1
+
+    def test_requests_are_rate_limited(
+        self,
+        app: Flask,
+        mock_twilio_client: Mock,
+        mocker: MockFixture,
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+        mock_acquire: Mock = mocker.patch.object(
+            twilio_client.RateLimiter, "acquire", autospec=True
+        )
+        twilio_client.send_message(
+            phone_number="07777777777", content="content", sender="GDm-Health"
+        )
+        twilio_client.get_message(twilio_sid="something")
+        twilio_client.redact_message_body(twilio_sid="something")
+        assert mock_acquire.call_count == 3
+        # All operations share one rate limit.
+        assert len({c.args[0] for c in mock_acquire.call_args_list}) == 1
+
+    def test_list_messages(
+        self,
+        app: Flask,
+        fake_twilio_list: List[Dict],
+        requests_mock: Mocker,
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        fake_twilio_list.extend(
+            {
+                "sid": f"SM{i}",
+                "status": "delivered",
+                "date_sent": "Thu, 01 Jan 2026 12:00:00 +0000",
+                "error_code": None,
+                "error_message": None,
+            }
+            for i in range(5)
+        )
+        monkeypatch.setitem(app.config, "TWILIO_LIST_PAGE_SIZE", 2)
+        pages = list(twilio_client.list_messages(datetime(2026, 1, 1)))
+        assert [[m["twilio_sid"] for m in page] for page in pages] == [
+            ["SM0", "SM1"],
+            ["SM2", "SM3"],
+            ["SM4"],
+        ]
+        assert pages[0][0]["status"] == "delivered"
+        assert pages[0][0]["date_sent"] == "2026-01-01 12:00:00+00:00"
+        assert requests_mock.call_count == 3
+        assert requests_mock.request_history[0].qs["datesent>"] == [
+            "2026-01-01t00:00:00z"
+        ]
+
+    def test_list_messages_error(
+        self, app: Flask, fake_twilio_list: List[Dict], requests_mock: Mocker
+    ) -> None:
+        requests_mock.get(requests_mock_any, status_code=500, json={})
+        assert list(twilio_client.list_messages(datetime(2026, 1, 1))) == []
+
+    def test_list_messages_disabled(
+        self, app: Flask, fake_twilio_list: List[Dict], monkeypatch: MonkeyPatch
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", True)
+        assert list(twilio_client.list_messages(datetime(2026, 1, 1))) == []
+
+    def test_deadline_covers_whole_response(
+        self, trickle_server: str, deadline_session: Session
+    ) -> None:
+        start: float = time.monotonic()
+        with twilio_client._operation_deadline(start + 0.35):
+            # Every socket read is well within the read timeout.
+            with pytest.raises(ReadTimeout):
+                deadline_session.get(f"{trickle_server}/slow", timeout=(1, 1))
+        assert time.monotonic() - start < 0.8
+
+    def test_deadline_allows_fast_responses(
+        self, trickle_server: str, deadline_session: Session
+    ) -> None:
+        with twilio_client._operation_deadline(time.monotonic() + 5):
+            response = deadline_session.get(f"{trickle_server}/fast", timeout=(1, 1))
+        assert response.content == b"0123456789"
+        # Without a deadline, requests are left alone.
+        assert deadline_session.get(f"{trickle_server}/slow").content == b"0123456789"
+
+    def test_deadline_passed_before_request(
+        self, trickle_server: str, deadline_session: Session
+    ) -> None:
+        with twilio_client._operation_deadline(time.monotonic() - 1):
+            with pytest.raises(ConnectTimeout):
+                deadline_session.get(f"{trickle_server}/fast")
+
+    def test_rate_limit_wait_counts_towards_deadline(
+        self,
+        app: Flask,
+        mock_twilio_client: Mock,
+        mocker: MockFixture,
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        monkeypatch.setitem(app.config, "TWILIO_DISABLED", False)
+        monkeypatch.setitem(app.config, "TWILIO_CONNECT_TIMEOUT", 1.0)
+        monkeypatch.setitem(app.config, "TWILIO_FETCH_TIMEOUT", 2.0)
+        mock_acquire: Mock = mocker.patch.object(
+            twilio_client.RateLimiter, "acquire", autospec=True, return_value=False
+        )
+        with pytest.raises(ServiceUnavailableException):
+            twilio_client.send_message(
+                phone_number="07777777777", content="content", sender="GDm-Health"
+            )
+        assert twilio_client.get_message(twilio_sid="something") is None
+        assert twilio_client.redact_message_body(twilio_sid="something") is False
+        assert 2.5 < mock_acquire.call_args_list[1].kwargs["timeout"] <= 3.0
+        assert mock_twilio_client.return_value.messages.create.call_count == 0
+        assert mock_twilio_client.return_value.messages.get.call_count == 0